@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Agenda de atualização do catálogo: prioridade e prazo por anime.
+
+Atualizar todo o catálogo a cada run gasta o mesmo scraping num filme de 2021
+e num anime que lança episódio hoje. A agenda dá a cada anime uma faixa, a
+partir da última temporada (status, currentEpisode/episodes, year) e da nota:
+
+  lancamento -> temporada em andamento (ongoing)       atualiza a cada 12h
+  recente    -> terminou há até RECENT_YEARS anos       a cada 7 dias
+  antigo     -> o resto                                 a cada 30 dias
+
+O prazo (vencimento) é a última atualização + o intervalo da faixa. Os
+terminados que nunca foram atualizados não vencem todos juntos: cada um cai
+num slot fixo dentro do intervalo (hash do id), contado da primeira vez que a
+agenda o viu. Entre os vencidos, a prioridade é
+
+  peso da faixa * (1 + nota/10) * (1.5 se ainda faltam episódios) * atraso
+
+com atraso = 1 + (agora - vencimento) / intervalo.
+
+Cada run tem um orçamento de tempo e de páginas (checagens HTTP). Os
+lançamentos ficam com até 1 - LOW_PRIORITY_SHARE do orçamento, os
+terminados com a reserva mais o que sobrar, e o que ainda restar volta para
+os lançamentos. O custo de cada anime é estimado pelo que ele gastou nas
+atualizações anteriores (média móvel) ou, na primeira vez, pelo número de
+áudios da última temporada.
+
+A atualização em si é a do anivideo (sem browser): a partir do stream_path dos
+embeds da última temporada, procura os episódios seguintes ao último conhecido
+de cada áudio e, se a temporada terminou, se já existe a próxima (só avisa:
+temporada nova precisa do MAL, via Full.py). Animes sem embed do anivideo na
+última temporada aparecem no plano como "sem atualizador".
+
+Estado em cache/atualizacoes.json (primeira vez visto, última atualização,
+última mudança e custo médio de cada anime).
+
+Uso:
+  python Api/Agenda.py                          # mostra o plano do próximo run
+  python Api/Agenda.py --executar               # atualiza o que couber no orçamento
+  python Api/Agenda.py --executar --tempo 5 --paginas 100 --so jujutsu-kaisen
+"""
+
+import os
+import json
+import time
+import zlib
+import argparse
+import requests
+
+from AniVideo import (
+    ANIVIDEO_STREAM_RE, MAX_PROBE_EPISODES, anivideo_manifest_url, build_anivideo_ep_url,
+    build_anivideo_stream_path, extract_av_base_slug,
+)
+from Catalogo import load_catalog, load_json, anime_status
+from Historico import fetch_record
+from LinkCache import AUDIOS, is_link_alive
+from Normalizar import FORMAT_NAME, build_episode, expand_anime, make_iframe_html, normalize_anime
+from SaidaJson import dump_json_atomic
+from Shards import anime_score
+
+REFRESH_STATE_FILE = os.path.join("cache", "atualizacoes.json")
+
+TIME_BUDGET = 15 * 60          # s por run
+PAGE_BUDGET = 300              # checagens HTTP por run
+LOW_PRIORITY_SHARE = 0.25      # reserva do orçamento para os terminados
+SECONDS_PER_PAGE = 1.5         # estimativa até o anime ter custo medido
+COST_SMOOTHING = 0.3           # peso da última medição na média do custo
+
+RECENT_YEARS = 2
+INTERVALS = {"lancamento": 12 * 3600, "recente": 7 * 86400, "antigo": 30 * 86400}
+TIER_WEIGHT = {"lancamento": 4.0, "recente": 1.5, "antigo": 1.0}
+AIRING_BONUS = 1.5             # temporada em andamento com episódios ainda por sair
+DEFAULT_SCORE = 6.0            # nota de quem não tem nota
+
+
+# ── Estado ───────────────────────────────────────────────────────────────────
+
+def load_state(path=REFRESH_STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"⚠️ Erro ao ler {path}: {e}. Recomeçando a agenda.")
+        return {}
+
+
+def save_state(state, path=REFRESH_STATE_FILE):
+    dump_json_atomic(state, path, pretty=False)
+
+
+def _ewma(previous, value, alpha=COST_SMOOTHING):
+    return value if previous is None else round((1 - alpha) * previous + alpha * value, 2)
+
+
+# ── Prioridade e prazo ───────────────────────────────────────────────────────
+
+def last_season(anime):
+    seasons = [s for s in anime.get("seasons") or [] if isinstance(s, dict)]
+    return max(seasons, key=lambda s: s.get("season") or 0) if seasons else None
+
+
+def anime_tier(anime, year_now):
+    if anime_status(anime) == "ongoing":
+        return "lancamento"
+    season = last_season(anime) or {}
+    year = season.get("year")
+    if isinstance(year, int) and year >= year_now - RECENT_YEARS:
+        return "recente"
+    return "antigo"
+
+
+def still_airing(anime):
+    """Temporada em andamento que ainda não tem todos os episódios."""
+    season = last_season(anime) or {}
+    total = season.get("episodes")
+    return season.get("status") == "ongoing" and (not total or (season.get("currentEpisode") or 0) < total)
+
+
+def _slot(anime_id):
+    """Posição fixa (0..1) do anime dentro do intervalo, para espalhar os terminados."""
+    return zlib.crc32(anime_id.encode("utf-8")) / 2 ** 32
+
+
+def due_at(anime, entry, tier):
+    interval = INTERVALS[tier]
+    if entry.get("lastRefresh"):
+        return entry["lastRefresh"] + interval
+    if tier == "lancamento":
+        return entry["firstSeen"]
+    return entry["firstSeen"] + interval * _slot(anime["id"])
+
+
+def priority(anime, tier, due, now):
+    score = anime_score(anime)
+    popularity = 1 + (score if score else DEFAULT_SCORE) / 10
+    lateness = 1 + max(0.0, now - due) / INTERVALS[tier]
+    airing = AIRING_BONUS if still_airing(anime) else 1.0
+    return round(TIER_WEIGHT[tier] * popularity * airing * lateness, 3)
+
+
+# ── Custo ────────────────────────────────────────────────────────────────────
+
+def season_streams(season):
+    """Áudio -> stream_path do anivideo ("j/jujutsu-kaisen-3") a partir dos embeds da temporada."""
+    streams = {}
+    for ep in season.get("episodeList") or []:
+        for audio, embed in (ep.get("embeds") or {}).items():
+            m = embed and audio not in streams and ANIVIDEO_STREAM_RE.search(embed)
+            if m:
+                streams[audio] = m.group(1)
+    return streams
+
+
+def estimated_cost(anime, entry, streams):
+    """(páginas, segundos) esperados: o medido antes ou 2 checagens por áudio (+1 se pode ter temporada nova)."""
+    if entry.get("pages") is not None and entry.get("seconds") is not None:
+        return max(1, round(entry["pages"])), entry["seconds"]
+    pages = 2 * len(streams) + (0 if still_airing(anime) else 1)
+    return pages, pages * SECONDS_PER_PAGE
+
+
+def schedule(animes, sources, state, now=None, only=None):
+    """
+    Situação de cada anime do catálogo: faixa, vencimento, prioridade, custo estimado.
+    Registra em `state` a primeira vez que um anime é visto.
+    """
+    now = now or time.time()
+    year_now = time.localtime(now).tm_year
+    items = []
+    for anime in animes:
+        if only and anime["id"] not in only:
+            continue
+        entry = state.setdefault(anime["id"], {})
+        entry.setdefault("firstSeen", int(now))
+        tier = anime_tier(anime, year_now)
+        due = due_at(anime, entry, tier)
+        streams = season_streams(last_season(anime) or {})
+        pages, seconds = estimated_cost(anime, entry, streams)
+        items.append({
+            "id": anime["id"],
+            "path": sources.get(anime["id"]),
+            "tier": tier,
+            "due": due,
+            "isDue": due <= now,
+            "priority": priority(anime, tier, due, now) if due <= now else 0.0,
+            "pages": pages,
+            "seconds": seconds,
+            "supported": bool(streams),
+        })
+    items.sort(key=lambda i: (-i["priority"], i["due"]))
+    return items
+
+
+def _take(queue, chosen, used, max_pages, max_seconds):
+    """Escolhe da fila (em ordem) tudo que ainda cabe no limite; o que não cabe continua na fila."""
+    left = []
+    for item in queue:
+        if used["pages"] + item["pages"] <= max_pages and used["seconds"] + item["seconds"] <= max_seconds:
+            chosen.append(item)
+            used["pages"] += item["pages"]
+            used["seconds"] += item["seconds"]
+        else:
+            left.append(item)
+    return left
+
+
+def plan_run(items, time_budget=TIME_BUDGET, page_budget=PAGE_BUDGET, low_share=LOW_PRIORITY_SHARE):
+    """Os vencidos que cabem no orçamento, na ordem de execução (lançamentos primeiro)."""
+    due = [i for i in items if i["isDue"] and i["supported"]]
+    high = [i for i in due if i["tier"] == "lancamento"]
+    low = [i for i in due if i["tier"] != "lancamento"]
+    chosen, used = [], {"pages": 0, "seconds": 0.0}
+    high = _take(high, chosen, used, page_budget * (1 - low_share), time_budget * (1 - low_share))
+    _take(low, chosen, used, page_budget, time_budget)
+    _take(high, chosen, used, page_budget, time_budget)
+    chosen.sort(key=lambda i: (i["tier"] != "lancamento", -i["priority"]))
+    return chosen
+
+
+# ── Atualização (anivideo) ───────────────────────────────────────────────────
+
+class RunBudget:
+    """Orçamento de um run: cada checagem pede uma página; acabou o tempo ou as páginas, nega."""
+
+    def __init__(self, seconds, pages):
+        self.deadline = time.monotonic() + seconds
+        self.pages_left = pages
+        self.pages_used = 0
+
+    def exhausted(self):
+        return self.pages_left <= 0 or time.monotonic() >= self.deadline
+
+    def take_page(self):
+        if self.exhausted():
+            return False
+        self.pages_left -= 1
+        self.pages_used += 1
+        return True
+
+
+def _probe(url, session):
+    rec = fetch_record("atualizacao", url)
+    try:
+        alive = is_link_alive(url, session=session)
+        rec.hit(url if alive else None, "anivideo")
+        return alive
+    finally:
+        rec.save()
+
+
+def _update_season_header(season):
+    counts = {
+        audio: sum(1 for ep in season.get("episodeList") or [] if (ep.get("embeds") or {}).get(audio))
+        for audio in AUDIOS
+    }
+    current = max((ep.get("number") or 0 for ep in season.get("episodeList") or []), default=0)
+    total = season.get("episodes")
+    season["currentEpisode"] = max(season.get("currentEpisode") or 0, current)
+    if season.get("status") == "ongoing" and total and season["currentEpisode"] >= total:
+        season["status"] = "finished"
+    season["episodes"] = max(total or 0, season["currentEpisode"])
+    for entry in season.get("audios") or []:
+        n = counts.get(entry.get("type"))
+        if n:
+            entry["available"] = True
+            entry["episodesAvailable"] = max(entry.get("episodesAvailable") or 0, n)
+
+
+def refresh_anime(anime, budget, session=None):
+    """
+    Procura episódios novos (e temporada nova) do anime no anivideo, alterando `anime`.
+    Retorna {"newEpisodes", "newSeason", "complete"}; complete=False se o orçamento acabou no meio.
+    """
+    result = {"newEpisodes": 0, "newSeason": None, "complete": True}
+    season = last_season(anime)
+    streams = season_streams(season or {})
+    if not streams:
+        return result
+    s_num = season.get("season")
+    title = anime.get("titleRomaji") or anime.get("title") or anime["id"]
+    episodes = {ep.get("number"): ep for ep in season.get("episodeList") or []}
+
+    for audio, stream_path in streams.items():
+        n = max((num for num, ep in episodes.items() if (ep.get("embeds") or {}).get(audio)), default=0) + 1
+        while n <= MAX_PROBE_EPISODES:
+            if not budget.take_page():
+                result["complete"] = False
+                break
+            if not _probe(anivideo_manifest_url(stream_path, n), session):
+                break
+            link = build_anivideo_ep_url(stream_path, n)
+            if n in episodes:
+                episodes[n].setdefault("embeds", {})[audio] = make_iframe_html(link)
+            else:
+                episodes[n] = build_episode(anime["id"], title, s_num, n, link if audio == "dub" else None,
+                                            link if audio == "sub" else None)
+            result["newEpisodes"] += 1
+            print(f"   [AGENDA] {anime['id']} T{s_num} ep {n} ({audio}) novo")
+            n += 1
+
+    if result["newEpisodes"]:
+        season["episodeList"] = sorted(episodes.values(), key=lambda e: e.get("number") or 0)
+        _update_season_header(season)
+
+    if result["complete"] and not still_airing(anime):
+        audio, stream_path = next(iter(streams.items()))
+        letter, base_slug = extract_av_base_slug(stream_path)
+        next_path = build_anivideo_stream_path(letter, base_slug, (s_num or 0) + 1, is_dub=audio == "dub")
+        if not budget.take_page():
+            result["complete"] = False
+        elif _probe(anivideo_manifest_url(next_path, 1), session):
+            result["newSeason"] = (s_num or 0) + 1
+            print(f"   [AGENDA] {anime['id']}: T{result['newSeason']} já existe no anivideo ({next_path}); "
+                  f"rode o Full.py para extraí-la")
+    return result
+
+
+def _write_anime(path, anime):
+    """Regrava o anime no arquivo dele, mantendo o formato (completo/normalizado) e os outros animes."""
+    data = load_json(path)
+    animes = data if isinstance(data, list) else [data]
+    out = []
+    for item in animes:
+        if isinstance(item, dict) and item.get("id") == anime["id"]:
+            item = normalize_anime(anime) if item.get("format") == FORMAT_NAME else anime
+        out.append(item)
+    dump_json_atomic(out if isinstance(data, list) else out[0], path)
+
+
+def _load_anime(path, anime_id):
+    data = load_json(path)
+    for item in (data if isinstance(data, list) else [data]):
+        if isinstance(item, dict) and item.get("id") == anime_id:
+            return expand_anime(item)
+    return None
+
+
+def run_plan(chosen, state, time_budget=TIME_BUDGET, page_budget=PAGE_BUDGET, state_file=REFRESH_STATE_FILE):
+    """Executa o plano dentro do orçamento. Retorna quantos animes mudaram."""
+    budget = RunBudget(time_budget, page_budget)
+    session = requests.Session()
+    changed = 0
+    for item in chosen:
+        if budget.exhausted():
+            print(f"⏱️ Orçamento esgotado ({budget.pages_used} páginas); o resto fica para o próximo run.")
+            break
+        anime = item["path"] and _load_anime(item["path"], item["id"])
+        if not anime:
+            print(f"⚠️ {item['id']} não está mais em {item['path']}; pulando.")
+            continue
+
+        t0, pages0 = time.monotonic(), budget.pages_used
+        print(f"🔄 {item['id']} ({item['tier']}, prioridade {item['priority']})")
+        result = refresh_anime(anime, budget, session)
+        pages, seconds = budget.pages_used - pages0, round(time.monotonic() - t0, 2)
+
+        if result["newEpisodes"]:
+            _write_anime(item["path"], anime)
+            changed += 1
+        entry = state[item["id"]]
+        if result["complete"]:
+            entry["lastRefresh"] = round(time.time())
+            entry["pages"] = _ewma(entry.get("pages"), pages)
+            entry["seconds"] = _ewma(entry.get("seconds"), seconds)
+        if result["newEpisodes"] or result["newSeason"]:
+            entry["lastChange"] = round(time.time())
+        if result["newSeason"]:
+            entry["newSeason"] = result["newSeason"]
+        save_state(state, state_file)
+        print(f"   {result['newEpisodes']} episódios novos, {pages} páginas, {seconds}s"
+              + ("" if result["complete"] else " (incompleto: orçamento acabou)"))
+    return changed
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _when(ts, now):
+    hours = (ts - now) / 3600
+    if abs(hours) < 48:
+        return f"{hours:+.0f}h"
+    return f"{hours / 24:+.0f}d"
+
+
+def print_plan(items, chosen, now):
+    chosen_ids = {i["id"] for i in chosen}
+    print(f"{'':2} {'prioridade':>10}  {'faixa':<10} {'vence':>6} {'págs':>5} {'seg':>6}  id")
+    for item in items:
+        mark = "▶" if item["id"] in chosen_ids else ("–" if not item["supported"] else " ")
+        print(f"{mark:2} {item['priority']:>10}  {item['tier']:<10} {_when(item['due'], now):>6} "
+              f"{item['pages']:>5} {item['seconds']:>6.1f}  {item['id']}")
+    unsupported = sum(1 for i in items if not i["supported"])
+    print(f"\n▶ {len(chosen)} no próximo run ({sum(i['pages'] for i in chosen)} páginas, "
+          f"~{sum(i['seconds'] for i in chosen):.0f}s); {sum(1 for i in items if i['isDue'])} vencidos"
+          + (f"; – {unsupported} sem atualizador (sem embed do anivideo)" if unsupported else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agenda de atualização do catálogo por prioridade e prazo.")
+    parser.add_argument("--executar", action="store_true", help="atualiza os animes do plano")
+    parser.add_argument("--tempo", type=float, default=TIME_BUDGET / 60, help="orçamento de tempo (min)")
+    parser.add_argument("--paginas", type=int, default=PAGE_BUDGET, help="orçamento de checagens HTTP")
+    parser.add_argument("--so", nargs="+", help="só estes ids")
+    args = parser.parse_args()
+
+    now = time.time()
+    catalog = load_catalog()
+    state = load_state()
+    items = schedule(catalog["animes"].values(), catalog["sources"], state, now, only=args.so)
+    chosen = plan_run(items, args.tempo * 60, args.paginas)
+    print_plan(items, chosen, now)
+    save_state(state)
+
+    if args.executar and chosen:
+        changed = run_plan(chosen, state, args.tempo * 60, args.paginas)
+        print(f"\n✅ {changed} animes com episódios novos." + (" Rode o JuntarJson.py para publicar." if changed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Agregados da página inicial (gerados junto com o output.json).
+
+Em vez de a home carregar o catálogo inteiro para montar as fileiras, o merge
+grava em public/catalog/home/ arquivos pequenos e já ordenados:
+  top_rated.json        -> HOME_TOP_N animes com maior nota
+  ongoing.json          -> animes em lançamento, por nota
+  recommended.json      -> animes com recommended (ver Recomendacoes.py)
+  latest_episodes.json  -> LATEST_EPISODES_N episódios adicionados por último
+  genres.json           -> por gênero, os ids dos HOME_GENRE_N melhores (+ os cards usados)
+  home.json             -> índice com o caminho e o hash de cada arquivo acima
+
+Os episódios não têm data, então "adicionado em" é a primeira vez que o merge
+viu o id do episódio (cache/episodios_vistos.json). Episódios que já existiam
+na primeira execução ficam com a data de modificação do arquivo do anime.
+
+Uso:
+  python Api/Agregados.py          # gera os agregados a partir do catálogo
+"""
+
+import os
+import time
+import json
+
+from Catalogo import load_catalog, anime_status, iter_episodes
+from Recomendacoes import anime_year, add_recommendations
+from SaidaJson import dump_json_atomic
+from Shards import SHARDS_DIR, content_hash, anime_score, write_if_changed
+
+HOME_DIR = os.path.join(SHARDS_DIR, "home")
+EPISODES_SEEN_FILE = os.path.join("cache", "episodios_vistos.json")
+HOME_VERSION = 1
+
+HOME_TOP_N = 20
+HOME_GENRE_N = 12
+LATEST_EPISODES_N = 30
+
+
+def anime_card(anime):
+    """O mínimo que um card da home precisa."""
+    return {
+        "id": anime["id"],
+        "title": anime.get("title"),
+        "coverImage": anime.get("coverImage"),
+        "bannerImage": anime.get("bannerImage"),
+        "score": anime_score(anime),
+        "year": anime_year(anime),
+        "status": anime_status(anime),
+        "genre": anime.get("genre") or [],
+    }
+
+
+def _by_score(animes):
+    return sorted(animes, key=lambda a: (-(anime_score(a) or 0), a.get("title") or a["id"]))
+
+
+# ── Episódios recentes ───────────────────────────────────────────────────────
+
+def load_seen(path=EPISODES_SEEN_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"⚠️ Erro ao ler {path}: {e}. Recomeçando o registro de episódios.")
+        return {}
+
+
+def mark_seen(animes, seen, sources=None, now=None):
+    """Registra a primeira vez que cada episódio aparece. Retorna quantos são novos."""
+    now = now or time.time()
+    first_run = not seen
+    added = 0
+    for anime in animes:
+        since = now
+        if first_run and sources and anime["id"] in sources:
+            try:
+                since = os.path.getmtime(sources[anime["id"]])
+            except OSError:
+                pass
+        for _, ep in iter_episodes(anime):
+            if ep.get("id") and ep["id"] not in seen:
+                seen[ep["id"]] = round(since)
+                added += 1
+    return added
+
+
+def latest_episodes(animes, seen, n=LATEST_EPISODES_N):
+    entries = []
+    for anime in animes:
+        for season, ep in iter_episodes(anime):
+            if ep.get("id") in seen:
+                entries.append((seen[ep["id"]], season.get("season") or 0, ep.get("number") or 0, anime, ep))
+    entries.sort(key=lambda e: e[:3], reverse=True)
+    return [
+        {
+            "animeId": anime["id"],
+            "animeTitle": anime.get("title"),
+            "coverImage": anime.get("coverImage"),
+            "season": season_num,
+            "number": number,
+            "episodeId": ep["id"],
+            "title": ep.get("title"),
+            "addedAt": added_at,
+        }
+        for added_at, season_num, number, anime, ep in entries[:n]
+    ]
+
+
+# ── Gravação ─────────────────────────────────────────────────────────────────
+
+def genre_buckets(animes, n=HOME_GENRE_N):
+    buckets = {}
+    for anime in _by_score(animes):
+        for genre in anime.get("genre") or []:
+            bucket = buckets.setdefault(genre, [])
+            if len(bucket) < n:
+                bucket.append(anime["id"])
+    ids = {i for bucket in buckets.values() for i in bucket}
+    return {
+        "genres": dict(sorted(buckets.items(), key=lambda kv: (-len(kv[1]), kv[0]))),
+        "cards": {a["id"]: anime_card(a) for a in animes if a["id"] in ids},
+    }
+
+
+def write_home_aggregates(animes, sources=None, out_dir=HOME_DIR, seen_file=EPISODES_SEEN_FILE):
+    seen = load_seen(seen_file)
+    new_eps = mark_seen(animes, seen, sources)
+    if new_eps or not os.path.exists(seen_file):
+        dump_json_atomic(seen, seen_file, pretty=False)
+
+    ranked = _by_score(animes)
+    files = {
+        "top_rated": [anime_card(a) for a in ranked[:HOME_TOP_N]],
+        "ongoing": [anime_card(a) for a in ranked if anime_status(a) == "ongoing"][:HOME_TOP_N],
+        "recommended": [anime_card(a) for a in ranked if a.get("recommended")][:HOME_TOP_N],
+        "latest_episodes": latest_episodes(animes, seen),
+        "genres": genre_buckets(animes),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    index = {}
+    written = 0
+    for name, value in files.items():
+        rel = f"{name}.json"
+        written += write_if_changed(os.path.join(out_dir, rel), value)
+        index[name] = {"path": f"home/{rel}", "hash": content_hash(value)}
+    home = {"version": HOME_VERSION, "hash": content_hash(index), "files": index}
+    written += write_if_changed(os.path.join(out_dir, "home.json"), home)
+    print(f"🏠 Agregados da home em {out_dir} ({written} arquivos atualizados, {new_eps} episódios novos)")
+    return home
+
+
+def main():
+    catalog = load_catalog()
+    animes = list(catalog["animes"].values())
+    add_recommendations(animes)
+    write_home_aggregates(animes, catalog["sources"])
+
+
+if __name__ == "__main__":
+    main()
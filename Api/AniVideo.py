@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+AniVideo (animesdigital.org novo): montagem das URLs da CDN e descoberta de
+temporadas/episódios sondando os manifests.
+
+Sem playwright: o link do episódio sai direto do stream_path
+("y/yofukashi-no-uta-2"), então quem só precisa sondar a CDN (Agenda.py)
+não depende do browser. O Full.py importa daqui.
+"""
+
+import re
+import time
+
+from LinkCache import is_link_alive
+
+# ── AniVideo (animesdigital.org novo) ────────────────────────────────────────
+# Extrai o stream_path do tipo "y/yofukashi-no-uta-2" de uma URL anivideo
+ANIVIDEO_STREAM_RE = re.compile(
+    r'cdn-s\d+\.mywallpaper-4k-image\.net/stream/([a-z]/[^/]+)/',
+    re.IGNORECASE
+)
+ANIVIDEO_WRAPPER  = "https://api.anivideo.net/videohls.php"
+ANIVIDEO_CDN_BASE = "https://cdn-s01.mywallpaper-4k-image.net/stream"
+
+def build_anivideo_ep_url(stream_path: str, ep_num: int) -> str:
+    """
+    Monta a URL final do episódio para o player anivideo.net.
+
+    stream_path: ex. "y/yofukashi-no-uta-2"  (letra/slug-temporada)
+    ep_num     : numero do episodio (inteiro)
+
+    URL gerada:
+      https://api.anivideo.net/videohls.php
+        ?d=https://cdn-s01.mywallpaper-4k-image.net/stream/y/yofukashi-no-uta-2/08.mp4/index.m3u8
+        &nocache<timestamp>
+    """
+    cdn_url = anivideo_manifest_url(stream_path, ep_num)
+    nocache = int(time.time() * 1000)       # timestamp em ms como cache-buster
+    return f"{ANIVIDEO_WRAPPER}?d={cdn_url}&nocache{nocache}"
+
+def anivideo_manifest_url(stream_path: str, ep_num: int) -> str:
+    """Manifest do episódio direto na CDN (sem o wrapper)."""
+    ep_str = f"{ep_num:02d}"                # 1 -> "01", 12 -> "12"
+    return f"{ANIVIDEO_CDN_BASE}/{stream_path}/{ep_str}.mp4/index.m3u8"
+
+def extract_av_base_slug(stream_path: str):
+    """
+    A partir de um stream_path completo, extrai a letra e o slug-base limpo.
+
+    Exemplos:
+      "j/jujutsu-kaisen-3-dublado" -> ("j", "jujutsu-kaisen")
+      "y/yofukashi-no-uta-2"       -> ("y", "yofukashi-no-uta")
+      "j/jujutsu-kaisen"           -> ("j", "jujutsu-kaisen")
+      "j/jujutsu-kaisen-dublado"   -> ("j", "jujutsu-kaisen")
+    """
+    parts = stream_path.split("/", 1)
+    letter = parts[0]
+    slug   = parts[1] if len(parts) > 1 else ""
+    slug   = re.sub(r"-dublado$", "", slug, flags=re.IGNORECASE)  # remove -dublado
+    slug   = re.sub(r"-\d+$",     "", slug)                       # remove -N (numero da temporada)
+    return letter.lower(), slug
+
+def build_anivideo_stream_path(letter: str, base_slug: str, season_num: int, is_dub: bool = False) -> str:
+    """
+    Monta o stream_path para uma temporada e audio especificos.
+
+    Regras:
+      - T1 sub  ->  letter/base_slug
+      - T1 dub  ->  letter/base_slug-dublado
+      - T2 sub  ->  letter/base_slug-2
+      - T2 dub  ->  letter/base_slug-2-dublado
+      - T3 dub  ->  letter/base_slug-3-dublado
+    """
+    path = f"{letter}/{base_slug}"
+    if season_num > 1:
+        path += f"-{season_num}"
+    if is_dub:
+        path += "-dublado"
+    return path
+
+# ── Auto-descoberta de temporadas/episódios ──────────────────────────────────
+MAX_PROBE_EPISODES = 2000
+MAX_PROBE_SEASONS  = 30
+
+def probe_last_episode(exists, limit=MAX_PROBE_EPISODES):
+    """
+    Último n com exists(n) verdadeiro, supondo episódios contíguos a partir do 1.
+    Busca exponencial (1, 2, 4, 8...) até achar um que não existe e depois binária
+    dentro do intervalo: ~2*log2(n) checagens em vez de n.
+    """
+    if not exists(1):
+        return 0
+    lo, hi = 1, 2
+    while hi <= limit and exists(hi):
+        lo, hi = hi, hi * 2
+    hi = min(hi, limit + 1)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if exists(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+def probe_anivideo_episodes(letter, base_slug, season_num, is_dub, session=None):
+    """Quantos episódios a temporada/áudio tem na CDN do anivideo (0 = não existe)."""
+    stream_path = build_anivideo_stream_path(letter, base_slug, season_num, is_dub=is_dub)
+    return probe_last_episode(lambda n: is_link_alive(anivideo_manifest_url(stream_path, n), session=session))
+
+def discover_anivideo_seasons(letter, base_slug, session=None, max_seasons=MAX_PROBE_SEASONS):
+    """Temporadas (no formato do seasons_input) até a primeira que não existe em nenhum áudio."""
+    seasons = []
+    for s in range(1, max_seasons + 1):
+        eps_sub = probe_anivideo_episodes(letter, base_slug, s, False, session)
+        eps_dub = probe_anivideo_episodes(letter, base_slug, s, True, session)
+        if not eps_sub and not eps_dub:
+            break
+        print(f"   [AUTO] T{s}: {eps_sub} legendados, {eps_dub} dublados")
+        seasons.append({
+            "season_num": s,
+            "total_eps": max(eps_sub, eps_dub),
+            "has_dub": eps_dub > 0,
+            "has_leg": eps_sub > 0,
+            "url_dub": None,
+            "url_sub": None,
+            "eps_dub": eps_dub,
+            "eps_sub": eps_sub,
+        })
+    return seasons
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark das heurísticas do GetAnimeInfo sobre as páginas em cache/.
+
+Compara as funções antigas (uma varredura por heurística, com regex montada na
+hora) com o scan_text_features (uma varredura só) e confere se os resultados
+batem.
+
+Uso:
+  python Api/BenchGetAnimeInfo.py [pasta_cache] [repetições]
+"""
+
+import re
+import sys
+import glob
+import time
+
+from GetAnimeInfo import (
+    scan_text_features, AUDIO_KEYWORDS, STATUS_KEYWORDS, EPS_PATTERN, DATE_RE,
+)
+
+
+# ── Versões antigas (referência) ─────────────────────────────────────────────
+
+def legacy_find_audio(soup_text):
+    txt = soup_text.lower()
+    for k in AUDIO_KEYWORDS:
+        if k in txt:
+            m = re.search(r'([A-ZÀ-Üa-zà-ü\s]{0,40}\b(?:legendado|dublado|dual|sub|dub)\b[^\n]{0,40})', soup_text, re.IGNORECASE)
+            val = m.group(0).strip() if m else k
+            if 'legend' in val.lower() or 'sub' in val.lower():
+                return "Legendado"
+            if 'dub' in val.lower() or 'dublado' in val.lower():
+                return "Dublado"
+            if 'dual' in val.lower():
+                return "Dual-Audio"
+            return val
+    return None
+
+
+def legacy_find_status(soup_text):
+    txt = soup_text.lower()
+    for k in STATUS_KEYWORDS:
+        if k in txt:
+            if 'completo' in k or 'finished' in k:
+                return "Completo"
+            if 'em andamento' in k or 'ongoing' in k:
+                return "Em andamento"
+            if 'pausad' in k:
+                return "Pausado"
+            if 'cancelad' in k:
+                return "Cancelado"
+            return k.capitalize()
+    return None
+
+
+def legacy_find_episodes(soup_text):
+    m = re.search(r'(\d{1,4})\s*/\s*(\d{1,4})\s*(?:eps|episódios|episodios|episodes?)', soup_text, re.IGNORECASE)
+    if m:
+        return int(m.group(2))
+    m2 = EPS_PATTERN.search(soup_text)
+    if m2:
+        return int(m2.group(1))
+    return None
+
+
+def legacy_find_date(soup_text):
+    m = DATE_RE.search(soup_text)
+    if m:
+        return m.group(1)
+    m2 = re.search(r'([A-Za-z]{3,}\s+\d{1,2},\s*\d{4})', soup_text)
+    if m2:
+        return m2.group(1)
+    m3 = re.search(r'\b(19|20)\d{2}\b', soup_text)
+    if m3:
+        return m3.group(0)
+    return None
+
+
+def legacy_scan(text):
+    return {
+        "audio": legacy_find_audio(text),
+        "status": legacy_find_status(text),
+        "episodes": legacy_find_episodes(text),
+        "date": legacy_find_date(text),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def bench(fn, docs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for d in docs:
+            fn(d)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else "cache"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    paths = sorted(glob.glob(f"{folder}/*.html"))
+    if not paths:
+        print(f"Nenhuma página .html em {folder}/")
+        return
+    docs = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8", errors="replace") as f:
+            docs.append(f.read())
+    total_mb = sum(len(d) for d in docs) / 1e6
+    print(f"{len(docs)} páginas, {total_mb:.1f} MB de HTML, melhor de {repeat} rodadas\n")
+
+    mismatches = 0
+    for p, d in zip(paths, docs):
+        new = scan_text_features(d)
+        old = legacy_scan(d)
+        diff = {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+        if diff:
+            mismatches += 1
+            print(f"  [diferente] {p}: {diff}")
+    print(f"Resultados iguais em {len(docs) - mismatches}/{len(docs)} páginas\n")
+
+    t_old = bench(legacy_scan, docs, repeat)
+    t_new = bench(scan_text_features, docs, repeat)
+    print(f"antigo (4 funções)     : {t_old * 1000:8.1f} ms  ({total_mb / t_old:6.1f} MB/s)")
+    print(f"scan_text_features     : {t_new * 1000:8.1f} ms  ({total_mb / t_new:6.1f} MB/s)")
+    print(f"ganho                  : {t_old / t_new:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Captura de mídia pela rede (fallback dos extratores do Full.py / FullAsync.py).
+
+A captura é ligada ANTES do page.goto e escuta tanto requests quanto responses,
+então pega também o .m3u8/.mp4 que o player pede logo no carregamento. Assim que
+aparece o primeiro link de mídia a espera termina (sem aguardar networkidle) e o
+resto do carregamento da página é interrompido (window.stop()).
+
+Quando chegam vários candidatos eles são ordenados: playlist master (.m3u8)
+antes de playlists de variante, depois .mpd, .mp4/.mkv e por último segmentos.
+Links do wrapper do anivideo (videohls.php?d=...) contam pelo manifest em d=.
+"""
+
+import re
+import asyncio
+from urllib.parse import unquote, urlparse
+
+# Regex para detectar links de vídeo
+VIDEO_EXT_RE = re.compile(r'\.(mp4|m3u8|mpd|mkv)(?:\?.*)?$', re.IGNORECASE)
+VIDEOHLS_D_RE = re.compile(r'videohls\.php\?(?:.*&)?d=([^&]+)', re.IGNORECASE)
+
+MASTER_NAME_RE = re.compile(r'(?:^|[/_-])(master|playlist|index|manifest)[^/]*\.m3u8$', re.IGNORECASE)
+VARIANT_NAME_RE = re.compile(r'(?:chunklist|\d{3,4}p|[_-]v\d|[_-]a\d|audio|video)[^/]*\.m3u8$', re.IGNORECASE)
+SEGMENT_NAME_RE = re.compile(r'(?:seg|frag|chunk|part|init)[-_]?\d*[^/]*\.(?:mp4|mkv)$|/\d+\.(?:mp4|mkv)$', re.IGNORECASE)
+
+FIRST_HIT_TIMEOUT = 6000    # ms esperando o primeiro link depois do carregamento
+PLAY_CLICK_TIMEOUT = 2000   # ms esperando um link depois de cada clique em "play"
+GRACE_MS = 300              # ms extras após o 1º link, para a master chegar se vier um segmento antes
+
+
+def media_candidate(url):
+    """URL de mídia contida em url (o próprio url, ou o d= do videohls.php), ou None."""
+    if not url:
+        return None
+    m = VIDEOHLS_D_RE.search(url)
+    if m:
+        return unquote(m.group(1))
+    if VIDEO_EXT_RE.search(url):
+        return url
+    return None
+
+
+def media_rank(url):
+    """Menor = melhor: master m3u8, variante m3u8, mpd, arquivo inteiro, segmento."""
+    path = urlparse(url).path.lower()
+    if path.endswith(".m3u8"):
+        if MASTER_NAME_RE.search(path) and not VARIANT_NAME_RE.search(path):
+            return 0
+        return 1
+    if path.endswith(".mpd"):
+        return 2
+    if SEGMENT_NAME_RE.search(path):
+        return 9
+    return 3
+
+
+class MediaCapture:
+    """
+    Junta os links de mídia vistos pela página. attach() antes de navegar;
+    wait() / wait_async() esperam o primeiro link e devolvem o melhor candidato.
+    """
+
+    def __init__(self):
+        self.hits = []
+        self._future = None
+
+    def feed(self, url):
+        link = media_candidate(url)
+        if not link or link in self.hits:
+            return
+        self.hits.append(link)
+        if self._future is not None and not self._future.done():
+            self._future.set_result(link)
+
+    def best(self):
+        if not self.hits:
+            return None
+        return min(self.hits, key=lambda u: (media_rank(u), self.hits.index(u)))
+
+    def attach(self, page):
+        """Serve para a API sync e a async (os handlers são chamados do mesmo jeito)."""
+        page.on("request", lambda req: self.feed(req.url))
+        page.on("response", lambda res: self.feed(res.url))
+        try:
+            self._future = asyncio.get_running_loop().create_future()
+        except RuntimeError:
+            self._future = None   # API sync: espera via page.wait_for_event
+        return self
+
+    # ── API sync ─────────────────────────────────────────────────────────────
+
+    def wait(self, page, timeout=FIRST_HIT_TIMEOUT):
+        if not self.hits:
+            try:
+                page.wait_for_event("request", predicate=lambda req: media_candidate(req.url) is not None, timeout=timeout)
+            except Exception:
+                pass
+        if not self.hits:
+            return None
+        try:
+            page.wait_for_timeout(GRACE_MS)
+            page.evaluate("window.stop()")
+        except Exception:
+            pass
+        return self.best()
+
+    # ── API async ────────────────────────────────────────────────────────────
+
+    async def wait_async(self, page, timeout=FIRST_HIT_TIMEOUT):
+        if not self.hits and self._future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._future), timeout / 1000)
+            except asyncio.TimeoutError:
+                pass
+        if not self.hits:
+            return None
+        try:
+            await asyncio.sleep(GRACE_MS / 1000)
+            await page.evaluate("window.stop()")
+        except Exception:
+            pass
+        return self.best()
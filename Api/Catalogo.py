@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Catálogo em memória dos animes (Api/Animes/*.json).
+
+Carrega todos os arquivos com o parser mais rápido disponível (orjson, se
+instalado), valida contra a estrutura que o Full.py gera
+(seasons[].episodeList[].embeds) e monta índices por id, malId, gênero,
+estúdio e status. O resultado fica guardado em memória e só é recarregado
+quando algum arquivo muda (mtime/tamanho), então as ferramentas (merge,
+verificador de links, refresh...) podem consultar o catálogo sem reler JSON.
+
+Uso rápido:
+  python Api/Catalogo.py                 # valida e mostra um resumo
+"""
+
+import os
+import glob
+import json
+from collections import defaultdict
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+CATALOG_SOURCES = [os.path.join("Api", "Animes", "*.json")]
+
+_loaded = {}   # cache por fontes -> (assinatura dos arquivos, catálogo)
+
+
+def load_json(path):
+    """Lê um JSON usando orjson quando disponível."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _is_str(v):
+    return isinstance(v, str)
+
+
+def validate_anime(anime):
+    """
+    Confere a estrutura de um anime no formato do Full.py.
+    Retorna a lista de problemas encontrados (vazia = válido).
+    """
+    if not isinstance(anime, dict):
+        return ["registro não é um objeto"]
+    errors = []
+    if not _is_str(anime.get("id")) or not anime.get("id"):
+        errors.append("campo 'id' ausente ou não é string")
+    if not _is_str(anime.get("title")):
+        errors.append("campo 'title' ausente ou não é string")
+    if "malId" in anime and not isinstance(anime["malId"], int):
+        errors.append("campo 'malId' não é inteiro")
+    if "genre" in anime and not (isinstance(anime["genre"], list) and all(_is_str(g) for g in anime["genre"])):
+        errors.append("campo 'genre' não é lista de strings")
+
+    seasons = anime.get("seasons")
+    if not isinstance(seasons, list):
+        errors.append("campo 'seasons' ausente ou não é lista")
+        return errors
+
+    for si, season in enumerate(seasons):
+        where = f"seasons[{si}]"
+        if not isinstance(season, dict):
+            errors.append(f"{where} não é um objeto")
+            continue
+        if not isinstance(season.get("season"), int):
+            errors.append(f"{where}.season ausente ou não é inteiro")
+        episodes = season.get("episodeList", [])
+        if not isinstance(episodes, list):
+            errors.append(f"{where}.episodeList não é lista")
+            continue
+        for ei, ep in enumerate(episodes):
+            ewhere = f"{where}.episodeList[{ei}]"
+            if not isinstance(ep, dict):
+                errors.append(f"{ewhere} não é um objeto")
+                continue
+            if not isinstance(ep.get("number"), int):
+                errors.append(f"{ewhere}.number ausente ou não é inteiro")
+            embeds = ep.get("embeds")
+            if embeds is None:
+                if not _is_str(ep.get("embedUrl")):
+                    errors.append(f"{ewhere} sem 'embeds' nem 'embedUrl'")
+            elif not isinstance(embeds, dict) or not all(_is_str(v) for v in embeds.values()):
+                errors.append(f"{ewhere}.embeds não é um objeto de strings")
+    return errors
+
+
+def anime_status(anime):
+    """Status do anime = status da última temporada ('ongoing'/'finished')."""
+    seasons = [s for s in anime.get("seasons") or [] if isinstance(s, dict)]
+    if not seasons:
+        return None
+    last = max(seasons, key=lambda s: s.get("season") or 0)
+    return last.get("status")
+
+
+def iter_episodes(anime):
+    """Gera (temporada, episódio) para todos os episódios do anime."""
+    for season in anime.get("seasons") or []:
+        for ep in season.get("episodeList") or []:
+            yield season, ep
+
+
+def _key(value):
+    return (value or "").strip().lower()
+
+
+def build_catalog(records):
+    """
+    Monta o catálogo a partir de uma lista de (arquivo, anime).
+    Registros inválidos ou com id repetido ficam de fora e vão para 'errors'.
+    """
+    catalog = {
+        "animes": {},
+        "sources": {},
+        "by_mal": {},
+        "by_genre": defaultdict(list),
+        "by_studio": defaultdict(list),
+        "by_status": defaultdict(list),
+        "errors": {},
+    }
+    from Normalizar import expand_anime   # import local: Normalizar usa load_json daqui
+
+    for path, anime in records:
+        anime_id = anime.get("id") if isinstance(anime, dict) else None
+        label = f"{path}:{anime_id or '?'}"
+        if isinstance(anime, dict):
+            try:
+                anime = expand_anime(anime)     # arquivos no formato normalizado viram completos
+            except Exception as e:
+                catalog["errors"][label] = [f"formato normalizado inválido: {e!r}"]
+                continue
+        problems = validate_anime(anime)
+        if problems:
+            catalog["errors"][label] = problems
+            continue
+        if anime_id in catalog["animes"]:
+            catalog["errors"][label] = [f"id duplicado (já carregado de {catalog['sources'][anime_id]})"]
+            continue
+
+        catalog["animes"][anime_id] = anime
+        catalog["sources"][anime_id] = path
+        if anime.get("malId"):
+            catalog["by_mal"].setdefault(anime["malId"], anime_id)
+        for genre in anime.get("genre") or []:
+            catalog["by_genre"][_key(genre)].append(anime_id)
+        if anime.get("studio"):
+            catalog["by_studio"][_key(anime["studio"])].append(anime_id)
+        catalog["by_status"][anime_status(anime) or "unknown"].append(anime_id)
+
+    for name in ("by_genre", "by_studio", "by_status"):
+        catalog[name] = dict(catalog[name])
+    return catalog
+
+
+def _files_for(sources):
+    files = []
+    for pattern in sources:
+        for path in sorted(glob.glob(pattern)):
+            path = os.path.normpath(path)
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def load_catalog(sources=None, force=False):
+    """
+    Carrega (ou devolve do cache em memória) o catálogo das fontes informadas.
+    Arquivos com lista de animes (ex: output.json) também são aceitos.
+    """
+    sources = tuple(sources or CATALOG_SOURCES)
+    files = _files_for(sources)
+    signature = []
+    for path in files:
+        st = os.stat(path)
+        signature.append((path, st.st_mtime_ns, st.st_size))
+    signature = tuple(signature)
+
+    cached = _loaded.get(sources)
+    if cached and cached[0] == signature and not force:
+        return cached[1]
+
+    records = []
+    read_errors = {}
+    for path in files:
+        try:
+            data = load_json(path)
+        except Exception as e:
+            read_errors[path] = [f"erro ao ler: {e}"]
+            continue
+        for anime in (data if isinstance(data, list) else [data]):
+            records.append((path, anime))
+
+    catalog = build_catalog(records)
+    catalog["errors"].update(read_errors)
+    _loaded[sources] = (signature, catalog)
+    return catalog
+
+
+# ── Consultas ────────────────────────────────────────────────────────────────
+
+def get_anime(catalog, anime_id):
+    return catalog["animes"].get(anime_id)
+
+
+def find_by_mal(catalog, mal_id):
+    anime_id = catalog["by_mal"].get(mal_id)
+    return catalog["animes"].get(anime_id) if anime_id else None
+
+
+def find_by_genre(catalog, genre):
+    return [catalog["animes"][i] for i in catalog["by_genre"].get(_key(genre), [])]
+
+
+def find_by_studio(catalog, studio):
+    return [catalog["animes"][i] for i in catalog["by_studio"].get(_key(studio), [])]
+
+
+def find_by_status(catalog, status):
+    return [catalog["animes"][i] for i in catalog["by_status"].get(status, [])]
+
+
+def main():
+    catalog = load_catalog()
+    print(f"📚 {len(catalog['animes'])} animes carregados ({'orjson' if orjson else 'json'}).")
+    for status, ids in sorted(catalog["by_status"].items()):
+        print(f"   {status}: {len(ids)}")
+    for label, problems in catalog["errors"].items():
+        print(f"⚠️ {label}")
+        for p in problems[:5]:
+            print(f"     - {p}")
+        if len(problems) > 5:
+            print(f"     ... (+{len(problems) - 5})")
+
+
+if __name__ == "__main__":
+    main()
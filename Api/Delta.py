@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Deltas versionados do catálogo entre um build e o seguinte (gerados no merge).
+
+Cada build do output.json ganha um número de versão. Quando o output.json
+anterior é exatamente a última versão publicada (mesmo hash), o merge grava
+em public/catalog/deltas/ o patch entre as duas:
+
+  deltas/index.json     -> versão e hash atuais + lista dos deltas disponíveis
+  deltas/<N>.json       -> {"from": N-1, "to": N, "ops": [...]}
+
+Operações (por anime; dentro dele, por temporada e por episódio):
+  {"op": "add",    "id": ..., "value": {anime}}
+  {"op": "remove", "id": ...}
+  {"op": "update", "id": ..., "set": {campo: valor}, "unset": [campos],
+   "seasons": [{"season": n, "op": "add"|"remove"|"update", ...}]}
+     temporada update: "set"/"unset" dos campos da temporada e
+     "episodes": {"upsert": [episódios], "remove": [ids], "order": [ids]?}
+  "order" (ids) só aparece quando a ordem final não é a natural (itens
+  mantidos no lugar, novos no fim).
+
+Mudanças que são só o cache-buster do anivideo (&nocache...) não contam
+(mesma regra do Git.py).
+
+Compactação: ficam no máximo MAX_DELTAS deltas e, somados, até
+MAX_CHAIN_RATIO do tamanho do output.json. Quem estiver numa versão mais
+antiga que o primeiro delta mantido baixa o output.json inteiro.
+
+Uso:
+  python Api/Delta.py                   # mostra o índice de deltas
+"""
+
+import os
+import copy
+import glob
+import json
+
+from Catalogo import load_json
+from Git import normalize_for_compare
+from SaidaJson import atomic_open, dumps
+from Shards import SHARDS_DIR, content_hash, write_if_changed
+
+DELTAS_DIR = os.path.join(SHARDS_DIR, "deltas")
+DELTA_FORMAT = 1
+MAX_DELTAS = 30
+MAX_CHAIN_RATIO = 0.5
+
+
+def _same(a, b):
+    return normalize_for_compare(a) == normalize_for_compare(b)
+
+
+def _diff_fields(old, new, skip):
+    """set/unset dos campos de primeiro nível (menos os de `skip`)."""
+    changes = {}
+    set_ = {k: v for k, v in new.items() if k not in skip and (k not in old or not _same(old[k], v))}
+    unset = [k for k in old if k not in skip and k not in new]
+    if set_:
+        changes["set"] = set_
+    if unset:
+        changes["unset"] = unset
+    return changes
+
+
+def _natural_order(old_keys, new_keys):
+    """Ordem que o apply produz sem 'order': quem ficou, no lugar antigo; quem entrou, no fim."""
+    kept = [k for k in old_keys if k in set(new_keys)]
+    seen = set(kept)
+    return kept + [k for k in new_keys if k not in seen]
+
+
+def diff_episodes(old_eps, new_eps):
+    old_by_id = {ep.get("id"): ep for ep in old_eps}
+    new_ids = [ep.get("id") for ep in new_eps]
+    changes = {}
+    upsert = [ep for ep in new_eps if ep.get("id") not in old_by_id or not _same(old_by_id[ep.get("id")], ep)]
+    remove = [i for i in old_by_id if i not in set(new_ids)]
+    if upsert:
+        changes["upsert"] = upsert
+    if remove:
+        changes["remove"] = remove
+    if _natural_order(list(old_by_id), new_ids) != new_ids:
+        changes["order"] = new_ids
+    return changes
+
+
+def diff_seasons(old_seasons, new_seasons):
+    old_by_num = {s.get("season"): s for s in old_seasons}
+    new_by_num = {s.get("season"): s for s in new_seasons}
+    ops = []
+    for num, season in new_by_num.items():
+        if num not in old_by_num:
+            ops.append({"season": num, "op": "add", "value": season})
+            continue
+        changes = _diff_fields(old_by_num[num], season, skip={"episodeList"})
+        episodes = diff_episodes(old_by_num[num].get("episodeList") or [], season.get("episodeList") or [])
+        if episodes:
+            changes["episodes"] = episodes
+        if changes:
+            ops.append(dict({"season": num, "op": "update"}, **changes))
+    for num in old_by_num:
+        if num not in new_by_num:
+            ops.append({"season": num, "op": "remove"})
+    new_order = list(new_by_num)
+    if _natural_order(list(old_by_num), new_order) != new_order:
+        ops.append({"op": "order", "seasons": new_order})
+    return ops
+
+
+def diff_catalog(old_animes, new_animes):
+    """Lista de operações que transforma old_animes em new_animes."""
+    old_by_id = {a["id"]: a for a in old_animes}
+    new_by_id = {a["id"]: a for a in new_animes}
+    ops = []
+    for anime_id, anime in new_by_id.items():
+        old = old_by_id.get(anime_id)
+        if old is None:
+            ops.append({"op": "add", "id": anime_id, "value": anime})
+            continue
+        if _same(old, anime):
+            continue
+        changes = _diff_fields(old, anime, skip={"seasons"})
+        seasons = diff_seasons(old.get("seasons") or [], anime.get("seasons") or [])
+        if seasons:
+            changes["seasons"] = seasons
+        if changes:
+            ops.append(dict({"op": "update", "id": anime_id}, **changes))
+    for anime_id in old_by_id:
+        if anime_id not in new_by_id:
+            ops.append({"op": "remove", "id": anime_id})
+    new_order = list(new_by_id)
+    if _natural_order(list(old_by_id), new_order) != new_order:
+        ops.append({"op": "order", "ids": new_order})
+    return ops
+
+
+# ── Aplicação (referência para os consumidores) ─────────────────────────────
+
+def _apply_fields(target, change):
+    for k in change.get("unset", []):
+        target.pop(k, None)
+    target.update(change.get("set", {}))
+
+
+def _apply_list(items, key, upsert, remove, order):
+    by_key = {item.get(key): item for item in items}
+    for k in remove:
+        by_key.pop(k, None)
+    for item in upsert:
+        by_key[item.get(key)] = item
+    return [by_key[k] for k in order] if order else list(by_key.values())
+
+
+def apply_delta(animes, ops):
+    """Aplica as operações de um delta numa lista de animes (devolve uma nova lista)."""
+    by_id = {a["id"]: a for a in copy.deepcopy(animes)}
+    order = None
+    for op in ops:
+        kind = op["op"]
+        if kind == "add":
+            by_id[op["id"]] = op["value"]
+        elif kind == "remove":
+            by_id.pop(op["id"], None)
+        elif kind == "order":
+            order = op["ids"]
+        else:
+            anime = by_id[op["id"]]
+            _apply_fields(anime, op)
+            if "seasons" in op:
+                anime["seasons"] = _apply_seasons(anime.get("seasons") or [], op["seasons"])
+    return [by_id[i] for i in order] if order else list(by_id.values())
+
+
+def _apply_seasons(seasons, ops):
+    by_num = {s.get("season"): s for s in seasons}
+    order = None
+    for op in ops:
+        kind = op["op"]
+        if kind == "order":
+            order = op["seasons"]
+        elif kind == "add":
+            by_num[op["season"]] = op["value"]
+        elif kind == "remove":
+            by_num.pop(op["season"], None)
+        else:
+            season = by_num[op["season"]]
+            _apply_fields(season, op)
+            eps = op.get("episodes")
+            if eps:
+                season["episodeList"] = _apply_list(
+                    season.get("episodeList") or [], "id", eps.get("upsert", []), eps.get("remove", []), eps.get("order"),
+                )
+    return [by_num[n] for n in order] if order else list(by_num.values())
+
+
+# ── Gravação ─────────────────────────────────────────────────────────────────
+
+def load_index(out_dir=DELTAS_DIR):
+    path = os.path.join(out_dir, "index.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        return load_json(path)
+    except Exception as e:
+        print(f"⚠️ Índice de deltas ilegível ({e}); começando uma cadeia nova.")
+        return None
+
+
+def compact(deltas, full_size, max_deltas=MAX_DELTAS, max_ratio=MAX_CHAIN_RATIO):
+    """Mantém os deltas mais novos enquanto a cadeia for menor que baixar tudo de novo."""
+    kept = []
+    total = 0
+    for delta in reversed(deltas):
+        if len(kept) >= max_deltas or total + delta["bytes"] > max_ratio * full_size:
+            break
+        kept.append(delta)
+        total += delta["bytes"]
+    return list(reversed(kept))
+
+
+def write_catalog_delta(previous, current, out_dir=DELTAS_DIR, full_file="output.json"):
+    """
+    previous: output.json do build anterior (None se não havia), current: o novo.
+    Grava o delta (se houver mudança) e o índice. Retorna o índice.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    index = load_index(out_dir)
+    current_hash = content_hash(current)
+    chain_ok = index is not None and previous is not None and \
+        index.get("hash") == content_hash(previous)
+
+    if chain_ok and index["hash"] == current_hash:
+        print(f"🧾 Catálogo sem mudanças (versão {index['version']}).")
+        return index
+
+    version = (index or {}).get("version", 0) + 1
+    deltas = list(index.get("deltas", [])) if chain_ok else []
+    if chain_ok:
+        ops = diff_catalog(previous, current)
+        delta = {"format": DELTA_FORMAT, "from": version - 1, "to": version, "ops": ops}
+        text = dumps(delta, pretty=False)
+        rel = f"{version}.json"
+        with atomic_open(os.path.join(out_dir, rel)) as f:
+            f.write(text)
+        deltas.append({"from": version - 1, "to": version, "path": f"deltas/{rel}",
+                       "hash": content_hash(delta), "ops": len(ops), "bytes": len(text.encode("utf-8"))})
+        print(f"🧾 Delta {version - 1} -> {version}: {len(ops)} operações, {len(text.encode('utf-8'))} bytes.")
+    else:
+        print(f"🧾 Sem base para delta (build anterior não é a versão publicada): nova cadeia na versão {version}.")
+
+    full_size = len(dumps(current, pretty=False).encode("utf-8"))
+    deltas = compact(deltas, full_size)
+    index = {
+        "format": DELTA_FORMAT,
+        "version": version,
+        "hash": current_hash,
+        "full": full_file,
+        "oldest": deltas[0]["from"] if deltas else version,
+        "deltas": deltas,
+    }
+    write_if_changed(os.path.join(out_dir, "index.json"), index)
+
+    keep = {os.path.normpath(os.path.join(out_dir, d["path"].split("/", 1)[1])) for d in deltas}
+    for path in glob.glob(os.path.join(out_dir, "[0-9]*.json")):
+        if os.path.normpath(path) not in keep:
+            os.remove(path)
+    return index
+
+
+def load_previous_output(path):
+    """output.json do build anterior, antes de ser sobrescrito (None se não existe ou está quebrado)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        data = load_json(path)
+    except Exception:
+        return None
+    return data if isinstance(data, list) else None
+
+
+def main():
+    index = load_index()
+    if not index:
+        print(f"Nenhum delta em {DELTAS_DIR} ainda (gerado pelo JuntarJson.py).")
+        return
+    print(json.dumps(index, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Fazenda de browsers: serviço local de extração com Chromium sempre aberto.
+
+Em vez de cada script abrir o próprio Chromium, o servidor mantém WORKERS
+browsers quentes (cada um com ABAS abas em paralelo) e consome uma fila
+SQLite (cache/jobs.db). Full.py, GetAnimeEp.py e as ferramentas em lote
+mandam jobs pela API HTTP local e esperam o resultado; o custo de abrir o
+browser é pago uma vez só e todo mundo divide o mesmo limite de abas.
+
+Tipos de job:
+  episode       {url, desired_audio, flags}  -> link do episódio (com o cache de links);
+                desired_audio "all" -> {"dub": link, "sub": link} com uma carga da página
+  episode_list  {url}                        -> lista de episódios do animesdigital
+  banner        {anime_name}                 -> banner da Crunchyroll
+
+API (JSON):
+  POST /jobs            {"kind": ..., ...}  ou lista deles -> {"id"} / {"ids"}
+  GET  /jobs/<id>       ?wait=<s> espera o job terminar   -> {id, kind, status, result, error}
+  GET  /status                                             -> contagem da fila por status
+
+A fila sobrevive a reinícios: jobs que estavam 'running' voltam para 'pending'
+quando o servidor sobe de novo, e um job igual a outro ainda pendente não é
+duplicado.
+
+Uso:
+  python Api/Fazenda.py servir [--workers 2] [--abas 4] [--porta 8765]
+  python Api/Fazenda.py status
+  python Api/Fazenda.py enviar URL [--audio dub|sub]
+  python Api/Full.py --fazenda          # extrai usando o servidor
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import asyncio
+import argparse
+import requests
+
+from LinkCache import AUDIOS, ALL_AUDIOS, page_groups, as_tracks
+
+JOBS_DB = os.path.join("cache", "jobs.db")
+FARM_HOST = "127.0.0.1"
+FARM_PORT = 8765
+FARM_URL = os.environ.get("FAZENDA_URL", f"http://{FARM_HOST}:{FARM_PORT}")
+
+WORKERS = 2            # browsers quentes
+TABS_PER_WORKER = 4    # abas em paralelo por browser
+IDLE_POLL = 1.0        # s entre olhadas na fila quando não há aviso de job novo
+CACHE_SAVE_EVERY = 15  # s entre gravações do cache de links
+MAX_ATTEMPTS = 2       # job que derruba o worker volta para a fila até este limite
+
+JOB_KINDS = ("episode", "episode_list", "banner")
+
+
+# ── Fila (SQLite) ────────────────────────────────────────────────────────────
+
+def open_db(path=JOBS_DB):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind        TEXT NOT NULL,
+            params      TEXT NOT NULL,
+            status      TEXT NOT NULL DEFAULT 'pending',
+            result      TEXT,
+            error       TEXT,
+            attempts    INTEGER NOT NULL DEFAULT 0,
+            created_at  REAL NOT NULL,
+            started_at  REAL,
+            finished_at REAL
+        )""")
+    db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id)")
+    return db
+
+
+def _params_key(params):
+    return json.dumps(params, ensure_ascii=False, sort_keys=True)
+
+
+def enqueue(db, kind, params):
+    """Põe um job na fila. Se já existe um igual pendente/rodando, devolve o id dele."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"tipo de job desconhecido: {kind}")
+    key = _params_key(params)
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute(
+            "SELECT id FROM jobs WHERE kind = ? AND params = ? AND status IN ('pending', 'running')",
+            (kind, key),
+        ).fetchone()
+        if row:
+            job_id = row["id"]
+        else:
+            job_id = db.execute(
+                "INSERT INTO jobs (kind, params, created_at) VALUES (?, ?, ?)",
+                (kind, key, time.time()),
+            ).lastrowid
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return job_id
+
+
+def claim_job(db):
+    """Pega o job pendente mais antigo e marca como 'running'. None se a fila está vazia."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute("SELECT id, kind, params FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+        if row:
+            db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), row["id"]),
+            )
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    if not row:
+        return None
+    return row["id"], row["kind"], json.loads(row["params"])
+
+
+def finish_job(db, job_id, result=None, error=None):
+    db.execute(
+        "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+        ("error" if error else "done", json.dumps(result, ensure_ascii=False), error, time.time(), job_id),
+    )
+
+
+def requeue_running(db):
+    """Jobs que ficaram 'running' (servidor caiu no meio) voltam para a fila ou viram erro."""
+    db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running' AND attempts < ?", (MAX_ATTEMPTS,))
+    db.execute(
+        "UPDATE jobs SET status = 'error', error = 'abandonado após várias tentativas' WHERE status = 'running'"
+    )
+
+
+def get_job(db, job_id):
+    row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        return None
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "params": json.loads(row["params"]),
+        "status": row["status"],
+        "result": json.loads(row["result"]) if row["result"] is not None else None,
+        "error": row["error"],
+        "attempts": row["attempts"],
+    }
+
+
+def queue_counts(db):
+    return {row["status"]: row["n"] for row in db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+
+
+# ── Servidor ─────────────────────────────────────────────────────────────────
+
+async def run_job(context, pages, link_cache, check_session, kind, params):
+    from FullAsync import (
+        resolve_episode_link_async, resolve_episode_tracks_async,
+        extract_episode_links_from_animesdigital_async, fetch_crunchyroll_banner_async,
+    )
+    if kind == "episode" and params.get("desired_audio") == ALL_AUDIOS:
+        target = (params["url"], params.get("flags") or {})
+        return await resolve_episode_tracks_async(
+            context, pages, link_cache, check_session, {audio: target for audio in AUDIOS},
+        )
+    if kind == "episode":
+        return await resolve_episode_link_async(
+            context, pages, link_cache, check_session, params["url"],
+            desired_audio=params.get("desired_audio"), **(params.get("flags") or {}),
+        )
+    async with pages:
+        if kind == "episode_list":
+            return await extract_episode_links_from_animesdigital_async(context, params["url"])
+        if kind == "banner":
+            return await fetch_crunchyroll_banner_async(params["anime_name"], context)
+    raise ValueError(f"tipo de job desconhecido: {kind}")
+
+
+async def serve(db_path=JOBS_DB, workers=WORKERS, tabs=TABS_PER_WORKER, host=FARM_HOST, port=FARM_PORT):
+    from aiohttp import web
+    from playwright.async_api import async_playwright
+    from LinkCache import load_link_cache, save_link_cache
+
+    db = open_db(db_path)
+    requeue_running(db)
+    link_cache = load_link_cache()
+    check_session = requests.Session()
+    wake = asyncio.Event()
+    finished = {}                     # id -> Event, para o ?wait= da API
+    last_save = [time.time()]
+
+    def job_done(job_id):
+        ev = finished.pop(job_id, None)
+        if ev:
+            ev.set()
+        if time.time() - last_save[0] >= CACHE_SAVE_EVERY:
+            save_link_cache(link_cache)
+            last_save[0] = time.time()
+
+    async def slot(context, pages, name):
+        while True:
+            job = claim_job(db)
+            if not job:
+                wake.clear()
+                try:
+                    await asyncio.wait_for(wake.wait(), IDLE_POLL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_id, kind, params = job
+            t0 = time.time()
+            try:
+                result = await run_job(context, pages, link_cache, check_session, kind, params)
+                finish_job(db, job_id, result=result)
+                print(f"[{name}] job {job_id} ({kind}) ok em {time.time() - t0:.1f}s")
+            except Exception as e:
+                finish_job(db, job_id, error=str(e) or e.__class__.__name__)
+                print(f"[{name}] job {job_id} ({kind}) falhou: {e}")
+            job_done(job_id)
+
+    # ── API HTTP ─────────────────────────────────────────────────────────────
+    async def post_jobs(request):
+        body = await request.json()
+        items = body if isinstance(body, list) else [body]
+        try:
+            ids = [enqueue(db, item.get("kind", "episode"), {k: v for k, v in item.items() if k != "kind"}) for item in items]
+        except (ValueError, AttributeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        wake.set()
+        return web.json_response({"ids": ids} if isinstance(body, list) else {"id": ids[0]})
+
+    async def get_job_handler(request):
+        job_id = int(request.match_info["job_id"])
+        wait = float(request.query.get("wait", 0) or 0)
+        job = get_job(db, job_id)
+        if job and job["status"] in ("pending", "running") and wait > 0:
+            ev = finished.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(ev.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            job = get_job(db, job_id)
+        if not job:
+            return web.json_response({"error": "job não encontrado"}, status=404)
+        return web.json_response(job)
+
+    async def get_status(request):
+        return web.json_response({
+            "queue": queue_counts(db),
+            "workers": workers,
+            "tabs": workers * tabs,
+        })
+
+    app = web.Application()
+    app.router.add_post("/jobs", post_jobs)
+    app.router.add_get("/jobs/{job_id:\\d+}", get_job_handler)
+    app.router.add_get("/status", get_status)
+
+    async with async_playwright() as p:
+        browsers = [await p.chromium.launch(headless=True) for _ in range(workers)]
+        slots = []
+        for n, browser in enumerate(browsers, start=1):
+            context = await browser.new_context()
+            pages = asyncio.Semaphore(tabs)
+            slots += [slot(context, pages, f"w{n}.{t}") for t in range(1, tabs + 1)]
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        print(f"🚜 Fazenda no ar em http://{host}:{port} ({workers} browsers x {tabs} abas, fila em {db_path})")
+        try:
+            await asyncio.gather(*slots)
+        finally:
+            save_link_cache(link_cache)
+            await runner.cleanup()
+            for browser in browsers:
+                await browser.close()
+
+
+# ── Cliente (síncrono, para os scripts) ─────────────────────────────────────
+
+def farm_available(farm_url=FARM_URL):
+    try:
+        return requests.get(f"{farm_url}/status", timeout=2).ok
+    except requests.RequestException:
+        return False
+
+
+def submit_jobs(jobs, farm_url=FARM_URL):
+    """jobs: lista de dicts {"kind": ..., ...params}. Retorna os ids na mesma ordem."""
+    r = requests.post(f"{farm_url}/jobs", json=list(jobs), timeout=30)
+    r.raise_for_status()
+    return r.json()["ids"]
+
+
+def job_status(job_id, wait=0, farm_url=FARM_URL):
+    r = requests.get(f"{farm_url}/jobs/{job_id}", params={"wait": wait} if wait else None, timeout=wait + 30)
+    r.raise_for_status()
+    return r.json()
+
+
+def wait_job(job_id, timeout=None, farm_url=FARM_URL):
+    """Espera o job terminar e devolve o resultado (None se deu erro ou estourou o timeout)."""
+    deadline = time.time() + timeout if timeout else None
+    while True:
+        remaining = 30 if deadline is None else max(0, min(30, deadline - time.time()))
+        job = job_status(job_id, wait=remaining, farm_url=farm_url)
+        if job["status"] == "done":
+            return job["result"]
+        if job["status"] == "error":
+            print(f"   [FAZENDA] job {job_id} falhou: {job['error']}")
+            return None
+        if deadline is not None and time.time() >= deadline:
+            print(f"   [FAZENDA] job {job_id} não terminou a tempo.")
+            return None
+
+
+def run_remote(kind, params, farm_url=FARM_URL):
+    """Submete um job e espera o resultado."""
+    return wait_job(submit_jobs([dict(params, kind=kind)], farm_url=farm_url)[0], farm_url=farm_url)
+
+
+def resolve_tracks_remote(episodes, farm_url=FARM_URL):
+    """
+    episodes: iterável de targets do plan_episode_urls ({"dub": (url, flags) ou None, "sub": ...}).
+    Submete tudo de uma vez (a fazenda resolve em paralelo) e gera {"dub": link, "sub": link}
+    na mesma ordem. Áudios na mesma página viram um job só (desired_audio "all").
+    """
+    groups = [page_groups(targets) for targets in episodes]
+    payload = [
+        {"kind": "episode", "url": ep_url, "desired_audio": audios[0] if len(audios) == 1 else ALL_AUDIOS,
+         "flags": flags or {}}
+        for episode in groups for ep_url, flags, audios in episode
+    ]
+    ids = iter(submit_jobs(payload, farm_url=farm_url) if payload else [])
+    for episode in groups:
+        links = dict.fromkeys(AUDIOS)
+        for ep_url, flags, audios in episode:
+            result = wait_job(next(ids), farm_url=farm_url)
+            links.update(as_tracks(result, audios) if len(audios) > 1 else {audios[0]: result})
+        yield links
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Fazenda de browsers (serviço local de extração).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("servir", help="sobe o servidor com os browsers quentes")
+    p_serve.add_argument("--workers", type=int, default=WORKERS)
+    p_serve.add_argument("--abas", type=int, default=TABS_PER_WORKER)
+    p_serve.add_argument("--porta", type=int, default=FARM_PORT)
+    p_serve.add_argument("--db", default=JOBS_DB)
+
+    sub.add_parser("status", help="mostra a fila")
+
+    p_send = sub.add_parser("enviar", help="extrai um episódio pela fazenda")
+    p_send.add_argument("url")
+    p_send.add_argument("--audio", choices=["dub", "sub"])
+
+    args = parser.parse_args()
+    if args.cmd == "servir":
+        try:
+            asyncio.run(serve(args.db, args.workers, args.abas, FARM_HOST, args.porta))
+        except KeyboardInterrupt:
+            print("\n🚜 Fazenda encerrada.")
+        return
+
+    if not farm_available():
+        print(f"❌ Fazenda fora do ar em {FARM_URL} (suba com: python Api/Fazenda.py servir)")
+        sys.exit(1)
+    if args.cmd == "status":
+        print(json.dumps(requests.get(f"{FARM_URL}/status", timeout=5).json(), ensure_ascii=False, indent=2))
+    elif args.cmd == "enviar":
+        link = run_remote("episode", {"url": args.url, "desired_audio": args.audio, "flags": {}})
+        print(link or "❌ Nenhum link encontrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,59 @@
 #!/usr/bin/env python3
 import re
-import time
-import json
+import sys
+import threading
 import requests
+from contextlib import ExitStack
 from urllib.parse import urlparse, urljoin, quote_plus
 from playwright.sync_api import sync_playwright
-
-# Regex para detectar links de vídeo e IDs numéricos
-VIDEO_EXT_RE = re.compile(r'\.(mp4|m3u8|mpd|mkv)(?:\?.*)?$', re.IGNORECASE)
-ID_RE = re.compile(r'/(\d+)/?$')
-
-# ── AniVideo (animesdigital.org novo) ────────────────────────────────────────
-# Extrai o stream_path do tipo "y/yofukashi-no-uta-2" de uma URL anivideo
-ANIVIDEO_STREAM_RE = re.compile(
-    r'cdn-s\d+\.mywallpaper-4k-image\.net/stream/([a-z]/[^/]+)/',
-    re.IGNORECASE
+from LinkCache import (
+    load_link_cache, save_link_cache, cached_resolve, get_cached_link, put_cached_link,
+    AUDIOS, ALL_AUDIOS, page_groups, as_tracks,
 )
-ANIVIDEO_WRAPPER  = "https://api.anivideo.net/videohls.php"
-ANIVIDEO_CDN_BASE = "https://cdn-s01.mywallpaper-4k-image.net/stream"
-
-def build_anivideo_ep_url(stream_path: str, ep_num: int) -> str:
-    """
-    Monta a URL final do episódio para o player anivideo.net.
-
-    stream_path: ex. "y/yofukashi-no-uta-2"  (letra/slug-temporada)
-    ep_num     : numero do episodio (inteiro)
+from SaidaJson import atomic_open, JsonStreamWriter
+from Normalizar import FORMAT_NAME, normalize_episode, expand_anime, make_iframe_html, build_episode
+from AniVideo import (
+    ANIVIDEO_STREAM_RE, extract_av_base_slug, build_anivideo_stream_path, build_anivideo_ep_url,
+    probe_anivideo_episodes, discover_anivideo_seasons,
+)
+from Catalogo import load_json
+from Historico import fetch_record
+from Memoria import MemoryMonitor, RotatingContext
+from Fazenda import farm_available, run_remote, resolve_tracks_remote
+from SobDemanda import lazy_sources, lazy_embed_url
+from Identidade import load_identity_entries, find_existing, completeness, merge_animes
+from CapturaRede import MediaCapture, media_candidate, PLAY_CLICK_TIMEOUT
+
+# Regex para detectar IDs numéricos
+ID_RE = re.compile(r'/(\d+)/?$')
 
-    URL gerada:
-      https://api.anivideo.net/videohls.php
-        ?d=https://cdn-s01.mywallpaper-4k-image.net/stream/y/yofukashi-no-uta-2/08.mp4/index.m3u8
-        &nocache<timestamp>
-    """
-    ep_str  = f"{ep_num:02d}"               # 1 -> "01", 12 -> "12"
-    cdn_url = f"{ANIVIDEO_CDN_BASE}/{stream_path}/{ep_str}.mp4/index.m3u8"
-    nocache = int(time.time() * 1000)       # timestamp em ms como cache-buster
-    return f"{ANIVIDEO_WRAPPER}?d={cdn_url}&nocache{nocache}"
-def extract_av_base_slug(stream_path: str):
-    """
-    A partir de um stream_path completo, extrai a letra e o slug-base limpo.
+# Saída: indent=2 (legível) ou compacta (menor, mais rápida de carregar)
+OUTPUT_PRETTY = True
+# Formato normalizado (links crus + tabela de hosts; ver Normalizar.py) em vez do completo
+OUTPUT_NORMALIZED = False
 
-    Exemplos:
-      "j/jujutsu-kaisen-3-dublado" -> ("j", "jujutsu-kaisen")
-      "y/yofukashi-no-uta-2"       -> ("y", "yofukashi-no-uta")
-      "j/jujutsu-kaisen"           -> ("j", "jujutsu-kaisen")
-      "j/jujutsu-kaisen-dublado"   -> ("j", "jujutsu-kaisen")
-    """
-    parts = stream_path.split("/", 1)
-    letter = parts[0]
-    slug   = parts[1] if len(parts) > 1 else ""
-    slug   = re.sub(r"-dublado$", "", slug, flags=re.IGNORECASE)  # remove -dublado
-    slug   = re.sub(r"-\d+$",     "", slug)                       # remove -N (numero da temporada)
-    return letter.lower(), slug
-
-def build_anivideo_stream_path(letter: str, base_slug: str, season_num: int, is_dub: bool = False) -> str:
-    """
-    Monta o stream_path para uma temporada e audio especificos.
-
-    Regras:
-      - T1 sub  ->  letter/base_slug
-      - T1 dub  ->  letter/base_slug-dublado
-      - T2 sub  ->  letter/base_slug-2
-      - T2 dub  ->  letter/base_slug-2-dublado
-      - T3 dub  ->  letter/base_slug-3-dublado
-    """
-    path = f"{letter}/{base_slug}"
-    if season_num > 1:
-        path += f"-{season_num}"
-    if is_dub:
-        path += "-dublado"
-    return path
-# ─────────────────────────────────────────────────────────────────────────────
+# Perguntas no terminal feitas de threads (fill_episode_count no FullAsync)
+PROMPT_LOCK = threading.Lock()
 
 # --- FUNÇÕES DE EXTRAÇÃO ---
 
 def fetch_mal_info(query):
     print(f"\n[MAL] Buscando informações de '{query}' no MyAnimeList...")
     url = f"https://api.jikan.moe/v4/anime?q={query}&limit=1"
+    rec = fetch_record("mal", url)
     try:
         response = requests.get(url, timeout=10)
+        rec.response(response)
         response.raise_for_status()
         data = response.json()
         if data.get('data'):
             print("[MAL] Anime encontrado com sucesso!")
-            return data['data'][0]
+            return rec.hit(data['data'][0], "jikan")
     except Exception as e:
         print(f"[MAL] Erro ao buscar dados na API Jikan: {e}")
+        rec.error = str(e)
+    finally:
+        rec.save()
     return None
 
 
@@ -120,6 +89,7 @@ def fetch_crunchyroll_banner(anime_name, context, width=1920, quality=85, blur=0
     """
     print(f"\n[CR] Buscando banner da Crunchyroll para '{anime_name}'...")
     search_url = f"https://www.crunchyroll.com/pt-br/search?q={quote_plus(anime_name)}"
+    rec = fetch_record("banner", search_url)
     page = context.new_page()
     try:
         page.set_extra_http_headers({
@@ -127,7 +97,7 @@ def fetch_crunchyroll_banner(anime_name, context, width=1920, quality=85, blur=0
         })
 
         # 1) Busca na Crunchyroll
-        page.goto(search_url, wait_until="domcontentloaded", timeout=20000)
+        rec.response(page.goto(search_url, wait_until="domcontentloaded", timeout=20000))
         try:
             page.wait_for_selector("a[href*='/series/']", timeout=10000)
         except Exception:
@@ -157,6 +127,7 @@ def fetch_crunchyroll_banner(anime_name, context, width=1920, quality=85, blur=0
             m = CR_KEYART_RE.search(srcset)
             if m:
                 keyart_id = m.group(1)
+                rec.path = "srcset"
                 break
 
         # Fallback: procura em qualquer atributo src/srcset da página inteira
@@ -165,6 +136,7 @@ def fetch_crunchyroll_banner(anime_name, context, width=1920, quality=85, blur=0
             m = CR_KEYART_RE.search(html)
             if m:
                 keyart_id = m.group(1)
+                rec.path = "html"
 
         if not keyart_id:
             print("[CR] keyart ID não encontrado na página.")
@@ -172,12 +144,14 @@ def fetch_crunchyroll_banner(anime_name, context, width=1920, quality=85, blur=0
 
         banner_url = build_crunchyroll_banner_url(keyart_id, width=width, quality=quality, blur=blur, variant=variant)
         print(f"[CR] Banner montado (ID={keyart_id}): {banner_url}")
-        return banner_url
+        return rec.hit(banner_url, rec.path)
 
     except Exception as e:
         print(f"[CR] Erro ao buscar banner: {e}")
+        rec.error = str(e)
         return None
     finally:
+        rec.save()
         try:
             page.close()
         except Exception:
@@ -257,10 +231,12 @@ def extract_next_episode_from_animesonline(page, anime_name=None):
 def extract_episode_links_from_animesdigital(context, sample_ep_url):
     if not sample_ep_url:
         return []
+    rec = fetch_record("episode_list", sample_ep_url)
     page = context.new_page()
     try:
         page.set_extra_http_headers({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
         resp = page.goto(sample_ep_url, wait_until="domcontentloaded", timeout=20000)
+        rec.response(resp)
         if resp and resp.status >= 400:
             print(f"   [!] Erro {resp.status} ao carregar (lista eps): {sample_ep_url}")
             return []
@@ -282,14 +258,32 @@ def extract_episode_links_from_animesdigital(context, sample_ep_url):
                 if href:
                     href = urljoin(sample_ep_url, href)
                     links.append(href)
-        return links
+        return rec.hit(links, "sidebar")
     except Exception as e:
         print(f"   [!] Erro ao extrair lista de episódios (animesdigital): {e}")
+        rec.error = str(e)
         return []
     finally:
+        rec.save()
         try: page.close()
         except: pass
 
+def pick_audio(mapping, desired_audio):
+    """
+    Iframe do áudio pedido no {"dub": ..., "sub": ...} do animesonlinecc (cai no
+    outro áudio se faltar). Com ALL_AUDIOS devolve os dois de uma vez.
+    """
+    dub = mapping.get("dub") or mapping.get("sub")
+    sub = mapping.get("sub") or mapping.get("dub")
+    if desired_audio == ALL_AUDIOS:
+        return {"dub": dub, "sub": sub}
+    return dub if desired_audio == "dub" else sub
+
+def hit_audio(rec, result, path):
+    """rec.hit para o retorno do pick_audio: com ALL_AUDIOS só é sucesso se algum áudio veio."""
+    rec.hit(result if not isinstance(result, dict) or any(result.values()) else None, path)
+    return result
+
 def extract_for_episode(context, ep_url, desired_audio=None, is_animes_online=False, is_animesdigital=False, is_animesonlinecc=False, is_anivideo=False):
     if not ep_url: return None
 
@@ -298,10 +292,14 @@ def extract_for_episode(context, ep_url, desired_audio=None, is_animes_online=Fa
         print(f"   [AV] URL direta (sem browser): {ep_url[:80]}...")
         return ep_url
 
+    rec = fetch_record("episode", ep_url)
     page = context.new_page()
     try:
         page.set_extra_http_headers({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
+        # Captura de mídia ligada antes da navegação (pega os pedidos do carregamento)
+        capture = MediaCapture().attach(page)
         response = page.goto(ep_url, wait_until="domcontentloaded", timeout=30000)
+        rec.response(response)
         if response and response.status >= 400:
             print(f"   [!] Erro {response.status} ao carregar página: {ep_url}")
             return None
@@ -309,16 +307,12 @@ def extract_for_episode(context, ep_url, desired_audio=None, is_animes_online=Fa
         if is_animes_online:
             src = extract_anidrive_iframe(page)
             if src:
-                return src
+                return rec.hit(src, "anidrive")
 
         if is_animesonlinecc:
             mapping = extract_animesonlinecc_iframes(page)
             if mapping:
-                if desired_audio == "dub":
-                    return mapping.get("dub") or mapping.get("sub")
-                if desired_audio == "sub":
-                    return mapping.get("sub") or mapping.get("dub")
-                return mapping.get("sub") or mapping.get("dub")
+                return hit_audio(rec, pick_audio(mapping, desired_audio), "animesonlinecc")
 
             next_ep = extract_next_episode_from_animesonline(page)
             if next_ep:
@@ -327,33 +321,19 @@ def extract_for_episode(context, ep_url, desired_audio=None, is_animes_online=Fa
                     page.goto(next_ep, wait_until="domcontentloaded", timeout=15000)
                     mapping = extract_animesonlinecc_iframes(page)
                     if mapping:
-                        if desired_audio == "dub":
-                            return mapping.get("dub") or mapping.get("sub")
-                        if desired_audio == "sub":
-                            return mapping.get("sub") or mapping.get("dub")
-                        return mapping.get("sub") or mapping.get("dub")
+                        return hit_audio(rec, pick_audio(mapping, desired_audio), "animesonlinecc-next")
                 except:
                     pass
 
         if is_animesdigital:
             src = extract_animesdigital_iframe(page)
             if src:
-                return src
+                return rec.hit(src, "animesdigital")
 
-        found_network = []
-        def on_response(res):
-            try:
-                u = res.url
-                if VIDEO_EXT_RE.search(u):
-                    found_network.append(u)
-            except:
-                pass
-        page.on("response", on_response)
-
-        try:
-            page.wait_for_load_state("networkidle", timeout=6000)
-        except:
-            pass
+        # Fallback: primeiro link de mídia visto na rede (sem esperar networkidle)
+        link = capture.wait(page)
+        if link:
+            return rec.hit(link, "network")
 
         possible_play_selectors = [
             "button.play", ".play-button", ".jw-play-btn", ".plyr__controls .play",
@@ -363,34 +343,73 @@ def extract_for_episode(context, ep_url, desired_audio=None, is_animes_online=Fa
             try:
                 if page.locator(sel).count() > 0:
                     page.click(sel)
-                    page.wait_for_timeout(2000)
+                    link = capture.wait(page, timeout=PLAY_CLICK_TIMEOUT)
+                    if link:
+                        return rec.hit(link, "play-click")
             except:
                 pass
 
-        if found_network:
-            return found_network[0]
-
         if page.locator("iframe").count() > 0:
             for i in range(page.locator("iframe").count()):
                 try:
-                    src = page.locator("iframe").nth(i).get_attribute("src")
-                    if src and VIDEO_EXT_RE.search(src):
-                        return src
-                    if src and "videohls.php" in src and "d=" in src:
-                        m = re.search(r'd=([^&]+)', src)
-                        if m:
-                            return m.group(1)
+                    link = media_candidate(page.locator("iframe").nth(i).get_attribute("src"))
+                    if link:
+                        return rec.hit(link, "iframe-scan")
                 except:
                     pass
 
         return None
     except Exception as e:
         print(f"   [!] Erro na extração ({ep_url}): {e}")
+        rec.error = str(e)
         return None
     finally:
+        rec.save()
         try: page.close()
         except: pass
 
+def resolve_episode_link(context, link_cache, session, ep_url, desired_audio=None, **flags):
+    """
+    extract_for_episode com cache persistente por (URL do episódio, áudio).
+    AniVideo não passa pelo cache: a URL já é montada sem browser.
+    """
+    if not ep_url: return None
+    if flags.get("is_anivideo"):
+        return extract_for_episode(context, ep_url, desired_audio=desired_audio, **flags)
+    return cached_resolve(
+        link_cache, ep_url, desired_audio,
+        lambda: extract_for_episode(context, ep_url, desired_audio=desired_audio, **flags),
+        session=session,
+    )
+
+def resolve_episode_tracks(context, link_cache, session, targets):
+    """
+    Links de todos os áudios de um episódio: {"dub": link, "sub": link}.
+    targets vem do plan_episode_urls. Áudios que apontam para a mesma página
+    (dub+sub do animesonlinecc) são extraídos com uma carga só da página.
+    """
+    links = dict.fromkeys(AUDIOS)
+    for ep_url, flags, audios in page_groups(targets):
+        if len(audios) == 1 or flags.get("is_anivideo"):
+            for audio in audios:
+                links[audio] = resolve_episode_link(context, link_cache, session, ep_url, desired_audio=audio, **flags)
+            continue
+        pending = []
+        for audio in audios:
+            links[audio] = get_cached_link(link_cache, ep_url, audio, session=session)
+            if links[audio]:
+                print(f"   [CACHE] {audio}: {links[audio][:80]}")
+            else:
+                pending.append(audio)
+        if len(pending) == 1:
+            links[pending[0]] = extract_for_episode(context, ep_url, desired_audio=pending[0], **flags)
+        elif pending:
+            links.update(as_tracks(extract_for_episode(context, ep_url, desired_audio=ALL_AUDIOS, **flags), pending))
+        for audio in pending:
+            if links[audio]:
+                put_cached_link(link_cache, ep_url, audio, links[audio])
+    return links
+
 def build_base_info_from_url(url):
     if not url: return None
     domain = urlparse(url).netloc.lower()
@@ -429,10 +448,6 @@ def build_base_info_from_url(url):
         "base_fire":         base_fire,
     }
 
-def make_iframe_html(src):
-    if not src: return ""
-    return f'<iframe width="100%" height="100%" src="{src}" frameborder="0" allowfullscreen></iframe>'
-
 def normalize_yesno(raw: str):
     return (raw or "").strip().lower() in ("s", "sim", "y", "yes", "true", "1")
 
@@ -442,11 +457,13 @@ def prompt_nonempty(prompt_text):
         v = input(prompt_text).strip()
     return v
 
-# --- FUNÇÃO PRINCIPAL ---
-
-def main():
-    print("--- Extrator Universal de Animes (Com Modo Seguro) ---")
+# --- ETAPAS DO RUN (compartilhadas com o FullAsync.py) ---
 
+def prompt_run_config():
+    """
+    Faz as perguntas do run (anime, slug, modo seguro, anivideo, temporadas).
+    Retorna um dict com a configuração, ou None se um número inválido for digitado.
+    """
     anime_name = prompt_nonempty("Nome do Anime (para MAL): ")
     id_prefix = prompt_nonempty("ID Slug para o JSON (ex: bleach): ")
     
@@ -474,16 +491,39 @@ def main():
             is_anivideo_site = False
     # ─────────────────────────────────────────────────────────────────────────
 
+    if is_anivideo_site and av_letter and av_base_slug:
+        raw_seasons = input("Quantas temporadas? (vazio = descobrir automaticamente): ").strip()
+    else:
+        raw_seasons = prompt_nonempty("Quantas temporadas?: ")
+
+    if not raw_seasons:
+        print("\n[AUTO] Sondando os manifests do anivideo...")
+        seasons_input = discover_anivideo_seasons(av_letter, av_base_slug, requests.Session())
+        if not seasons_input:
+            print("[AUTO] Nenhuma temporada encontrada.")
+            return None
+        return {
+            "anime_name": anime_name,
+            "id_prefix": id_prefix,
+            "is_safe_mode": is_safe_mode,
+            "is_anivideo_site": is_anivideo_site,
+            "av_letter": av_letter,
+            "av_base_slug": av_base_slug,
+            "seasons": seasons_input,
+        }
+
     try:
-        total_seasons = int(prompt_nonempty("Quantas temporadas?: "))
-    except ValueError: return
+        total_seasons = int(raw_seasons)
+    except ValueError: return None
 
     seasons_input = []
     for s in range(1, total_seasons + 1):
         print(f"\n--- Configurando Temporada {s} ---")
+        # vazio = descobrir depois (lista do animesdigital, anivideo, Jikan)
+        raw_eps = input(f"Total de episodios da Temporada {s} (vazio = automático): ").strip()
         try:
-            total_eps = int(prompt_nonempty(f"Total de episodios da Temporada {s}: "))
-        except ValueError: return
+            total_eps = int(raw_eps) if raw_eps else None
+        except ValueError: return None
 
         has_dub = normalize_yesno(input(f"Tem Dublado? (s/n): "))
         has_leg = normalize_yesno(input(f"Tem Legendado? (s/n): "))
@@ -504,168 +544,433 @@ def main():
             "url_sub": url_sub_base
         })
 
-    mal_data = fetch_mal_info(anime_name)
+    return {
+        "anime_name": anime_name,
+        "id_prefix": id_prefix,
+        "is_safe_mode": is_safe_mode,
+        "is_anivideo_site": is_anivideo_site,
+        "av_letter": av_letter,
+        "av_base_slug": av_base_slug,
+        "seasons": seasons_input,
+    }
+
+EXISTING_POLICIES = ("perguntar", "estender", "reusar")
+
+def prompt_existing(id_prefix, anime_name, meta, policy="perguntar"):
+    """
+    Procura o anime entre os já extraídos (mesmo malId ou título, em qualquer slug).
+    Retorna ("novo", None), ("reusar", (arquivo, anime)) ou ("estender", (arquivo, anime)).
+    Sem terminal (policy "estender" ou "reusar") usa a entrada mais completa sem perguntar.
+    """
+    probe = {"id": id_prefix, "malId": meta["mal_id"], "title": anime_name,
+             "titleRomaji": meta["title_romaji"], "titleJapanese": meta["title_japanese"]}
+    found = find_existing(load_identity_entries(), probe)
+    if not found:
+        return "novo", None
+    if policy != "perguntar":
+        print(f"\n[JÁ EXTRAÍDO] {anime_name} já existe como {found[0][1]['id']} em {found[0][0]}: {policy}.")
+        return policy, found[0]
+    print("\n[JÁ EXTRAÍDO] Este anime já existe:")
+    for n, (path, anime) in enumerate(found, start=1):
+        seasons = ", ".join(f"T{s.get('season')}: {len(s.get('episodeList') or [])} eps" for s in anime.get("seasons") or [])
+        print(f"   {n}) {anime['id']} ({completeness(anime)} embeds) em {path} [{seasons or 'sem temporadas'}]")
+    choice = input("[r]eusar (não extrai nada), [e]stender (só o que falta) ou [n]ovo (extrai tudo)? [e]: ").strip().lower()
+    if choice.startswith("n"):
+        return "novo", None
+    pick = found[0]
+    if len(found) > 1:
+        raw = input(f"Qual entrada? (1-{len(found)}) [1]: ").strip()
+        if raw.isdigit() and 1 <= int(raw) <= len(found):
+            pick = found[int(raw) - 1]
+    return ("reusar" if choice.startswith("r") else "estender"), pick
+
+def known_episodes(anime):
+    """(temporada, número) -> episódio de uma entrada já extraída."""
+    return {
+        (season.get("season"), ep.get("number")): ep
+        for season in (anime or {}).get("seasons") or []
+        for ep in season.get("episodeList") or []
+    }
+
+def skip_known_audios(targets, known_ep):
+    """Tira dos targets os áudios que o episódio já extraído tem (modo estender)."""
+    embeds = (known_ep or {}).get("embeds") or {}
+    return {audio: (None if embeds.get(audio) else targets.get(audio)) for audio in AUDIOS}
+
+def merge_into_existing(output_file, existing_anime):
+    """Modo estender: o que foi pulado (e as temporadas não pedidas) vem da entrada existente."""
+    merged = merge_animes(expand_anime(load_json(output_file)), [existing_anime])
+    merged_header = {k: v for k, v in merged.items() if k != "seasons"}
+    if OUTPUT_NORMALIZED:
+        merged_header["format"] = FORMAT_NAME
+    write_anime_json(output_file, merged_header, (
+        ({k: v for k, v in season.items() if k != "episodeList"}, season["episodeList"])
+        for season in merged["seasons"]
+    ))
+
+def mal_metadata(mal_data, anime_name):
+    """Campos do anime vindos do MAL (ou os padrões quando o MAL não respondeu)."""
     if mal_data:
-        title_romaji = mal_data.get('title', anime_name)
-        title_japanese = mal_data.get('title_japanese', anime_name)
-        genres = [g['name'] for g in mal_data.get('genres', [])]
         studios = [s['name'] for s in mal_data.get('studios', [])]
-        studio_name = studios[0] if studios else "Desconhecido"
-        mal_id = mal_data.get('mal_id', 0)
-        cover_image = mal_data.get('images', {}).get('jpg', {}).get('large_image_url', '')
-        score = mal_data.get('score', 0.0)
-        synopsis = mal_data.get('synopsis', 'Sem sinopse disponível.')
-        trailer_url = mal_data.get('trailer', {}).get('url', '')
-        base_year = mal_data.get('year', 2024)
-        status_api = "finished" if mal_data.get('status') == "Finished Airing" else "ongoing"
+        return {
+            "title_romaji": mal_data.get('title', anime_name),
+            "title_japanese": mal_data.get('title_japanese', anime_name),
+            "genres": [g['name'] for g in mal_data.get('genres', [])],
+            "studio_name": studios[0] if studios else "Desconhecido",
+            "mal_id": mal_data.get('mal_id', 0),
+            "cover_image": mal_data.get('images', {}).get('jpg', {}).get('large_image_url', ''),
+            "score": mal_data.get('score', 0.0),
+            "synopsis": mal_data.get('synopsis', 'Sem sinopse disponível.'),
+            "trailer_url": mal_data.get('trailer', {}).get('url', ''),
+            "base_year": mal_data.get('year', 2024),
+            "status_api": "finished" if mal_data.get('status') == "Finished Airing" else "ongoing",
+            "episodes": mal_data.get('episodes'),
+        }
+    return {
+        "title_romaji": anime_name, "title_japanese": anime_name,
+        "genres": ["Ação"], "studio_name": "Desconhecido", "mal_id": 0,
+        "cover_image": "", "score": 0.0, "synopsis": "", "trailer_url": "",
+        "base_year": 2024, "status_api": "finished", "episodes": None,
+    }
+
+def build_anime_header(id_prefix, meta, banner_image):
+    anime_header = {
+        "id": id_prefix,
+        "title": meta["title_romaji"],
+        "titleRomaji": meta["title_romaji"],
+        "titleJapanese": meta["title_japanese"],
+        "genre": meta["genres"],
+        "studio": meta["studio_name"],
+        "recommended": True,
+        "malId": meta["mal_id"],
+        "coverImage": meta["cover_image"],
+        # ── bannerImage agora vem da Crunchyroll ──
+        "bannerImage": banner_image,
+    }
+    if OUTPUT_NORMALIZED:
+        anime_header["format"] = FORMAT_NAME
+    return anime_header
+
+def _audio_eps(s_data, key):
+    return s_data["total_eps"] if s_data.get(key) is None else s_data[key]
+
+def build_season_header(s_data, meta, total_seasons):
+    s_num = s_data["season_num"]
+    total_eps = s_data["total_eps"]
+    return {
+        "season": s_num,
+        "seasonLabel": f"{s_num}ª Temporada",
+        "year": meta["base_year"],
+        "episodes": total_eps,
+        "currentEpisode": total_eps,
+        "status": meta["status_api"] if s_num == total_seasons else "finished",
+        "score": meta["score"],
+        "synopsis": meta["synopsis"],
+        "trailer": meta["trailer_url"],
+        "audios": [
+            {"type": "sub", "label": "Legendado", "available": s_data["has_leg"], "episodesAvailable": _audio_eps(s_data, "eps_sub")},
+            {"type": "dub", "label": "Dublado", "available": s_data["has_dub"], "episodesAvailable": _audio_eps(s_data, "eps_dub")}
+        ],
+    }
+
+def season_base_info(s_data):
+    dub_info = build_base_info_from_url(s_data["url_dub"]) if s_data["url_dub"] else None
+    sub_info = build_base_info_from_url(s_data["url_sub"]) if s_data["url_sub"] else None
+    return dub_info, sub_info
+
+def season_episode_lists(fetch_list, cfg, s_data, dub_info, sub_info):
+    """
+    Lista de episódios da sidebar do animesdigital (DUB, SUB); vazia para outros sites.
+    fetch_list(url) faz a extração (browser local ou fazenda).
+    """
+    dub_episode_list = []
+    sub_episode_list = []
+    if not cfg["is_safe_mode"]:
+        if dub_info and dub_info.get("is_animesdigital"):
+            dub_episode_list = fetch_list(s_data["url_dub"]) or []
+            if dub_episode_list:
+                print(f"   [OK] Encontrados {len(dub_episode_list)} episódios (DUB) em animesdigital.")
+        if sub_info and sub_info.get("is_animesdigital"):
+            sub_episode_list = fetch_list(s_data["url_sub"]) or []
+            if sub_episode_list:
+                print(f"   [OK] Encontrados {len(sub_episode_list)} episódios (SUB) em animesdigital.")
+    return dub_episode_list, sub_episode_list
+
+def plan_episode_urls(cfg, s_data, i, dub_info, sub_info, dub_episode_list, sub_episode_list):
+    """
+    Decide a URL e as flags do extrator de cada áudio do episódio i.
+    Retorna {"dub": (url, flags) ou None, "sub": (url, flags) ou None}.
+    No modo seguro as URLs são pedidas aqui.
+    """
+    s_num = s_data["season_num"]
+    is_anivideo_site = cfg["is_anivideo_site"]
+    av_letter = cfg["av_letter"]
+    av_base_slug = cfg["av_base_slug"]
+
+    if cfg["is_safe_mode"]:
+        current_url_dub = prompt_nonempty(f"Link DUB Ep {i}: ") if s_data["has_dub"] else None
+        current_url_sub = prompt_nonempty(f"Link LEG Ep {i}: ") if s_data["has_leg"] else None
+        is_ao_dub = "animesonline" in (current_url_dub or "")
+        is_ao_sub = "animesonline" in (current_url_sub or "")
+        is_ad_dub = "animesdigital" in (current_url_dub or "")
+        is_ad_sub = "animesdigital" in (current_url_sub or "")
+        is_ao_cc_dub = "animesonlinecc" in (current_url_dub or "")
+        is_ao_cc_sub = "animesonlinecc" in (current_url_sub or "")
+        is_av_dub    = "anivideo.net" in (current_url_dub or "") or "mywallpaper-4k-image.net" in (current_url_dub or "")
+        is_av_sub    = "anivideo.net" in (current_url_sub or "") or "mywallpaper-4k-image.net" in (current_url_sub or "")
+    else:
+        # ── AniVideo: monta URL pelo slug-base + temporada + audio ───────
+        if is_anivideo_site and av_letter and av_base_slug:
+            if s_data["has_dub"]:
+                sp_dub = build_anivideo_stream_path(av_letter, av_base_slug, s_num, is_dub=True)
+                current_url_dub = build_anivideo_ep_url(sp_dub, i)
+            else:
+                current_url_dub = None
+            if s_data["has_leg"]:
+                sp_sub = build_anivideo_stream_path(av_letter, av_base_slug, s_num, is_dub=False)
+                current_url_sub = build_anivideo_ep_url(sp_sub, i)
+            else:
+                current_url_sub = None
+        # ── Outros sites: usa dub_info/sub_info como antes ───────────────
+        elif dub_info and dub_info.get("is_animesdigital") and dub_episode_list:
+            current_url_dub = dub_episode_list[i-1] if i-1 < len(dub_episode_list) else None
+        else:
+            current_url_dub = (f'{dub_info["base_site"]}{dub_info["start_id"] + i - 1}/' if dub_info and dub_info.get("is_animesonline") else (f'{dub_info["base_fire"]}/{i}' if dub_info else None))
+
+        if not is_anivideo_site:
+            if sub_info and sub_info.get("is_animesdigital") and sub_episode_list:
+                current_url_sub = sub_episode_list[i-1] if i-1 < len(sub_episode_list) else None
+            else:
+                current_url_sub = (f'{sub_info["base_site"]}{sub_info["start_id"] + i - 1}/' if sub_info and sub_info.get("is_animesonline") else (f'{sub_info["base_fire"]}/{i}' if sub_info else None))
+        # ─────────────────────────────────────────────────────────────────
+
+        is_ao_dub    = (dub_info["is_animesonline"]   if dub_info else False) if not is_anivideo_site else False
+        is_ao_sub    = (sub_info["is_animesonline"]   if sub_info else False) if not is_anivideo_site else False
+        is_ad_dub    = (dub_info["is_animesdigital"]  if dub_info else False) if not is_anivideo_site else False
+        is_ad_sub    = (sub_info["is_animesdigital"]  if sub_info else False) if not is_anivideo_site else False
+        is_ao_cc_dub = (dub_info["is_animesonlinecc"] if dub_info else False) if not is_anivideo_site else False
+        is_ao_cc_sub = (sub_info["is_animesonlinecc"] if sub_info else False) if not is_anivideo_site else False
+        is_av_dub    = is_anivideo_site and s_data["has_dub"]
+        is_av_sub    = is_anivideo_site and s_data["has_leg"]
+
+    # Contagem por áudio conhecida (auto-descoberta): não monta URL de episódio que não existe
+    if s_data.get("eps_dub") is not None and i > s_data["eps_dub"]:
+        current_url_dub = None
+    if s_data.get("eps_sub") is not None and i > s_data["eps_sub"]:
+        current_url_sub = None
+
+    flags_dub = dict(is_animes_online=is_ao_dub, is_animesdigital=is_ad_dub, is_animesonlinecc=is_ao_cc_dub, is_anivideo=is_av_dub)
+    flags_sub = dict(is_animes_online=is_ao_sub, is_animesdigital=is_ad_sub, is_animesonlinecc=is_ao_cc_sub, is_anivideo=is_av_sub)
+    return {
+        "dub": (current_url_dub, flags_dub) if current_url_dub else None,
+        "sub": (current_url_sub, flags_sub) if current_url_sub else None,
+    }
+
+def fill_episode_count(cfg, s_data, dub_info, sub_info, dub_episode_list, sub_episode_list, mal_episodes=None, session=None):
+    """
+    Completa total_eps de uma temporada deixada como automática (None), na ordem:
+    lista da sidebar do animesdigital, sondagem dos manifests do anivideo, campo
+    'episodes' do Jikan (só se o anime tem uma temporada) e, por último, pergunta.
+    """
+    if s_data["total_eps"] is not None:
+        return s_data
+    s_num = s_data["season_num"]
+
+    # Só conta o áudio cuja lista veio mesmo do animesdigital; o outro (outro site ou
+    # lista que falhou) fica None e usa o total da temporada
+    eps_dub = len(dub_episode_list) if dub_info and dub_info.get("is_animesdigital") and dub_episode_list else None
+    eps_sub = len(sub_episode_list) if sub_info and sub_info.get("is_animesdigital") and sub_episode_list else None
+    if eps_dub or eps_sub:
+        source = "lista do animesdigital"
+        if eps_dub:
+            s_data["eps_dub"] = eps_dub
+        if eps_sub:
+            s_data["eps_sub"] = eps_sub
+        total = max(eps_dub or 0, eps_sub or 0)
+    elif cfg["is_anivideo_site"] and cfg["av_letter"] and cfg["av_base_slug"]:
+        source = "manifests do anivideo"
+        if s_data["has_dub"]:
+            s_data["eps_dub"] = probe_anivideo_episodes(cfg["av_letter"], cfg["av_base_slug"], s_num, True, session)
+        if s_data["has_leg"]:
+            s_data["eps_sub"] = probe_anivideo_episodes(cfg["av_letter"], cfg["av_base_slug"], s_num, False, session)
+        total = max(s_data.get("eps_dub") or 0, s_data.get("eps_sub") or 0)
+    elif mal_episodes and len(cfg["seasons"]) == 1:
+        source = "Jikan"
+        total = mal_episodes
     else:
-        title_romaji = title_japanese = anime_name
-        genres = ["Ação"]; studio_name = "Desconhecido"; mal_id = 0
-        cover_image = ""; score = 0.0; synopsis = ""; trailer_url = ""; base_year = 2024; status_api = "finished"
+        total = None
+        with PROMPT_LOCK:   # o FullAsync completa as temporadas em threads: uma pergunta por vez
+            while total is None:
+                try:
+                    total = int(prompt_nonempty(f"Não foi possível descobrir. Total de episodios da Temporada {s_num}: "))
+                except ValueError:
+                    pass
+        source = "digitado"
+
+    s_data["total_eps"] = total
+    print(f"   [AUTO] T{s_num}: {total} episódios ({source})")
+    return s_data
+
+def build_lazy_episode(id_prefix, title_romaji, s_num, i, targets):
+    """
+    Episódio sem link resolvido (--sob-demanda): guarda a página e o adaptador de cada
+    áudio em "sources" e o embed aponta para o SobDemanda, que extrai no primeiro play.
+    """
+    episode = build_episode(id_prefix, title_romaji, s_num, i, None, None)
+    sources = lazy_sources(targets)
+    episode["embeds"] = {audio: make_iframe_html(lazy_embed_url(episode["id"], audio)) for audio in sources}
+    episode["sources"] = sources
+    page = (sources.get("dub") or sources.get("sub") or {}).get("url")
+    if page:
+        try: episode["embedCredit"] = (urlparse(page).hostname or "").replace("www.", "")
+        except: pass
+    return episode
+
+def write_anime_json(output_file, anime_header, seasons):
+    """
+    Grava o JSON do anime em streaming num temporário: cada episódio vai para o disco
+    assim que chega e o arquivo final só aparece (via rename) no fim do run.
+
+    seasons: iterável de (season_header, episódios); os episódios podem ser um gerador.
+    """
+    with atomic_open(output_file) as fp:
+        out = JsonStreamWriter(fp, pretty=OUTPUT_PRETTY)
+        out.begin_object()
+        for key, value in anime_header.items():
+            out.write(value, key=key)
+        out.begin_array("seasons")
+
+        for season_header, episodes in seasons:
+            out.begin_object()
+            for key, value in season_header.items():
+                out.write(value, key=key)
+            out.begin_array("episodeList")
+            season_hosts = []
+            for episode in episodes:
+                if OUTPUT_NORMALIZED:
+                    episode = normalize_episode(episode, season_hosts, anime_header, season_header["season"])
+                out.write(episode)
+            out.end_array()
+            if OUTPUT_NORMALIZED:
+                out.write(season_hosts, key="embedHosts")
+            out.end_object()
+
+        out.end_array()
+        out.end_object()
 
-    all_seasons_data = []
+# --- FUNÇÃO PRINCIPAL ---
+
+def main():
+    if "--async" in sys.argv:
+        from FullAsync import main as async_main   # motor assíncrono (async_playwright + aiohttp)
+        return async_main()
+
+    use_farm = "--fazenda" in sys.argv
+    # Sob demanda: só monta as URLs das páginas; os links são resolvidos pelo SobDemanda no play
+    lazy = "--sob-demanda" in sys.argv
+    # Episódios já vão direto para o disco; este modo ainda renova o contexto e mede o pico de RSS
+    monitor = MemoryMonitor() if "--memoria-limitada" in sys.argv else None
+    if use_farm and not farm_available():
+        print("[FAZENDA] Servidor fora do ar (suba com: python Api/Fazenda.py servir).")
+        return
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
+    print("--- Extrator Universal de Animes (Com Modo Seguro) ---")
+
+    cfg = prompt_run_config()
+    if not cfg: return
+
+    anime_name = cfg["anime_name"]
+    id_prefix = cfg["id_prefix"]
+    total_seasons = len(cfg["seasons"])
+
+    meta = mal_metadata(fetch_mal_info(anime_name), anime_name)
+
+    # Mesmo anime já extraído com outro slug (malId/título): reusa ou estende em vez de refazer tudo
+    mode, existing = prompt_existing(id_prefix, anime_name, meta)
+    if mode == "reusar":
+        print(f"\n[JÁ EXTRAÍDO] Nada a fazer: usando {existing[0]}.")
+        return
+    existing_anime = existing[1] if existing else None
+    known = known_episodes(existing_anime)
+    if existing_anime:
+        id_prefix = existing_anime["id"]
+        print(f"[JÁ EXTRAÍDO] Estendendo '{id_prefix}': só episódios/áudios que faltam serão extraídos.")
+
+    output_file = f"{id_prefix}_completo.json"
+
+    # Cache de links resolvidos em runs anteriores (só re-extrai o que morreu)
+    link_cache = load_link_cache()
+    check_session = requests.Session()
+
+    with ExitStack() as stack:
+        if use_farm:
+            # Fazenda: nenhum Chromium aberto aqui; os jobs vão para o servidor local
+            fetch_banner = lambda: run_remote("banner", {"anime_name": anime_name})
+            fetch_list = lambda url: run_remote("episode_list", {"url": url})
+            resolve_tracks = resolve_tracks_remote
+        else:
+            p = stack.enter_context(sync_playwright())
+            browser = p.chromium.launch(headless=True)
+            stack.callback(browser.close)
+            if monitor:
+                # Memória limitada: contexto renovado a cada ROTATE_EVERY páginas
+                context = RotatingContext(browser, monitor=monitor)
+                stack.callback(context.close)
+            else:
+                context = browser.new_context()
+            fetch_banner = lambda: fetch_crunchyroll_banner(anime_name, context)
+            fetch_list = lambda url: extract_episode_links_from_animesdigital(context, url)
+            resolve_tracks = lambda episodes: (
+                resolve_episode_tracks(context, link_cache, check_session, targets) for targets in episodes
+            )
 
         # ── NOVO: busca o banner na Crunchyroll ──────────────────────────────
-        banner_image = fetch_crunchyroll_banner(anime_name, context)
+        banner_image = fetch_banner()
         if not banner_image:
             print("[CR] Banner não encontrado, usando coverImage como fallback.")
-            banner_image = cover_image  # fallback para a capa do MAL
+            banner_image = meta["cover_image"]  # fallback para a capa do MAL
         # ─────────────────────────────────────────────────────────────────────
 
-        for s_data in seasons_input:
+        anime_header = build_anime_header(id_prefix, meta, banner_image)
+
+        def season_episodes(s_data, dub_info, sub_info, dub_episode_list, sub_episode_list):
             s_num = s_data["season_num"]
             total_eps = s_data["total_eps"]
-            
-            dub_info = build_base_info_from_url(s_data["url_dub"]) if s_data["url_dub"] else None
-            sub_info = build_base_info_from_url(s_data["url_sub"]) if s_data["url_sub"] else None
-            
-            dub_episode_list = []
-            sub_episode_list = []
-            if not is_safe_mode:
-                if dub_info and dub_info.get("is_animesdigital"):
-                    dub_episode_list = extract_episode_links_from_animesdigital(context, s_data["url_dub"])
-                    if dub_episode_list:
-                        print(f"   [OK] Encontrados {len(dub_episode_list)} episódios (DUB) em animesdigital.")
-                if sub_info and sub_info.get("is_animesdigital"):
-                    sub_episode_list = extract_episode_links_from_animesdigital(context, s_data["url_sub"])
-                    if sub_episode_list:
-                        print(f"   [OK] Encontrados {len(sub_episode_list)} episódios (SUB) em animesdigital.")
-
-            episodes_list = []
-
-            for i in range(1, total_eps + 1):
-                print(f"\n--- Preparando Episódio {i}/{total_eps} (T{s_num}) ---")
-                
-                if is_safe_mode:
-                    current_url_dub = prompt_nonempty(f"Link DUB Ep {i}: ") if s_data["has_dub"] else None
-                    current_url_sub = prompt_nonempty(f"Link LEG Ep {i}: ") if s_data["has_leg"] else None
-                    is_ao_dub = "animesonline" in (current_url_dub or "")
-                    is_ao_sub = "animesonline" in (current_url_sub or "")
-                    is_ad_dub = "animesdigital" in (current_url_dub or "")
-                    is_ad_sub = "animesdigital" in (current_url_sub or "")
-                    is_ao_cc_dub = "animesonlinecc" in (current_url_dub or "")
-                    is_ao_cc_sub = "animesonlinecc" in (current_url_sub or "")
-                    is_av_dub    = "anivideo.net" in (current_url_dub or "") or "mywallpaper-4k-image.net" in (current_url_dub or "")
-                    is_av_sub    = "anivideo.net" in (current_url_sub or "") or "mywallpaper-4k-image.net" in (current_url_sub or "")
-                else:
-                    # ── AniVideo: monta URL pelo slug-base + temporada + audio ───────
-                    if is_anivideo_site and av_letter and av_base_slug:
-                        if s_data["has_dub"]:
-                            sp_dub = build_anivideo_stream_path(av_letter, av_base_slug, s_num, is_dub=True)
-                            current_url_dub = build_anivideo_ep_url(sp_dub, i)
-                        else:
-                            current_url_dub = None
-                        if s_data["has_leg"]:
-                            sp_sub = build_anivideo_stream_path(av_letter, av_base_slug, s_num, is_dub=False)
-                            current_url_sub = build_anivideo_ep_url(sp_sub, i)
-                        else:
-                            current_url_sub = None
-                    # ── Outros sites: usa dub_info/sub_info como antes ───────────────
-                    elif dub_info and dub_info.get("is_animesdigital") and dub_episode_list:
-                        current_url_dub = dub_episode_list[i-1] if i-1 < len(dub_episode_list) else None
-                    else:
-                        current_url_dub = (f'{dub_info["base_site"]}{dub_info["start_id"] + i - 1}/' if dub_info and dub_info.get("is_animesonline") else (f'{dub_info["base_fire"]}/{i}' if dub_info else None))
-
-                    if not is_anivideo_site:
-                        if sub_info and sub_info.get("is_animesdigital") and sub_episode_list:
-                            current_url_sub = sub_episode_list[i-1] if i-1 < len(sub_episode_list) else None
-                        else:
-                            current_url_sub = (f'{sub_info["base_site"]}{sub_info["start_id"] + i - 1}/' if sub_info and sub_info.get("is_animesonline") else (f'{sub_info["base_fire"]}/{i}' if sub_info else None))
-                    # ─────────────────────────────────────────────────────────────────
-
-                    is_ao_dub    = (dub_info["is_animesonline"]   if dub_info else False) if not is_anivideo_site else False
-                    is_ao_sub    = (sub_info["is_animesonline"]   if sub_info else False) if not is_anivideo_site else False
-                    is_ad_dub    = (dub_info["is_animesdigital"]  if dub_info else False) if not is_anivideo_site else False
-                    is_ad_sub    = (sub_info["is_animesdigital"]  if sub_info else False) if not is_anivideo_site else False
-                    is_ao_cc_dub = (dub_info["is_animesonlinecc"] if dub_info else False) if not is_anivideo_site else False
-                    is_ao_cc_sub = (sub_info["is_animesonlinecc"] if sub_info else False) if not is_anivideo_site else False
-                    is_av_dub    = is_anivideo_site and s_data["has_dub"]
-                    is_av_sub    = is_anivideo_site and s_data["has_leg"]
-
-                d_link = extract_for_episode(context, current_url_dub, desired_audio="dub", is_animes_online=is_ao_dub, is_animesdigital=is_ad_dub, is_animesonlinecc=is_ao_cc_dub, is_anivideo=is_av_dub) if current_url_dub else None
-                s_link = extract_for_episode(context, current_url_sub, desired_audio="sub", is_animes_online=is_ao_sub, is_animesdigital=is_ad_sub, is_animesonlinecc=is_ao_cc_sub, is_anivideo=is_av_sub) if current_url_sub else None
-
-                embeds = {}
-                embed_credit = "animesonlinecc.to"
-                if s_link:
-                    embeds["sub"] = make_iframe_html(s_link)
-                    try: embed_credit = urlparse(s_link).hostname or embed_credit
-                    except: pass
-                if d_link:
-                    embeds["dub"] = make_iframe_html(d_link)
-                    try: embed_credit = urlparse(d_link).hostname or embed_credit
-                    except: pass
-
-                episodes_list.append({
-                    "id": f"{id_prefix}-s{s_num}-ep{i}",
-                    "number": i,
-                    "title": f"{title_romaji} - T{s_num} Episódio {i}",
-                    "season": str(s_num),
-                    "embeds": embeds,
-                    "embedCredit": embed_credit.replace("www.", "") if embed_credit else ""
-                })
-
-            all_seasons_data.append({
-                "season": s_num,
-                "seasonLabel": f"{s_num}ª Temporada",
-                "year": base_year,
-                "episodes": total_eps,
-                "currentEpisode": total_eps,
-                "status": status_api if s_num == total_seasons else "finished",
-                "score": score,
-                "synopsis": synopsis,
-                "trailer": trailer_url,
-                "audios": [
-                    {"type": "sub", "label": "Legendado", "available": s_data["has_leg"], "episodesAvailable": total_eps},
-                    {"type": "dub", "label": "Dublado", "available": s_data["has_dub"], "episodesAvailable": total_eps}
-                ],
-                "episodeList": episodes_list
-            })
-
-        browser.close()
-
-    final_json = {
-        "id": id_prefix,
-        "title": title_romaji,
-        "titleRomaji": title_romaji,
-        "titleJapanese": title_japanese,
-        "genre": genres,
-        "studio": studio_name,
-        "recommended": True,
-        "malId": mal_id,
-        "coverImage": cover_image,
-        # ── bannerImage agora vem da Crunchyroll ──
-        "bannerImage": banner_image,
-        "seasons": all_seasons_data
-    }
 
-    with open(f"{id_prefix}_completo.json", "w", encoding="utf-8") as f:
-        json.dump(final_json, f, ensure_ascii=False, indent=2)
-    print(f"\n[Sucesso] Arquivo {id_prefix}_completo.json gerado!")
+            def episodes():
+                for i in range(1, total_eps + 1):
+                    print(f"\n--- Preparando Episódio {i}/{total_eps} (T{s_num}) ---")
+                    targets = plan_episode_urls(cfg, s_data, i, dub_info, sub_info, dub_episode_list, sub_episode_list)
+                    yield skip_known_audios(targets, known.get((s_num, i))) if known else targets
+
+            if lazy:
+                for i, targets in enumerate(episodes(), start=1):
+                    yield build_lazy_episode(id_prefix, meta["title_romaji"], s_num, i, targets)
+                return
+
+            # Local: resolve um por vez, na ordem. Fazenda: envia a temporada toda e recebe na ordem.
+            for i, links in enumerate(resolve_tracks(episodes()), start=1):
+                yield build_episode(id_prefix, meta["title_romaji"], s_num, i, links["dub"], links["sub"])
+            if not use_farm:
+                save_link_cache(link_cache)
+
+        def season_entry(s_data):
+            dub_info, sub_info = season_base_info(s_data)
+            dub_episode_list, sub_episode_list = season_episode_lists(fetch_list, cfg, s_data, dub_info, sub_info)
+            fill_episode_count(cfg, s_data, dub_info, sub_info, dub_episode_list, sub_episode_list, meta["episodes"], check_session)
+            return (
+                build_season_header(s_data, meta, total_seasons),
+                season_episodes(s_data, dub_info, sub_info, dub_episode_list, sub_episode_list),
+            )
+
+        write_anime_json(output_file, anime_header, (season_entry(s_data) for s_data in cfg["seasons"]))
+
+    if existing_anime:
+        merge_into_existing(output_file, existing_anime)
+
+    print(f"\n[Sucesso] Arquivo {output_file} gerado!")
+    if monitor:
+        monitor.report(rotations=None if use_farm else context.rotations)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
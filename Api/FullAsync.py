@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Motor assíncrono de extração (async_playwright + aiohttp).
+
+Mesmos extratores do Full.py (anidrive, animesdigital, animesonlinecc com o
+salto para o próximo episódio e o fallback por captura de rede), mas tudo roda
+num único event loop: a busca no MAL, o banner da Crunchyroll, a lista de
+episódios do animesdigital e as páginas dos episódios andam ao mesmo tempo,
+com no máximo MAX_PAGES abas abertas. Uma página lenta não segura as outras.
+
+As perguntas, a montagem das URLs e o JSON gerado são os do Full.py (mesmas
+funções), então o resultado é o mesmo arquivo <slug>_completo.json.
+
+Para código síncrono há wrappers finos: main(), extract_episodes() e
+fetch_html_many().
+
+Uso:
+  python Api/FullAsync.py        # mesmas perguntas do Full.py
+  python Api/Full.py --async     # idem
+  python Api/FullAsync.py --memoria-limitada
+"""
+
+import sys
+import json
+import asyncio
+import aiohttp
+import requests
+from urllib.parse import urljoin, quote_plus
+from playwright.async_api import async_playwright
+
+from CapturaRede import MediaCapture, media_candidate, PLAY_CLICK_TIMEOUT
+from Full import (
+    CR_KEYART_RE, build_crunchyroll_banner_url, pick_audio, hit_audio,
+    prompt_run_config, mal_metadata, build_anime_header, build_season_header,
+    season_base_info, plan_episode_urls, fill_episode_count, build_episode, build_lazy_episode, write_anime_json,
+    EXISTING_POLICIES, prompt_existing, known_episodes, skip_known_audios, merge_into_existing,
+)
+from GetAnimeInfo import HEADERS as PAGE_HEADERS
+from Historico import fetch_record
+from LinkCache import (
+    load_link_cache, save_link_cache, get_cached_link, put_cached_link,
+    AUDIOS, ALL_AUDIOS, page_groups, as_tracks,
+)
+from Memoria import (
+    MemoryMonitor, AsyncRotatingContext, BOUNDED_MAX_PAGES, spill_season, load_spilled,
+)
+
+MAX_PAGES = 4          # abas abertas ao mesmo tempo
+HTTP_TIMEOUT = 15
+
+UA_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+PLAY_SELECTORS = [
+    "button.play", ".play-button", ".jw-play-btn", ".plyr__controls .play",
+    ".vjs-big-play-button", ".play", "#play", ".watch-btn", ".btn-play"
+]
+
+
+# ── HTTP (aiohttp) ───────────────────────────────────────────────────────────
+
+async def fetch_mal_info_async(http, query):
+    print(f"\n[MAL] Buscando informações de '{query}' no MyAnimeList...")
+    rec = fetch_record("mal", "https://api.jikan.moe/v4/anime?q=" + quote_plus(query))
+    try:
+        async with http.get(
+            "https://api.jikan.moe/v4/anime",
+            params={"q": query, "limit": 1},
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as response:
+            rec.http_status = response.status
+            response.raise_for_status()
+            body = await response.read()
+            rec.bytes = len(body)
+            data = json.loads(body)
+        if data.get('data'):
+            print("[MAL] Anime encontrado com sucesso!")
+            return rec.hit(data['data'][0], "jikan")
+    except Exception as e:
+        print(f"[MAL] Erro ao buscar dados na API Jikan: {e}")
+        rec.error = str(e)
+    finally:
+        rec.save()
+    return None
+
+async def fetch_html_async(http, url, timeout=HTTP_TIMEOUT):
+    """Versão async do GetAnimeInfo.fetch_html (None em caso de erro)."""
+    rec = fetch_record("info", url)
+    try:
+        async with http.get(url, headers=PAGE_HEADERS, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            rec.http_status = r.status
+            r.raise_for_status()
+            text = await r.text()
+            rec.bytes = len(text.encode("utf-8"))
+            return rec.hit(text, "html")
+    except Exception as e:
+        print(f"Erro ao buscar {url}: {e}")
+        rec.error = str(e)
+        return None
+    finally:
+        rec.save()
+
+
+# ── Extratores (mesma lógica do Full.py) ────────────────────────────────────
+
+async def fetch_crunchyroll_banner_async(anime_name, context, width=1920, quality=85, blur=0, variant="backdrop_wide"):
+    print(f"\n[CR] Buscando banner da Crunchyroll para '{anime_name}'...")
+    search_url = f"https://www.crunchyroll.com/pt-br/search?q={quote_plus(anime_name)}"
+    rec = fetch_record("banner", search_url)
+    page = None
+    try:
+        page = await context.new_page()
+        await page.set_extra_http_headers(UA_HEADERS)
+
+        rec.response(await page.goto(search_url, wait_until="domcontentloaded", timeout=20000))
+        try:
+            await page.wait_for_selector("a[href*='/series/']", timeout=10000)
+        except Exception:
+            print("[CR] Nenhum resultado de série encontrado na busca.")
+            return None
+
+        series_href = await page.locator("a[href*='/series/']").first.get_attribute("href")
+        if not series_href:
+            print("[CR] href da série não encontrado.")
+            return None
+        series_url = urljoin("https://www.crunchyroll.com", series_href)
+        print(f"[CR] Acessando: {series_url}")
+        await page.goto(series_url, wait_until="domcontentloaded", timeout=20000)
+
+        try:
+            await page.wait_for_selector("source[srcset*='keyart']", timeout=8000)
+        except Exception:
+            pass  # tenta mesmo assim
+
+        keyart_id = None
+        for source in await page.locator("source[srcset*='keyart']").all():
+            m = CR_KEYART_RE.search(await source.get_attribute("srcset") or "")
+            if m:
+                keyart_id = m.group(1)
+                rec.path = "srcset"
+                break
+        if not keyart_id:
+            m = CR_KEYART_RE.search(await page.content())
+            if m:
+                keyart_id = m.group(1)
+                rec.path = "html"
+
+        if not keyart_id:
+            print("[CR] keyart ID não encontrado na página.")
+            return None
+
+        banner_url = build_crunchyroll_banner_url(keyart_id, width=width, quality=quality, blur=blur, variant=variant)
+        print(f"[CR] Banner montado (ID={keyart_id}): {banner_url}")
+        return rec.hit(banner_url, rec.path)
+
+    except Exception as e:
+        print(f"[CR] Erro ao buscar banner: {e}")
+        rec.error = str(e)
+        return None
+    finally:
+        rec.save()
+        if page:
+            try: await page.close()
+            except Exception: pass
+
+async def extract_anidrive_iframe_async(page):
+    try:
+        await page.wait_for_selector("#pembed iframe", timeout=8000)
+        return await page.locator("#pembed iframe").get_attribute("src")
+    except Exception:
+        return None
+
+async def extract_animesdigital_iframe_async(page):
+    try:
+        if await page.locator("#player1 iframe").count() > 0:
+            return await page.locator("#player1 iframe").get_attribute("src")
+        if await page.locator(".tab-video iframe").count() > 0:
+            return await page.locator(".tab-video iframe").first.get_attribute("src")
+    except Exception:
+        return None
+    return None
+
+async def extract_animesonlinecc_iframes_async(page):
+    """option-2 presente -> option-1 = DUB, option-2 = SUB; senão option-1 = SUB."""
+    try:
+        src1 = None
+        src2 = None
+        if await page.locator("div#option-1 iframe").count() > 0:
+            src1 = await page.locator("div#option-1 iframe").first.get_attribute("src")
+        if await page.locator("div#option-2 iframe").count() > 0:
+            src2 = await page.locator("div#option-2 iframe").first.get_attribute("src")
+        if src2:
+            return {"dub": src1, "sub": src2}
+        return {"dub": None, "sub": src1}
+    except Exception:
+        return {"dub": None, "sub": None}
+
+async def extract_next_episode_from_animesonline_async(page, anime_name=None):
+    try:
+        items = page.locator("div.item a")
+        for i in range(await items.count()):
+            a = items.nth(i)
+            try:
+                span_text = (await a.locator("span").inner_text()).strip().lower()
+            except Exception:
+                span_text = ""
+            title = (await a.get_attribute("title") or "").lower()
+            href = await a.get_attribute("href")
+            if "proximo episodio" in span_text:
+                if not anime_name or anime_name.lower() in title:
+                    return urljoin(page.url, href) if href else None
+        anchors = page.locator("a:has-text('Proximo episodio')")
+        if await anchors.count() > 0:
+            href = await anchors.first.get_attribute("href")
+            return urljoin(page.url, href) if href else None
+    except Exception:
+        pass
+    return None
+
+async def extract_episode_links_from_animesdigital_async(context, sample_ep_url):
+    if not sample_ep_url:
+        return []
+    rec = fetch_record("episode_list", sample_ep_url)
+    page = None
+    try:
+        page = await context.new_page()
+        await page.set_extra_http_headers(UA_HEADERS)
+        resp = await page.goto(sample_ep_url, wait_until="domcontentloaded", timeout=20000)
+        rec.response(resp)
+        if resp and resp.status >= 400:
+            print(f"   [!] Erro {resp.status} ao carregar (lista eps): {sample_ep_url}")
+            return []
+        try:
+            await page.wait_for_selector(".sidebar_navigation_episodes a.episode_list_episodes_item", timeout=6000)
+        except Exception:
+            pass
+        links = []
+        for selector in (".sidebar_navigation_episodes a.episode_list_episodes_item", ".sidebar_navigation_episodes a"):
+            anchors = page.locator(selector)
+            for i in range(await anchors.count()):
+                href = await anchors.nth(i).get_attribute("href")
+                if href:
+                    links.append(urljoin(sample_ep_url, href))
+            if links:
+                break
+        return rec.hit(links, "sidebar")
+    except Exception as e:
+        print(f"   [!] Erro ao extrair lista de episódios (animesdigital): {e}")
+        rec.error = str(e)
+        return []
+    finally:
+        rec.save()
+        if page:
+            try: await page.close()
+            except Exception: pass
+
+async def extract_for_episode_async(context, ep_url, desired_audio=None, is_animes_online=False, is_animesdigital=False, is_animesonlinecc=False, is_anivideo=False):
+    if not ep_url: return None
+
+    if is_anivideo:
+        print(f"   [AV] URL direta (sem browser): {ep_url[:80]}...")
+        return ep_url
+
+    rec = fetch_record("episode", ep_url)
+    page = None
+    try:
+        page = await context.new_page()
+        await page.set_extra_http_headers(UA_HEADERS)
+        capture = MediaCapture().attach(page)   # antes da navegação
+        response = await page.goto(ep_url, wait_until="domcontentloaded", timeout=30000)
+        rec.response(response)
+        if response and response.status >= 400:
+            print(f"   [!] Erro {response.status} ao carregar página: {ep_url}")
+            return None
+
+        if is_animes_online:
+            src = await extract_anidrive_iframe_async(page)
+            if src:
+                return rec.hit(src, "anidrive")
+
+        if is_animesonlinecc:
+            mapping = await extract_animesonlinecc_iframes_async(page)
+            if mapping:
+                return hit_audio(rec, pick_audio(mapping, desired_audio), "animesonlinecc")
+
+            next_ep = await extract_next_episode_from_animesonline_async(page)
+            if next_ep:
+                try:
+                    await page.wait_for_timeout(500)
+                    await page.goto(next_ep, wait_until="domcontentloaded", timeout=15000)
+                    mapping = await extract_animesonlinecc_iframes_async(page)
+                    if mapping:
+                        return hit_audio(rec, pick_audio(mapping, desired_audio), "animesonlinecc-next")
+                except Exception:
+                    pass
+
+        if is_animesdigital:
+            src = await extract_animesdigital_iframe_async(page)
+            if src:
+                return rec.hit(src, "animesdigital")
+
+        # Fallback: primeiro link de mídia visto na rede (sem esperar networkidle)
+        link = await capture.wait_async(page)
+        if link:
+            return rec.hit(link, "network")
+
+        for sel in PLAY_SELECTORS:
+            try:
+                if await page.locator(sel).count() > 0:
+                    await page.click(sel)
+                    link = await capture.wait_async(page, timeout=PLAY_CLICK_TIMEOUT)
+                    if link:
+                        return rec.hit(link, "play-click")
+            except Exception:
+                pass
+
+        iframes = page.locator("iframe")
+        for i in range(await iframes.count()):
+            try:
+                link = media_candidate(await iframes.nth(i).get_attribute("src"))
+                if link:
+                    return rec.hit(link, "iframe-scan")
+            except Exception:
+                pass
+
+        return None
+    except Exception as e:
+        print(f"   [!] Erro na extração ({ep_url}): {e}")
+        rec.error = str(e)
+        return None
+    finally:
+        rec.save()
+        if page:
+            try: await page.close()
+            except Exception: pass
+
+async def resolve_episode_link_async(context, pages, link_cache, check_session, ep_url, desired_audio=None, **flags):
+    """
+    extract_for_episode_async com o cache de links do LinkCache.
+    A revalidação do cache (requests) roda numa thread; 'pages' limita as abas abertas.
+    """
+    if not ep_url: return None
+    if flags.get("is_anivideo"):
+        return await extract_for_episode_async(context, ep_url, desired_audio=desired_audio, **flags)
+
+    link = await asyncio.to_thread(get_cached_link, link_cache, ep_url, desired_audio, session=check_session)
+    if link:
+        print(f"   [CACHE] {desired_audio or 'any'}: {link[:80]}")
+        return link
+    async with pages:
+        link = await extract_for_episode_async(context, ep_url, desired_audio=desired_audio, **flags)
+    if link:
+        put_cached_link(link_cache, ep_url, desired_audio, link)
+    return link
+
+async def resolve_episode_tracks_async(context, pages, link_cache, check_session, targets):
+    """
+    Versão async do resolve_episode_tracks: {"dub": link, "sub": link}, com uma
+    carga só da página quando os dois áudios estão nela.
+    """
+    links = dict.fromkeys(AUDIOS)
+
+    async def group(ep_url, flags, audios):
+        if len(audios) == 1 or flags.get("is_anivideo"):
+            for audio in audios:
+                links[audio] = await resolve_episode_link_async(
+                    context, pages, link_cache, check_session, ep_url, desired_audio=audio, **flags,
+                )
+            return
+        pending = []
+        for audio in audios:
+            links[audio] = await asyncio.to_thread(get_cached_link, link_cache, ep_url, audio, session=check_session)
+            if links[audio]:
+                print(f"   [CACHE] {audio}: {links[audio][:80]}")
+            else:
+                pending.append(audio)
+        if not pending:
+            return
+        async with pages:
+            if len(pending) == 1:
+                links[pending[0]] = await extract_for_episode_async(context, ep_url, desired_audio=pending[0], **flags)
+            else:
+                found = await extract_for_episode_async(context, ep_url, desired_audio=ALL_AUDIOS, **flags)
+                links.update(as_tracks(found, pending))
+        for audio in pending:
+            if links[audio]:
+                put_cached_link(link_cache, ep_url, audio, links[audio])
+
+    await asyncio.gather(*(group(*g) for g in page_groups(targets)))
+    return links
+
+
+# ── Run completo ─────────────────────────────────────────────────────────────
+
+def _skip_known(targets, s_num, known):
+    """Modo estender: tira os áudios que a entrada existente já tem."""
+    if not known:
+        return targets
+    return [skip_known_audios(t, known.get((s_num, i))) for i, t in enumerate(targets, start=1)]
+
+async def _season_targets(context, cfg, s_data, pages, mal_episodes, check_session, known=None):
+    """URLs (dub/sub) de todos os episódios da temporada, como no Full.py."""
+    dub_info, sub_info = season_base_info(s_data)
+    dub_episode_list, sub_episode_list = [], []
+    if not cfg["is_safe_mode"]:
+        async def episode_list(info, url, label):
+            if not (info and info.get("is_animesdigital")):
+                return []
+            async with pages:
+                links = await extract_episode_links_from_animesdigital_async(context, url)
+            if links:
+                print(f"   [OK] Encontrados {len(links)} episódios ({label}) em animesdigital.")
+            return links
+        dub_episode_list, sub_episode_list = await asyncio.gather(
+            episode_list(dub_info, s_data["url_dub"], "DUB"),
+            episode_list(sub_info, s_data["url_sub"], "SUB"),
+        )
+    if s_data["total_eps"] is None:
+        await asyncio.to_thread(
+            fill_episode_count, cfg, s_data, dub_info, sub_info, dub_episode_list, sub_episode_list,
+            mal_episodes, check_session,
+        )
+    return _skip_known([
+        plan_episode_urls(cfg, s_data, i, dub_info, sub_info, dub_episode_list, sub_episode_list)
+        for i in range(1, s_data["total_eps"] + 1)
+    ], s_data["season_num"], known)
+
+async def _resolve_season(context, cfg, s_data, planned, pages, link_cache, check_session, mal_episodes, known=None):
+    """Resolve todos os links da temporada em paralelo. Retorna [(dub, sub)] por episódio."""
+    targets = planned or await _season_targets(context, cfg, s_data, pages, mal_episodes, check_session, known)
+
+    async def resolve(t):
+        links = await resolve_episode_tracks_async(context, pages, link_cache, check_session, t)
+        return links["dub"], links["sub"]
+
+    results = await asyncio.gather(*(resolve(t) for t in targets))
+    print(f"   [OK] T{s_data['season_num']}: {sum(1 for d, s in results if d or s)}/{len(results)} episódios com link.")
+    return results
+
+async def _season_targets_lazy(context, cfg, s_data, planned, pages, mal_episodes, check_session, known=None):
+    """Modo sob demanda: as URLs planejadas da temporada, sem resolver nenhum link."""
+    targets = planned or await _season_targets(context, cfg, s_data, pages, mal_episodes, check_session, known)
+    print(f"   [SOB DEMANDA] T{s_data['season_num']}: {len(targets)} episódios com fonte.")
+    return targets
+
+async def run_async(cfg, max_pages=MAX_PAGES, bounded=False, lazy=False, existing="perguntar"):
+    """
+    Banner e todas as temporadas rodam juntos. O JSON é gravado no fim,
+    na ordem das temporadas/episódios, com as mesmas funções do Full.py.
+
+    Antes de tudo vem o MAL: com o malId, o anime é procurado entre os já
+    extraídos (Identidade.py), como no Full.py. existing (EXISTING_POLICIES):
+    "perguntar" no terminal; "estender" ou "reusar" para quem roda sem terminal
+    (Temporada.py).
+
+    lazy=True (--sob-demanda): só monta as URLs das páginas; os links ficam para
+    o SobDemanda resolver no play (build_lazy_episode).
+
+    bounded=True (memória limitada): no máximo BOUNDED_MAX_PAGES abas, contexto
+    renovado a cada ROTATE_EVERY páginas, uma temporada por vez e o resultado de
+    cada temporada vai para o disco até a gravação final.
+    """
+    anime_name = cfg["anime_name"]
+    id_prefix = cfg["id_prefix"]
+    if existing not in EXISTING_POLICIES:
+        raise ValueError(f"existing deve ser um de {EXISTING_POLICIES}")
+
+    async with aiohttp.ClientSession() as http:
+        mal_data = await fetch_mal_info_async(http, anime_name)
+    meta = mal_metadata(mal_data, anime_name)
+
+    # Mesmo anime já extraído com outro slug (malId/título): reusa ou estende em vez de refazer tudo
+    mode, found = prompt_existing(id_prefix, anime_name, meta, existing)
+    if mode == "reusar":
+        print(f"\n[JÁ EXTRAÍDO] Nada a fazer: usando {found[0]}.")
+        return found[0]
+    existing_anime = found[1] if found else None
+    known = known_episodes(existing_anime)
+    if existing_anime:
+        id_prefix = existing_anime["id"]
+        print(f"[JÁ EXTRAÍDO] Estendendo '{id_prefix}': só episódios/áudios que faltam serão extraídos.")
+    output_file = f"{id_prefix}_completo.json"
+
+    # No modo seguro as URLs são digitadas: pergunta tudo antes de abrir o loop de extração
+    planned = {}
+    if cfg["is_safe_mode"]:
+        for s_data in cfg["seasons"]:
+            dub_info, sub_info = season_base_info(s_data)
+            fill_episode_count(cfg, s_data, dub_info, sub_info, [], [])
+            planned[s_data["season_num"]] = _skip_known([
+                plan_episode_urls(cfg, s_data, i, dub_info, sub_info, [], [])
+                for i in range(1, s_data["total_eps"] + 1)
+            ], s_data["season_num"], known)
+
+    link_cache = load_link_cache()
+    check_session = requests.Session()
+    monitor = MemoryMonitor() if bounded else None
+    pages = asyncio.Semaphore(min(max_pages, BOUNDED_MAX_PAGES) if bounded else max_pages)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        if bounded:
+            context = AsyncRotatingContext(browser, monitor=monitor)
+        else:
+            context = await browser.new_context()
+
+        async def banner():
+            async with pages:
+                return await fetch_crunchyroll_banner_async(anime_name, context)
+
+        def resolve_season(s_data):
+            if lazy:
+                return _season_targets_lazy(context, cfg, s_data, planned.get(s_data["season_num"]), pages,
+                                            meta["episodes"], check_session, known)
+            return _resolve_season(context, cfg, s_data, planned.get(s_data["season_num"]), pages, link_cache,
+                                   check_session, meta["episodes"], known)
+
+        async def seasons_one_by_one():
+            spilled = []
+            for s_data in cfg["seasons"]:
+                links = await resolve_season(s_data)
+                if lazy:
+                    spilled.append(links)     # só URLs de página: pequeno, fica em memória
+                    continue
+                spilled.append(spill_season(id_prefix, s_data["season_num"], links))
+                save_link_cache(link_cache)
+            return spilled
+
+        if bounded:
+            banner_image, season_links = await asyncio.gather(banner(), seasons_one_by_one())
+            await context.close()
+        else:
+            banner_image, *season_links = await asyncio.gather(
+                banner(), *(resolve_season(s_data) for s_data in cfg["seasons"]),
+            )
+        await browser.close()
+
+    save_link_cache(link_cache)
+
+    if not banner_image:
+        print("[CR] Banner não encontrado, usando coverImage como fallback.")
+        banner_image = meta["cover_image"]
+    anime_header = build_anime_header(id_prefix, meta, banner_image)
+
+    def season_episodes(s_data, links):
+        if lazy:
+            for i, targets in enumerate(links, start=1):
+                yield build_lazy_episode(id_prefix, meta["title_romaji"], s_data["season_num"], i, targets)
+            return
+        if bounded:
+            links = load_spilled(links)
+        for i, (d_link, s_link) in enumerate(links, start=1):
+            yield build_episode(id_prefix, meta["title_romaji"], s_data["season_num"], i, d_link, s_link)
+
+    total_seasons = len(cfg["seasons"])
+    write_anime_json(output_file, anime_header, (
+        (build_season_header(s_data, meta, total_seasons), season_episodes(s_data, links))
+        for s_data, links in zip(cfg["seasons"], season_links)
+    ))
+    if existing_anime:
+        merge_into_existing(output_file, existing_anime)
+    if monitor:
+        monitor.report(rotations=context.rotations)
+    return output_file
+
+
+# ── Wrappers síncronos ───────────────────────────────────────────────────────
+
+async def _extract_many(jobs, max_pages):
+    pages = asyncio.Semaphore(max_pages)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context()
+
+        async def one(url, desired_audio, flags):
+            async with pages:
+                return await extract_for_episode_async(context, url, desired_audio=desired_audio, **flags)
+
+        try:
+            return await asyncio.gather(*(one(url, audio, flags or {}) for url, audio, flags in jobs))
+        finally:
+            await browser.close()
+
+def extract_episodes(jobs, max_pages=MAX_PAGES):
+    """
+    Resolve vários episódios de uma vez a partir de código síncrono.
+    jobs: lista de (url, desired_audio, flags do extract_for_episode). Retorna os links na mesma ordem.
+    """
+    return asyncio.run(_extract_many(jobs, max_pages))
+
+async def _fetch_many(urls, timeout):
+    async with aiohttp.ClientSession() as http:
+        return await asyncio.gather(*(fetch_html_async(http, u, timeout) for u in urls))
+
+def fetch_html_many(urls, timeout=HTTP_TIMEOUT):
+    """Baixa várias páginas em paralelo (mesma ordem de urls; None nas que falharam)."""
+    return asyncio.run(_fetch_many(urls, timeout))
+
+def main():
+    print("--- Extrator Universal de Animes (motor assíncrono) ---")
+    cfg = prompt_run_config()
+    if not cfg: return
+    output_file = asyncio.run(run_async(cfg, bounded="--memoria-limitada" in sys.argv, lazy="--sob-demanda" in sys.argv))
+    print(f"\n[Sucesso] Arquivo {output_file} gerado!")
+
+if __name__ == "__main__":
+    main()
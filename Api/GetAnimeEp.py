@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 import re
 import time
-import json
+import sys
+from contextlib import ExitStack
 from urllib.parse import urlparse
 from playwright.sync_api import sync_playwright
+from SaidaJson import atomic_open, JsonStreamWriter
+from Fazenda import farm_available, run_remote
+from Historico import fetch_record
 
 # Regex para detectar links de vídeo e IDs numéricos
 VIDEO_EXT_RE = re.compile(r'\.(mp4|m3u8|mpd|mkv)(?:\?.*)?$', re.IGNORECASE)
 ID_RE = re.compile(r'/(\d+)/?$')
 
+# Saída: indent=2 (legível) ou compacta (menor, mais rápida de carregar)
+OUTPUT_PRETTY = True
+
 def extract_anidrive_iframe(page):
     """Extrai o src do iframe dentro da div #pembed (AnimesOnline)"""
     try:
@@ -19,10 +26,12 @@ def extract_anidrive_iframe(page):
 
 def extract_for_episode(context, ep_url, is_animes_online=False):
     """Acessa a página do episódio e captura o link do vídeo ou iframe"""
+    rec = fetch_record("episode", ep_url)
     page = context.new_page()
     try:
         page.set_extra_http_headers({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
         response = page.goto(ep_url, wait_until="domcontentloaded", timeout=30000)
+        rec.response(response)
         if response and response.status >= 400:
             print(f"   [!] Erro {response.status} ao carregar página: {ep_url}")
             return None
@@ -31,7 +40,7 @@ def extract_for_episode(context, ep_url, is_animes_online=False):
             # tenta extrair iframe do anidrive
             src = extract_anidrive_iframe(page)
             if src:
-                return src
+                return rec.hit(src, "anidrive")
             # fallback: tenta capturar requests de vídeo
         found_network = []
         page.on("response", lambda res: found_network.append(res.url) if VIDEO_EXT_RE.search(res.url) else None)
@@ -40,11 +49,13 @@ def extract_for_episode(context, ep_url, is_animes_online=False):
         except:
             pass
         # Retorna primeiro recurso de vídeo/stream encontrado (se houver)
-        return found_network[0] if found_network else None
+        return rec.hit(found_network[0], "network") if found_network else None
     except Exception as e:
         print(f"   [!] Erro na extração ({ep_url}): {e}")
+        rec.error = str(e)
         return None
     finally:
+        rec.save()
         try:
             page.close()
         except:
@@ -91,6 +102,27 @@ def safe_hostname(src):
     except:
         return ""
 
+def build_episode_obj(id_prefix, anime_name, season, num, dub_link, sub_link):
+    embeds = {}
+    embed_credit = ""
+    if dub_link:
+        embeds["dub"] = make_iframe_html(dub_link)
+        embed_credit = safe_hostname(dub_link) or embed_credit
+    if sub_link:
+        embeds["sub"] = make_iframe_html(sub_link)
+        embed_credit = safe_hostname(sub_link) or embed_credit
+
+    episode_obj = {
+        "id": f"{id_prefix}-{num}",
+        "number": num,
+        "title": f"{anime_name} - Episódio {num}",
+        "season": season,
+        "embeds": embeds
+    }
+    if embed_credit:
+        episode_obj["embedCredit"] = embed_credit
+    return episode_obj
+
 def prompt_nonempty(prompt_text):
     v = ""
     while not v.strip():
@@ -98,6 +130,11 @@ def prompt_nonempty(prompt_text):
     return v
 
 def main():
+    use_farm = "--fazenda" in sys.argv
+    if use_farm and not farm_available():
+        print("[FAZENDA] Servidor fora do ar (suba com: python Api/Fazenda.py servir).")
+        return
+
     print("--- Extrator de Episódios Pro (saida com `embeds` dub/sub) ---")
 
     anime_name = prompt_nonempty("Nome do Anime (para o título): ")
@@ -131,11 +168,42 @@ def main():
     dub_info = build_base_info_from_url(url_dub_ep1) if url_dub_ep1 else None
     sub_info = build_base_info_from_url(url_sub_ep1) if url_sub_ep1 else None
 
-    results = []  # list of tuples: (num, dub_link_or_None, sub_link_or_None)
+    single_info = None if (has_dub and has_leg) else (dub_info if has_dub else sub_info)
+    if single_info and single_info["is_animesonline"] and single_info["start_id"] is None:
+        print("[-] ID numérico não encontrado na URL inicial (AnimesOnline). Abortando.")
+        return
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
+    # top-level audio flag
+    if has_dub and has_leg:
+        top_level_audio = "BOTH"
+    elif has_dub:
+        top_level_audio = "DUB"
+    else:
+        top_level_audio = "LEG"
+
+    filename = f"{id_prefix}.json"
+
+    with ExitStack() as stack:
+        browser = None
+        if use_farm:
+            # Fazenda: o servidor local extrai; nenhum Chromium é aberto aqui
+            extract = lambda ep_url, is_animes_online: run_remote(
+                "episode", {"url": ep_url, "desired_audio": None, "flags": {"is_animes_online": is_animes_online}})
+        else:
+            p = stack.enter_context(sync_playwright())
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context()
+            extract = lambda ep_url, is_animes_online: extract_for_episode(context, ep_url, is_animes_online=is_animes_online)
+        fp = stack.enter_context(atomic_open(filename))
+
+        # --- JSON com `embeds` escrito em streaming: um episódio por vez ---
+        out = JsonStreamWriter(fp, pretty=OUTPUT_PRETTY)
+        out.begin_object()
+        out.write(top_level_audio, key="audio")
+        out.begin_array("episodeList")
+
+        def emit(num, dub_link, sub_link):
+            out.write(build_episode_obj(id_prefix, anime_name, NumSea, num, dub_link, sub_link))
 
         try:
             # Se ambos e ambos são AnimesOnline, garantimos start ids separados
@@ -156,11 +224,11 @@ def main():
                                 current_id = dub_start + i
                                 ep_url = f'{dub_info["base_site"]}{current_id}/'
                                 print(f"[DUB {i+1}/{total_eps}] Extraindo: {ep_url}")
-                                dub_link = extract_for_episode(context, ep_url, is_animes_online=True)
+                                dub_link = extract(ep_url, is_animes_online=True)
                         else:
                             ep_url = f'{dub_info["base_fire"]}/{i+1}'
                             print(f"[DUB {i+1}/{total_eps}] Extraindo: {ep_url}")
-                            dub_link = extract_for_episode(context, ep_url, is_animes_online=False)
+                            dub_link = extract(ep_url, is_animes_online=False)
 
                     if sub_info:
                         if sub_info["is_animesonline"]:
@@ -170,13 +238,13 @@ def main():
                                 current_id = sub_start + i
                                 ep_url = f'{sub_info["base_site"]}{current_id}/'
                                 print(f"[SUB {i+1}/{total_eps}] Extraindo: {ep_url}")
-                                sub_link = extract_for_episode(context, ep_url, is_animes_online=True)
+                                sub_link = extract(ep_url, is_animes_online=True)
                         else:
                             ep_url = f'{sub_info["base_fire"]}/{i+1}'
                             print(f"[SUB {i+1}/{total_eps}] Extraindo: {ep_url}")
-                            sub_link = extract_for_episode(context, ep_url, is_animes_online=False)
+                            sub_link = extract(ep_url, is_animes_online=False)
 
-                    results.append((i+1, dub_link, sub_link))
+                    emit(i+1, dub_link, sub_link)
                     time.sleep(0.5)
 
             else:
@@ -190,77 +258,33 @@ def main():
 
                 if info["is_animesonline"]:
                     start_id = info["start_id"]
-                    if start_id is None:
-                        print("[-] ID numérico não encontrado na URL inicial (AnimesOnline). Abortando.")
-                        browser.close()
-                        return
                     base_site = info["base_site"]
                     for i in range(total_eps):
                         current_id = start_id + i
                         ep_url = f"{base_site}{current_id}/"
                         print(f"[{i+1}/{total_eps}] Extraindo: {ep_url}")
-                        link = extract_for_episode(context, ep_url, is_animes_online=True)
+                        link = extract(ep_url, is_animes_online=True)
                         if audio_key == "dub":
-                            results.append((i+1, link, None))
+                            emit(i+1, link, None)
                         else:
-                            results.append((i+1, None, link))
+                            emit(i+1, None, link)
                         time.sleep(0.5)
                 else:
                     base_fire = info["base_fire"]
                     for i in range(1, total_eps + 1):
                         ep_url = f"{base_fire}/{i}"
                         print(f"[{i}/{total_eps}] Extraindo: {ep_url}")
-                        link = extract_for_episode(context, ep_url, is_animes_online=False)
+                        link = extract(ep_url, is_animes_online=False)
                         if audio_key == "dub":
-                            results.append((i, link, None))
+                            emit(i, link, None)
                         else:
-                            results.append((i, None, link))
+                            emit(i, None, link)
                         time.sleep(0.5)
+            out.end_array()
+            out.end_object()
         finally:
-            browser.close()
-
-    # --- Geração do JSON com a nova formatação (embeds) ---
-    episodes = []
-    for num, dub_link, sub_link in results:
-        embeds = {}
-        embed_credit = ""
-        if dub_link:
-            src = dub_link
-            iframe_html = make_iframe_html(src)
-            embeds["dub"] = iframe_html
-            embed_credit = safe_hostname(src) or embed_credit
-        if sub_link:
-            src = sub_link
-            iframe_html = make_iframe_html(src)
-            embeds["sub"] = iframe_html
-            embed_credit = safe_hostname(src) or embed_credit
-
-        episode_obj = {
-            "id": f"{id_prefix}-{num}",
-            "number": num,
-            "title": f"{anime_name} - Episódio {num}",
-            "season": NumSea,
-            "embeds": embeds
-        }
-        if embed_credit:
-            episode_obj["embedCredit"] = embed_credit
-        episodes.append(episode_obj)
-
-    # top-level audio flag
-    if has_dub and has_leg:
-        top_level_audio = "BOTH"
-    elif has_dub:
-        top_level_audio = "DUB"
-    else:
-        top_level_audio = "LEG"
-
-    filename = f"{id_prefix}.json"
-    out_obj = {
-        "audio": top_level_audio,
-        "episodeList": episodes
-    }
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(out_obj, f, ensure_ascii=False, indent=2)
+            if browser:
+                browser.close()
 
     print(f"\n[Sucesso] Salvo em: {filename}")
     print(f"Formato: top-level 'audio': {top_level_audio}. Cada episódio possui 'embeds' com as keys presentes (dub/sub).")
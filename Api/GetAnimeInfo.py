@@ -16,6 +16,7 @@ from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
 from dateutil import parser as dateparser
+from Historico import fetch_record
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -27,6 +28,24 @@ EPS_PATTERN = re.compile(r'(\d{1,4})\s*(?:eps|episod|episódios|episodes?)', re.
 STATUS_KEYWORDS = ['completo', 'em andamento', 'pausado', 'cancelado', 'completo', 'ongoing', 'finished']
 AUDIO_KEYWORDS = ['legendado', 'dublado', 'dual', 'dub', 'sub', 'legend']
 DATE_RE = re.compile(r'([A-Za-z]{3,}\s+\d{1,2},\s*\d{4})')
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+EPS_NUM_RE = re.compile(r'\d{1,4}')
+
+# Scanner único dos padrões estruturais (episódios, data, ano) numa passada só.
+# Todos os ramos começam pelo mesmo \d, o que deixa o motor de regex pular direto
+# de dígito em dígito. A data é reconhecida pelo final ("5, 2020") e o nome do
+# mês antes dela é conferido depois, em _date_start.
+FEATURE_RE = re.compile(
+    r'\d(?:'
+    r'(?P<eps_range>\d{0,3}\s*/\s*(?P<eps_total>\d{1,4})\s*(?i:eps|episódios|episodios|episodes?))'
+    r'|(?P<eps>\d{0,3}\s*(?i:eps|episod|episódios|episodes?))'
+    r'|(?P<year>(?<=1)9\d\d|(?<=2)0\d\d)\b'
+    r'|(?P<date>\d?,\s*\d{4})'
+    r')'
+)
+AUDIO_WORDS = ('legendado', 'dublado', 'dual', 'sub', 'dub')
+AUDIO_CONTEXT_RE = re.compile(r'([A-ZÀ-Üa-zà-ü\s]{0,40}\b(?:legendado|dublado|dual|sub|dub)\b[^\n]{0,40})', re.IGNORECASE)
+AUDIO_LEAD_RE = re.compile(r'[A-ZÀ-Üa-zà-ü\s]*$', re.IGNORECASE)
 
 
 def normalize_base_url(input_url: str) -> str:
@@ -40,13 +59,18 @@ def normalize_base_url(input_url: str) -> str:
 
 
 def fetch_html(url: str, timeout=15):
+    rec = fetch_record("info", url)
     try:
         r = requests.get(url, headers=HEADERS, timeout=timeout)
+        rec.response(r)
         r.raise_for_status()
-        return r.text, r.url
+        return rec.hit(r.text, "html"), r.url
     except Exception as e:
         print(f"[erro] falha ao buscar {url}: {e}")
+        rec.error = str(e)
         return None, url
+    finally:
+        rec.save()
 
 
 def find_meta_image(soup: BeautifulSoup):
@@ -80,59 +104,154 @@ def parse_json_ld(soup: BeautifulSoup):
     return data
 
 
+def _classify_audio(val: str):
+    v = val.lower()
+    if 'legend' in v or 'sub' in v:
+        return "Legendado"
+    if 'dub' in v or 'dublado' in v:
+        return "Dublado"
+    if 'dual' in v:
+        return "Dual-Audio"
+    return val
+
+
+def _classify_status(k: str):
+    if 'completo' in k or 'finished' in k:
+        return "Completo"
+    if 'em andamento' in k or 'ongoing' in k:
+        return "Em andamento"
+    if 'pausad' in k:
+        return "Pausado"
+    if 'cancelad' in k:
+        return "Cancelado"
+    return k.capitalize()
+
+
+def _is_word_at(text: str, start: int, end: int):
+    return (start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_')) and \
+           (end == len(text) or not (text[end].isalnum() or text[end] == '_'))
+
+
+def _first_word(low: str, word: str):
+    """Primeira ocorrência de `word` como palavra inteira (equivalente a \\bword\\b)."""
+    i = low.find(word)
+    while i != -1:
+        if _is_word_at(low, i, i + len(word)):
+            return i
+        i = low.find(word, i + 1)
+    return -1
+
+
+def _date_start(text: str, tail_start: int):
+    """Início da data cujo final ('5, 2020') começa em tail_start, ou -1 se não tiver mês antes."""
+    i = tail_start
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    if i == tail_start:
+        return -1
+    j = i
+    while j > 0 and 'A' <= text[j - 1].upper() <= 'Z' and text[j - 1].isascii():
+        j -= 1
+    return j if i - j >= 3 else -1
+
+
+def scan_text_features(text: str):
+    """
+    Extrai áudio, status, episódios e data do texto (mesmas regras de antes),
+    junto com a posição de cada achado:
+
+      {"audio": ..., "status": ..., "episodes": ..., "date": ...,
+       "positions": {"audio": 123, "status": 456, ...}}
+
+    Padrões estruturais saem de uma única passada do FEATURE_RE (que para assim
+    que os de maior prioridade aparecem); palavras-chave usam busca de substring
+    numa única cópia em minúsculas, que no CPython é bem mais rápida que regex.
+    """
+    first = {}   # tipo -> (início, fim, valor)
+    pos = 0
+    while True:
+        m = FEATURE_RE.search(text, pos)
+        if not m:
+            break
+        start = m.start()
+        if m.group('eps_range') is not None:
+            kind, found = 'eps_range', (start, m.end(), int(m.group('eps_total')))
+        elif m.group('eps') is not None:
+            kind, found = 'eps', (start, m.end(), int(EPS_NUM_RE.match(text, start).group(0)))
+        elif m.group('year') is not None:
+            ok = start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_')
+            kind, found = 'year', ((start, m.end(), m.group(0)) if ok else None)
+        else:
+            d = _date_start(text, start)
+            kind, found = 'date', ((d, m.end(), text[d:m.end()]) if d != -1 else None)
+
+        # segue do próximo caractere (e não de m.end()): um achado pode conter
+        # outro, como o ano em "12/2020 eps" ou os episódios em "Jan 5, 2020 eps"
+        pos = start + 1
+        if found is None:
+            continue
+        if kind in ('eps', 'eps_range') and 'year' not in first:
+            # "2013 episodes" também conta como ano
+            y = YEAR_RE.match(text, start)
+            if y:
+                first['year'] = (y.start(), y.end(), y.group(0))
+        first.setdefault(kind, found)
+        if 'eps_range' in first and 'date' in first:
+            break
+
+    # lower() só muda o tamanho do texto com 'İ'; troca antes para as posições baterem
+    low = (text.replace('\u0130', 'I') if '\u0130' in text else text).lower()
+    result = {"audio": None, "status": None, "episodes": None, "date": None, "positions": {}}
+
+    audio_keys = [k for k in AUDIO_KEYWORDS if k in low]
+    if audio_keys:
+        hits = [p for p in (_first_word(low, w) for w in AUDIO_WORDS) if p != -1]
+        ctx = None
+        if hits:
+            p = min(hits)
+            lead = AUDIO_LEAD_RE.search(text, max(0, p - 40), p)
+            ctx = AUDIO_CONTEXT_RE.match(text, lead.start())
+        if ctx:
+            result["audio"] = _classify_audio(ctx.group(0).strip())
+            result["positions"]["audio"] = p
+        else:
+            result["audio"] = _classify_audio(audio_keys[0])
+            result["positions"]["audio"] = low.find(audio_keys[0])
+
+    for k in STATUS_KEYWORDS:
+        pos = low.find(k)
+        if pos != -1:
+            result["status"] = _classify_status(k)
+            result["positions"]["status"] = pos
+            break
+
+    for kind in ('eps_range', 'eps'):
+        if kind in first:
+            result["positions"]["episodes"], _, result["episodes"] = first[kind]
+            break
+
+    for kind in ('date', 'year'):
+        if kind in first:
+            result["positions"]["date"], _, result["date"] = first[kind]
+            break
+
+    return result
+
+
 def find_audio(soup_text: str):
-    txt = soup_text.lower()
-    for k in AUDIO_KEYWORDS:
-        if k in txt:
-            m = re.search(r'([A-ZÀ-Üa-zà-ü\s]{0,40}\b(?:legendado|dublado|dual|sub|dub)\b[^\n]{0,40})', soup_text, re.IGNORECASE)
-            val = m.group(0).strip() if m else k
-            if 'legend' in val.lower() or 'sub' in val.lower():
-                return "Legendado"
-            if 'dub' in val.lower() or 'dublado' in val.lower():
-                return "Dublado"
-            if 'dual' in val.lower():
-                return "Dual-Audio"
-            return val
-    return None
+    return scan_text_features(soup_text)["audio"]
 
 
 def find_status(soup_text: str):
-    txt = soup_text.lower()
-    for k in STATUS_KEYWORDS:
-        if k in txt:
-            if 'completo' in k or 'finished' in k:
-                return "Completo"
-            if 'em andamento' in k or 'ongoing' in k:
-                return "Em andamento"
-            if 'pausad' in k:
-                return "Pausado"
-            if 'cancelad' in k:
-                return "Cancelado"
-            return k.capitalize()
-    return None
+    return scan_text_features(soup_text)["status"]
 
 
 def find_episodes(soup_text: str):
-    m = re.search(r'(\d{1,4})\s*/\s*(\d{1,4})\s*(?:eps|episódios|episodios|episodes?)', soup_text, re.IGNORECASE)
-    if m:
-        return int(m.group(2))
-    m2 = EPS_PATTERN.search(soup_text)
-    if m2:
-        return int(m2.group(1))
-    return None
+    return scan_text_features(soup_text)["episodes"]
 
 
 def find_date(soup_text: str):
-    m = DATE_RE.search(soup_text)
-    if m:
-        return m.group(1)
-    m2 = re.search(r'([A-Za-z]{3,}\s+\d{1,2},\s*\d{4})', soup_text)
-    if m2:
-        return m2.group(1)
-    m3 = re.search(r'\b(19|20)\d{2}\b', soup_text)
-    if m3:
-        return m3.group(0)
-    return None
+    return scan_text_features(soup_text)["date"]
 
 
 def resolve_url(base_url, candidate):
@@ -156,13 +275,13 @@ def extract_all(base_url):
         data['image'] = jld['image'] if isinstance(jld['image'], str) else (jld['image'][0] if jld['image'] else None)
     img = find_meta_image(soup)
     data['image'] = resolve_url(final, img) if img else data.get('image')
-    audio = find_audio(html) or find_audio(text)
-    data['audio'] = audio
-    eps = find_episodes(text)
-    data['episodes'] = eps
-    status = find_status(text)
-    data['status'] = status
-    date_raw = jld.get('date') or find_date(html) or find_date(text)
+    # uma varredura para o HTML e outra para o texto, em vez de uma por heurística
+    html_feats = scan_text_features(html)
+    text_feats = scan_text_features(text)
+    data['audio'] = html_feats['audio'] or text_feats['audio']
+    data['episodes'] = text_feats['episodes']
+    data['status'] = text_feats['status']
+    date_raw = jld.get('date') or html_feats['date'] or text_feats['date']
     pretty_date = None
     if date_raw:
         try:
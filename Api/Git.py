@@ -1,32 +1,145 @@
-import subprocess
+import os
+import re
 import sys
+import glob
+import json
+import subprocess
 
-def run(command):
-    result = subprocess.run(command, shell=True)
-    if result.returncode != 0:
-        print(f"Erro ao executar: {command}")
+# Arquivos do catálogo que este script publica
+CATALOG_PATHS = [
+    "Api/Animes/*.json",
+    "output.json",
+    "search_index.json",
+    "public/data/*.json",
+    "public/catalog/*.json",
+    "public/catalog/animes/*.json",
+    "public/catalog/episodes/*.json",
+    "public/catalog/home/*.json",
+    "public/catalog/deltas/*.json",
+]
+
+# Diferenças que não contam como mudança de verdade
+VOLATILE_KEYS = {"generatedAt"}
+NOCACHE_RE = re.compile(r'&nocache\d+')
+
+
+def run(args, capture=False, check=True):
+    """Roda o git com lista de argumentos (sem shell)."""
+    result = subprocess.run(args, capture_output=capture, text=capture)
+    if check and result.returncode != 0:
+        print(f"Erro ao executar: {' '.join(args)}")
+        if capture and result.stderr:
+            print(result.stderr.strip())
         sys.exit(1)
+    return result
 
-def main():
-    message = input("Digite a mensagem do commit: ")
 
-    if not message:
-        print("❌ A mensagem do commit não pode ser vazia.")
-        message = sys.argv[1]
+def normalize_for_compare(value):
+    """Remove o que muda a cada run sem mudar o conteúdo (cache-buster do anivideo, timestamps)."""
+    if isinstance(value, dict):
+        return {k: normalize_for_compare(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [normalize_for_compare(v) for v in value]
+    if isinstance(value, str):
+        return NOCACHE_RE.sub("", value)
+    return value
 
-    print("🔄 Executando git add...")
-    run("git add .")
 
-    print("🔄 Executando git add novamente...")
-    run("git add .")
+def committed_json(path):
+    """Conteúdo do arquivo no HEAD já parseado; None se o arquivo é novo ou não é JSON válido."""
+    result = run(["git", "show", f"HEAD:{path}"], capture=True, check=False)
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return None
+
+
+def candidate_paths(patterns):
+    """Arquivos do catálogo que o git vê como modificados, novos ou apagados."""
+    files = sorted({p for pattern in patterns for p in glob.glob(pattern)})
+    tracked = [p for p in run(["git", "ls-files", "-z", "--"] + patterns, capture=True).stdout.split("\0") if p]
+    paths = sorted(set(files) | set(tracked))
+    if not paths:
+        return []
+    status = run(["git", "status", "--porcelain", "-z", "--untracked-files=all", "--"] + paths, capture=True).stdout
+    entries = status.split("\0")
+    result = []
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if not entry:
+            continue
+        result.append(entry[3:])
+        if entry[0] in "RC":
+            i += 1                        # -z: o caminho antigo do rename vem na entrada seguinte
+    return result
+
+
+def changed_catalog_files(patterns=CATALOG_PATHS):
+    """
+    Compara cada candidato com a versão do HEAD de forma semântica (JSON parseado,
+    sem cache-buster/timestamps). Devolve só os que mudaram de verdade.
+    """
+    changed = []
+    for path in candidate_paths(patterns):
+        if not os.path.exists(path):
+            changed.append(path)          # apagado
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                current = json.load(f)
+        except ValueError:
+            changed.append(path)          # não é JSON: qualquer diff conta
+            continue
+        previous = committed_json(path)
+        if previous is None or normalize_for_compare(previous) != normalize_for_compare(current):
+            changed.append(path)
+        else:
+            print(f"   ↪ {path}: sem mudança real, ignorado.")
+    return changed
+
+
+def default_message(changed):
+    ids = sorted({os.path.splitext(os.path.basename(p))[0] for p in changed if p.startswith("Api/Animes/")})
+    if ids:
+        return "Atualiza catálogo: " + ", ".join(ids)
+    return "Atualiza catálogo"
+
+
+def publish(message=None, patterns=CATALOG_PATHS, push=True):
+    """Faz um único commit com todos os arquivos que mudaram e dá push. Retorna False se não havia nada."""
+    print("🔎 Procurando mudanças no catálogo...")
+    changed = changed_catalog_files(patterns)
+    if not changed:
+        print("✅ Nada mudou no catálogo. Nenhum commit criado.")
+        return False
+
+    for path in changed:
+        print(f"   • {path}")
+
+    print("🔄 Executando git add...")
+    run(["git", "add", "-A", "--"] + changed)
 
     print("📝 Criando commit...")
-    run(f'git commit --allow-empty -m "{message}"')
+    run(["git", "commit", "-m", message or default_message(changed), "--"] + changed)
+
+    if push:
+        print("🚀 Enviando para o repositório...")
+        run(["git", "push"])
+    return True
+
+
+def main():
+    message = input("Digite a mensagem do commit (vazio = automática): ").strip()
+    if not message and len(sys.argv) > 1:
+        message = sys.argv[1]
 
-    print("🚀 Enviando para o repositório...")
-    run("git push")
+    if publish(message or None):
+        print("✅ Processo concluído com sucesso!")
 
-    print("✅ Processo concluído com sucesso!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
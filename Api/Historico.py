@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Histórico das extrações em SQLite (cache/historico.db).
+
+Cada busca feita pelos extratores (Full.py / FullAsync.py / Fazenda.py,
+GetAnimeEp.py, GetAnimeInfo.py) vira uma linha com: URL, host, tipo (episode,
+episode_list, banner, mal, info), caminho que deu certo (anidrive,
+animesonlinecc, network, iframe-scan...), status HTTP, latência e bytes.
+Cada execução de script vira um "run", então dá para comparar runs.
+
+Nos extratores:
+  rec = fetch_record("episode", url)
+  ...
+  return rec.hit(src, "anidrive")     # marca o caminho que funcionou
+  ...
+  finally: rec.save()
+
+Consultas:
+  python Api/Historico.py hosts       [--dias 30]   # hosts mais lentos
+  python Api/Historico.py extratores  [--dias 30]   # taxa de sucesso por site/tipo e caminhos usados
+  python Api/Historico.py tendencia   [--dias 30] [--host HOST]
+  python Api/Historico.py runs        [--limite 20]
+
+HISTORICO=0 no ambiente desliga a gravação.
+"""
+
+import os
+import sys
+import time
+import atexit
+import sqlite3
+import argparse
+import threading
+from urllib.parse import urlparse
+
+HISTORY_DB = os.path.join("cache", "historico.db")
+HISTORY_ENABLED = os.environ.get("HISTORICO", "1") != "0"
+
+_db = None
+_run_id = None
+_lock = threading.Lock()
+
+
+# ── Gravação ─────────────────────────────────────────────────────────────────
+
+def open_db(path=HISTORY_DB):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            script      TEXT NOT NULL,
+            argv        TEXT,
+            started_at  REAL NOT NULL,
+            finished_at REAL
+        )""")
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS fetches (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id      INTEGER NOT NULL REFERENCES runs(id),
+            ts          REAL NOT NULL,
+            kind        TEXT NOT NULL,
+            url         TEXT,
+            host        TEXT,
+            path        TEXT,
+            ok          INTEGER NOT NULL,
+            http_status INTEGER,
+            latency_ms  REAL,
+            bytes       INTEGER,
+            error       TEXT
+        )""")
+    db.execute("CREATE INDEX IF NOT EXISTS fetches_ts ON fetches(ts)")
+    db.execute("CREATE INDEX IF NOT EXISTS fetches_host ON fetches(host, ts)")
+    return db
+
+
+def _finish_run():
+    if _db is not None and _run_id is not None:
+        with _lock:
+            _db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), _run_id))
+
+
+def _current_run():
+    """Abre o banco e cria o run do script atual na primeira busca registrada."""
+    global _db, _run_id
+    if _run_id is None:
+        _db = open_db()
+        _run_id = _db.execute(
+            "INSERT INTO runs (script, argv, started_at) VALUES (?, ?, ?)",
+            (os.path.basename(sys.argv[0] or "python"), " ".join(sys.argv[1:]), time.time()),
+        ).lastrowid
+        atexit.register(_finish_run)
+    return _run_id
+
+
+def host_of(url):
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def record_fetch(kind, url, ok, latency, path=None, http_status=None, nbytes=None, error=None):
+    if not HISTORY_ENABLED:
+        return
+    try:
+        with _lock:
+            run_id = _current_run()
+            _db.execute(
+                "INSERT INTO fetches (run_id, ts, kind, url, host, path, ok, http_status, latency_ms, bytes, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, time.time(), kind, url, host_of(url), path, int(bool(ok)), http_status,
+                 round(latency * 1000, 1), nbytes, error),
+            )
+    except sqlite3.Error as e:
+        print(f"[HIST] Erro ao gravar histórico: {e}")
+
+
+class FetchRecord:
+    """Uma busca em andamento: mede o tempo desde a criação e grava uma vez em save()."""
+
+    def __init__(self, kind, url):
+        self.kind = kind
+        self.url = url
+        self.t0 = time.perf_counter()
+        self.ok = False
+        self.path = None
+        self.http_status = None
+        self.bytes = None
+        self.error = None
+        self._saved = False
+
+    def hit(self, link, path):
+        """Marca o caminho que produziu o resultado (se houver) e devolve o resultado."""
+        if link:
+            self.ok = True
+            self.path = path
+        return link
+
+    def response(self, response):
+        """Status e tamanho a partir de uma resposta do playwright ou do requests."""
+        if response is None:
+            return
+        status = getattr(response, "status", None)
+        self.http_status = status if status is not None else getattr(response, "status_code", None)
+        content = getattr(response, "content", None)
+        if isinstance(content, bytes):
+            self.bytes = len(content)
+        else:
+            try:
+                self.bytes = int(response.headers.get("content-length"))
+            except (AttributeError, TypeError, ValueError):
+                pass
+
+    def save(self):
+        if self._saved:
+            return
+        self._saved = True
+        record_fetch(self.kind, self.url, self.ok, time.perf_counter() - self.t0,
+                     path=self.path, http_status=self.http_status, nbytes=self.bytes, error=self.error)
+
+
+def fetch_record(kind, url):
+    return FetchRecord(kind, url)
+
+
+# ── Consultas ────────────────────────────────────────────────────────────────
+
+def _since(days):
+    return time.time() - days * 86400
+
+
+def _pct(part, total):
+    return f"{100.0 * part / total:5.1f}%" if total else "   - "
+
+
+def _p95(values):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+
+
+def slowest_hosts(db, days=30, limit=20):
+    rows = db.execute(
+        "SELECT host, latency_ms, ok, bytes FROM fetches WHERE ts >= ? AND host != ''", (_since(days),)
+    ).fetchall()
+    by_host = {}
+    for host, latency, ok, nbytes in rows:
+        h = by_host.setdefault(host, {"lat": [], "ok": 0, "bytes": 0})
+        h["lat"].append(latency or 0.0)
+        h["ok"] += ok
+        h["bytes"] += nbytes or 0
+    result = []
+    for host, h in by_host.items():
+        n = len(h["lat"])
+        result.append({
+            "host": host, "n": n, "ok": h["ok"],
+            "avg_ms": sum(h["lat"]) / n, "p95_ms": _p95(h["lat"]), "bytes": h["bytes"],
+        })
+    result.sort(key=lambda r: r["avg_ms"], reverse=True)
+    return result[:limit]
+
+
+def extractor_rates(db, days=30):
+    rows = db.execute(
+        "SELECT host, kind, COUNT(*), SUM(ok), AVG(latency_ms) FROM fetches WHERE ts >= ? "
+        "GROUP BY host, kind ORDER BY COUNT(*) DESC", (_since(days),)
+    ).fetchall()
+    paths = db.execute(
+        "SELECT host, kind, path, COUNT(*) FROM fetches WHERE ts >= ? AND ok = 1 "
+        "GROUP BY host, kind, path ORDER BY COUNT(*) DESC", (_since(days),)
+    ).fetchall()
+    by_key = {}
+    for host, kind, path, n in paths:
+        by_key.setdefault((host, kind), []).append((path or "?", n))
+    return [
+        {"host": host, "kind": kind, "n": n, "ok": ok or 0, "avg_ms": avg or 0.0, "paths": by_key.get((host, kind), [])}
+        for host, kind, n, ok, avg in rows
+    ]
+
+
+def daily_trend(db, days=30, host=None):
+    sql = ("SELECT date(ts, 'unixepoch', 'localtime') AS day, COUNT(*), SUM(ok), AVG(latency_ms) "
+           "FROM fetches WHERE ts >= ?")
+    params = [_since(days)]
+    if host:
+        sql += " AND host = ?"
+        params.append(host_of("//" + host) or host)
+    sql += " GROUP BY day ORDER BY day"
+    return [{"day": d, "n": n, "ok": ok or 0, "avg_ms": avg or 0.0} for d, n, ok, avg in db.execute(sql, params)]
+
+
+def recent_runs(db, limit=20):
+    rows = db.execute(
+        "SELECT r.id, r.script, r.argv, r.started_at, r.finished_at, COUNT(f.id), SUM(f.ok), SUM(f.latency_ms) "
+        "FROM runs r LEFT JOIN fetches f ON f.run_id = r.id GROUP BY r.id ORDER BY r.id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [
+        {"id": i, "script": s, "argv": a, "started_at": st, "finished_at": fi, "n": n, "ok": ok or 0, "fetch_ms": ms or 0.0}
+        for i, s, a, st, fi, n, ok, ms in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o histórico de extrações.")
+    parser.add_argument("relatorio", choices=["hosts", "extratores", "tendencia", "runs"])
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--host")
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--db", default=HISTORY_DB)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Nenhum histórico em {args.db} ainda.")
+        return
+    db = open_db(args.db)
+
+    if args.relatorio == "hosts":
+        print(f"{'host':40} {'buscas':>7} {'sucesso':>8} {'média':>9} {'p95':>9} {'MB':>8}")
+        for r in slowest_hosts(db, args.dias, args.limite):
+            print(f"{r['host'][:40]:40} {r['n']:7d} {_pct(r['ok'], r['n']):>8} {r['avg_ms']:7.0f}ms {r['p95_ms']:7.0f}ms "
+                  f"{r['bytes'] / 1e6:8.2f}")
+    elif args.relatorio == "extratores":
+        for r in extractor_rates(db, args.dias):
+            paths = ", ".join(f"{p} {n}" for p, n in r["paths"])
+            print(f"{r['host'][:35]:35} {r['kind']:13} {r['n']:6d} buscas  {_pct(r['ok'], r['n'])}  "
+                  f"{r['avg_ms']:7.0f}ms  [{paths}]")
+    elif args.relatorio == "tendencia":
+        for r in daily_trend(db, args.dias, args.host):
+            bar = "█" * int(round(20 * r["ok"] / r["n"])) if r["n"] else ""
+            print(f"{r['day']}  {r['n']:6d} buscas  {_pct(r['ok'], r['n'])}  {r['avg_ms']:7.0f}ms  {bar}")
+    else:
+        for r in recent_runs(db, args.limite):
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started_at"]))
+            took = f"{r['finished_at'] - r['started_at']:.0f}s" if r["finished_at"] else "?"
+            print(f"#{r['id']:<5} {started}  {r['script']:18} {took:>7}  {r['n']:5d} buscas  {_pct(r['ok'], r['n'])}  "
+                  f"{r['argv'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Identidade dos animes entre slugs diferentes (o mesmo anime extraído duas vezes).
+
+O mesmo anime acaba salvo com id_prefix diferentes (boku-no-hero-academia e
+My-Hero-Academia, sousou-no-frieren e sousounof). Cada anime ganha chaves de
+identidade, "mal:<malId>" e "titulo:<título normalizado>" (title, titleRomaji,
+titleEnglish, titleJapanese), e:
+  - o Full.py consulta o índice antes de extrair e oferece reusar ou estender
+    a entrada que já existe;
+  - o JuntarJson.py junta as duplicatas do catálogo numa entrada só: a mais
+    completa é a principal, as outras preenchem temporadas, episódios e áudios
+    que faltam e ficam em "aliases".
+
+Dois animes com malId diferentes nunca são o mesmo, mesmo com título igual.
+
+Uso:
+  python Api/Identidade.py          # lista as duplicatas (catálogo + *_completo.json da raiz)
+"""
+
+import re
+import copy
+import unicodedata
+
+from Catalogo import CATALOG_SOURCES, _files_for, load_json
+
+IDENTITY_SOURCES = CATALOG_SOURCES + ["*_completo.json"]
+TITLE_FIELDS = ("title", "titleRomaji", "titleEnglish", "titleJapanese")
+TITLE_NOISE = {"dublado", "legendado"}    # sufixos de slug/título que não mudam o anime
+EPISODE_ID = "{id}-s{season}-ep{number}"  # mesmo formato do build_episode
+
+
+def normalize_title(title):
+    """'Sousou no Frieren (Dublado)' -> 'sousou-no-frieren'; acentos e pontuação não contam."""
+    if not isinstance(title, str):
+        return ""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = [w for w in re.split(r"[\W_]+", text) if w and w not in TITLE_NOISE]
+    return "-".join(words)
+
+
+def title_keys(anime):
+    return {f"titulo:{t}" for t in (normalize_title(anime.get(f)) for f in TITLE_FIELDS) if t}
+
+
+def identity_keys(anime):
+    keys = title_keys(anime)
+    if anime.get("malId"):
+        keys.add(f"mal:{anime['malId']}")
+    return keys
+
+
+def same_anime(a, b):
+    if a.get("malId") and b.get("malId"):
+        return a["malId"] == b["malId"]
+    return bool(title_keys(a) & title_keys(b))
+
+
+def completeness(anime):
+    """Quantos (episódio, áudio) têm embed: a entrada mais completa é a principal."""
+    return sum(
+        1
+        for season in anime.get("seasons") or []
+        for ep in season.get("episodeList") or []
+        for embed in (ep.get("embeds") or {}).values() if embed
+    )
+
+
+# ── Busca (Full.py) ──────────────────────────────────────────────────────────
+
+def load_identity_entries(sources=IDENTITY_SOURCES):
+    """[(arquivo, anime)] de todas as fontes, sem descartar ids repetidos (é o que se procura)."""
+    from Normalizar import expand_anime
+
+    entries = []
+    for path in _files_for(sources):
+        try:
+            data = load_json(path)
+        except Exception as e:
+            print(f"⚠️ Ignorando {path}: {e}")
+            continue
+        for anime in (data if isinstance(data, list) else [data]):
+            if isinstance(anime, dict) and anime.get("id"):
+                entries.append((path, expand_anime(anime)))
+    return entries
+
+
+def find_existing(entries, probe):
+    """
+    Entradas que são o mesmo anime que `probe` ({"id", "malId", "title", ...}),
+    da mais completa para a menos.
+    """
+    found = [
+        (path, anime) for path, anime in entries
+        if anime["id"] == probe.get("id") or same_anime(anime, probe)
+    ]
+    return sorted(found, key=lambda e: -completeness(e[1]))
+
+
+# ── Junção (JuntarJson.py) ───────────────────────────────────────────────────
+
+def find_duplicates(animes):
+    """
+    Grupos (listas de animes, na ordem do catálogo) que são o mesmo anime.
+    A junção é transitiva, então cada grupo guarda o malId que já tem: dois grupos
+    com malId diferentes nunca se juntam, nem por um anime sem malId no meio.
+    """
+    parent = list(range(len(animes)))
+    group_mal = [a.get("malId") or None for a in animes]   # malId do grupo (vale o da raiz)
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = root(i), root(j)
+        if ri == rj:
+            return
+        if group_mal[ri] and group_mal[rj] and group_mal[ri] != group_mal[rj]:
+            return
+        parent[ri] = rj
+        group_mal[rj] = group_mal[rj] or group_mal[ri]
+
+    by_key = {}
+    for i, anime in enumerate(animes):
+        for key in identity_keys(anime):
+            by_key.setdefault(key, []).append(i)
+    for members in by_key.values():
+        for n, i in enumerate(members):
+            for j in members[:n]:
+                if same_anime(animes[j], animes[i]):
+                    union(i, j)
+
+    groups = {}
+    for i in range(len(animes)):
+        groups.setdefault(root(i), []).append(animes[i])
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def _filled(value):
+    return value not in (None, "", [], {}, 0)
+
+
+def _merge_audios(mine, other):
+    by_type = {a.get("type"): a for a in mine}
+    for audio in other:
+        current = by_type.get(audio.get("type"))
+        if current is None:
+            mine.append(copy.deepcopy(audio))
+        elif (audio.get("available") and not current.get("available")) or \
+                (audio.get("episodesAvailable") or 0) > (current.get("episodesAvailable") or 0):
+            current.update(copy.deepcopy(audio))
+
+
+def _adopt_episode(ep, anime_id, season_num):
+    ep = copy.deepcopy(ep)
+    ep["id"] = EPISODE_ID.format(id=anime_id, season=season_num, number=ep.get("number"))
+    return ep
+
+
+def _merge_season(mine, other, anime_id):
+    for key, value in other.items():
+        if key in ("episodeList", "audios"):
+            continue
+        if key in ("episodes", "currentEpisode") and isinstance(value, int):
+            mine[key] = max(mine.get(key) or 0, value)
+        elif not _filled(mine.get(key)) and _filled(value):
+            mine[key] = copy.deepcopy(value)
+    if other.get("audios"):
+        _merge_audios(mine.setdefault("audios", []), other["audios"])
+
+    episodes = {ep.get("number"): ep for ep in mine.get("episodeList") or []}
+    for ep in other.get("episodeList") or []:
+        current = episodes.get(ep.get("number"))
+        if current is None:
+            episodes[ep.get("number")] = _adopt_episode(ep, anime_id, mine.get("season"))
+            continue
+        had_embeds = any((current.get("embeds") or {}).values())
+        for field in ("embeds", "sources"):
+            for audio, value in (ep.get(field) or {}).items():
+                if value and not (current.get(field) or {}).get(audio):
+                    current.setdefault(field, {})[audio] = value
+        if ep.get("embedCredit") and (not had_embeds or not current.get("embedCredit")):
+            current["embedCredit"] = ep["embedCredit"]   # o crédito é de quem forneceu os embeds
+    mine["episodeList"] = sorted(episodes.values(), key=lambda e: e.get("number") or 0)
+
+
+def merge_animes(primary, others):
+    """Completa `primary` com o que só existe nos outros (sem sobrescrever o que ele já tem)."""
+    merged = copy.deepcopy(primary)
+    aliases = list(merged.get("aliases") or [])
+    seasons = {s.get("season"): s for s in merged.setdefault("seasons", [])}
+    for other in others:
+        for key, value in other.items():
+            if key not in ("id", "seasons", "aliases", "related") and not _filled(merged.get(key)) and _filled(value):
+                merged[key] = copy.deepcopy(value)
+        for season in other.get("seasons") or []:
+            current = seasons.get(season.get("season"))
+            if current is None:
+                current = dict(copy.deepcopy(season), episodeList=[])
+                seasons[season.get("season")] = current
+                merged["seasons"].append(current)
+            _merge_season(current, season, merged["id"])
+        for alias in [other["id"]] + list(other.get("aliases") or []):
+            if alias != merged["id"] and alias not in aliases:
+                aliases.append(alias)
+    merged["seasons"].sort(key=lambda s: s.get("season") or 0)
+    if aliases:
+        merged["aliases"] = aliases
+    return merged
+
+
+def dedupe_animes(animes):
+    """
+    Junta as duplicatas de uma lista de animes. A entrada principal de cada grupo
+    fica na posição dela; as outras saem da lista. Retorna (lista nova, [(principal, [ids juntados])]).
+    """
+    replaced, dropped, merges = {}, set(), []
+    for group in find_duplicates(animes):
+        primary = max(group, key=completeness)
+        others = [a for a in group if a is not primary]
+        replaced[id(primary)] = merge_animes(primary, others)
+        dropped.update(id(a) for a in others)
+        merges.append((primary["id"], [a["id"] for a in others]))
+    result = [replaced.get(id(a), a) for a in animes if id(a) not in dropped]
+    return result, merges
+
+
+def main():
+    entries = load_identity_entries()
+    animes = [anime for _, anime in entries]
+    paths = {id(anime): path for path, anime in entries}
+    groups = find_duplicates(animes)
+    if not groups:
+        print(f"✅ Nenhuma duplicata em {len(entries)} entradas.")
+        return
+    for group in groups:
+        print(f"🔁 {group[0].get('title')} (malId {group[0].get('malId') or '?'}):")
+        for anime in sorted(group, key=lambda a: -completeness(a)):
+            print(f"   {anime['id']:<40} {completeness(anime):>5} embeds  {paths[id(anime)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Imagens do catálogo servidas localmente (public/img).
+
+Baixa em paralelo todas as imagens do catálogo (coverImage, bannerImage e, nas
+temporadas de filme, posterImage e stills) e gera para cada uma:
+  - variantes WebP e AVIF (AVIF só se o Pillow instalado souber gravar) em
+    algumas larguras por tipo de imagem, sem nunca ampliar a original;
+  - placeholder: blurhash e um LQIP (WebP minúsculo em data URI).
+
+Os arquivos são nomeados pelo hash do conteúdo baixado (<hash>-<largura>.<fmt>),
+então podem ser servidos com cache eterno. O manifest (public/img/manifest.json)
+mapeia a URL original para as variantes; URLs já processadas, com todos os
+arquivos no disco, não são baixadas de novo.
+
+Requer Pillow (pip install pillow).
+
+Uso:
+  python Api/Imagens.py                # processa o catálogo de Api/Animes
+  python Api/Imagens.py --forcar       # baixa e gera tudo de novo
+"""
+
+import io
+import os
+import sys
+import glob
+import math
+import base64
+import asyncio
+import hashlib
+import argparse
+import aiohttp
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow é necessário só para esta etapa
+    Image = None
+
+from Catalogo import load_catalog, load_json
+from Historico import fetch_record
+from SaidaJson import dump_json_atomic
+from Shards import content_hash
+
+IMAGES_DIR = os.path.join("public", "img")
+PUBLIC_PREFIX = "img"          # caminho das variantes visto pelo site (public/ é a raiz)
+MANIFEST_VERSION = 1
+
+# Larguras geradas por tipo de imagem
+WIDTHS = {
+    "cover":  (160, 320, 480),
+    "banner": (640, 1280, 1920),
+    "poster": (240, 480, 720),
+    "still":  (480, 960),
+}
+QUALITY = {"webp": 80, "avif": 55}
+LQIP_WIDTH = 24
+BLURHASH_COMPONENTS = (4, 3)
+
+DOWNLOADS = 8                  # downloads em paralelo
+DOWNLOAD_TIMEOUT = 30
+MAX_BYTES = 25 * 1024 * 1024   # ignora "imagens" absurdamente grandes
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+}
+
+
+def output_formats():
+    """Formatos que o Pillow instalado consegue gravar (WebP sempre vem antes)."""
+    return tuple(fmt for fmt in ("webp", "avif") if features.check(fmt))
+
+
+# ── Imagens do catálogo ──────────────────────────────────────────────────────
+
+def catalog_images(animes):
+    """
+    {url: {"kinds": [...], "usedBy": ["<id>:<campo>", ...]}} de todas as imagens do catálogo.
+    Uma URL usada em vários lugares é processada uma vez, com as larguras de todos os usos.
+    """
+    images = {}
+
+    def add(url, kind, where):
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return
+        entry = images.setdefault(url, {"kinds": [], "usedBy": []})
+        if kind not in entry["kinds"]:
+            entry["kinds"].append(kind)
+        entry["usedBy"].append(where)
+
+    for anime in animes:
+        anime_id = anime.get("id")
+        add(anime.get("coverImage"), "cover", f"{anime_id}:coverImage")
+        add(anime.get("bannerImage"), "banner", f"{anime_id}:bannerImage")
+        for season in anime.get("seasons") or []:
+            s_num = season.get("season")
+            add(season.get("posterImage"), "poster", f"{anime_id}:s{s_num}:posterImage")
+            for i, still in enumerate(season.get("stills") or []):
+                add(still, "still", f"{anime_id}:s{s_num}:stills[{i}]")
+    return images
+
+
+# ── Placeholders ─────────────────────────────────────────────────────────────
+
+_B83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+_SRGB_TO_LINEAR = [(v / 12.92) if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4 for v in (i / 255 for i in range(256))]
+
+
+def _base83(value, length):
+    return "".join(_B83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _linear_to_srgb(v):
+    v = max(0.0, min(1.0, v))
+    return int(round((v * 12.92 if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055) * 255))
+
+
+def blurhash(img, components=BLURHASH_COMPONENTS):
+    """Blurhash (https://blurha.sh) calculado sobre uma miniatura de até 32px."""
+    cx, cy = components
+    small = img.convert("RGB")
+    small.thumbnail((32, 32))
+    w, h = small.size
+    raw = small.tobytes()
+    pixels = [(_SRGB_TO_LINEAR[raw[k]], _SRGB_TO_LINEAR[raw[k + 1]], _SRGB_TO_LINEAR[raw[k + 2]]) for k in range(0, len(raw), 3)]
+    cos_x = [[math.cos(math.pi * i * x / w) for x in range(w)] for i in range(cx)]
+    cos_y = [[math.cos(math.pi * j * y / h) for y in range(h)] for j in range(cy)]
+
+    factors = []
+    for j in range(cy):
+        for i in range(cx):
+            norm = (1 if i == 0 and j == 0 else 2) / (w * h)
+            r = g = b = 0.0
+            for y in range(h):
+                row = y * w
+                for x in range(w):
+                    basis = cos_x[i][x] * cos_y[j][y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            factors.append((r * norm, g * norm, b * norm))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((cx - 1) + (cy - 1) * 9, 1)
+    if ac:
+        quantized_max = max(0, min(82, int(math.floor(max(abs(v) for f in ac for v in f) * 166 - 0.5))))
+        max_value = (quantized_max + 1) / 166
+        result += _base83(quantized_max, 1)
+    else:
+        max_value = 1.0
+        result += _base83(0, 1)
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+    for f in ac:
+        qr, qg, qb = (
+            max(0, min(18, int(math.floor(math.copysign(abs(v / max_value) ** 0.5, v) * 9 + 9.5))))
+            for v in f
+        )
+        result += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
+
+
+def lqip(img, width=LQIP_WIDTH):
+    """WebP minúsculo em data URI, para mostrar borrado enquanto a variante carrega."""
+    small = img.copy()
+    small.thumbnail((width, width * 4))
+    buf = io.BytesIO()
+    small.save(buf, "WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+# ── Processamento ────────────────────────────────────────────────────────────
+
+def target_widths(kinds):
+    return sorted({w for kind in kinds for w in WIDTHS[kind]})
+
+
+def _save_atomic(img, path, fmt):
+    tmp_path = f"{path}.tmp"
+    img.save(tmp_path, fmt.upper(), quality=QUALITY[fmt])
+    os.replace(tmp_path, path)
+
+
+def render_image(data, widths, formats, out_dir=IMAGES_DIR):
+    """Gera variantes + placeholders de uma imagem baixada. Retorna a entrada do manifest."""
+    src_hash = hashlib.sha256(data).hexdigest()[:16]
+    with Image.open(io.BytesIO(data)) as opened:
+        img = ImageOps.exif_transpose(opened)
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+    w, h = img.size
+
+    variants = {fmt: {} for fmt in formats}
+    for width in sorted({min(w, target) for target in widths}):
+        resized = None
+        for fmt in formats:
+            name = f"{src_hash}-{width}.{fmt}"
+            path = os.path.join(out_dir, name)
+            if not os.path.exists(path):       # mesmo conteúdo já processado (outra URL ou run anterior)
+                if resized is None:
+                    resized = img if width == w else img.resize((width, max(1, round(h * width / w))), Image.LANCZOS)
+                _save_atomic(resized, path, fmt)
+            variants[fmt][str(width)] = f"{PUBLIC_PREFIX}/{name}"
+
+    return {
+        "hash": src_hash,
+        "width": w,
+        "height": h,
+        "blurhash": blurhash(img),
+        "placeholder": lqip(img),
+        "variants": variants,
+    }
+
+
+def entry_files(entry, out_dir=IMAGES_DIR):
+    return [
+        os.path.join(out_dir, rel.split("/", 1)[1])
+        for by_width in (entry.get("variants") or {}).values()
+        for rel in by_width.values()
+    ]
+
+
+def is_processed(entry, widths, formats, out_dir=IMAGES_DIR):
+    """Entrada do manifest completa para estas larguras/formatos e com todos os arquivos no disco."""
+    if not entry or any(fmt not in entry.get("variants", {}) for fmt in formats):
+        return False
+    expected = {str(min(entry["width"], target)) for target in widths}
+    if any(set(entry["variants"][fmt]) != expected for fmt in formats):
+        return False
+    return all(os.path.exists(path) for path in entry_files(entry, out_dir))
+
+
+async def download(http, url):
+    rec = fetch_record("image", url)
+    try:
+        async with http.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT)) as r:
+            rec.http_status = r.status
+            r.raise_for_status()
+            if (r.content_length or 0) > MAX_BYTES:
+                raise ValueError(f"imagem grande demais ({r.content_length} bytes)")
+            data = await r.read()
+        rec.bytes = len(data)
+        return rec.hit(data, "aiohttp")
+    except Exception as e:
+        rec.error = str(e)
+        print(f"   [IMG] Erro ao baixar {url[:80]}: {e}")
+        return None
+    finally:
+        rec.save()
+
+
+async def process_images(images, previous, formats, out_dir=IMAGES_DIR, force=False):
+    """Baixa e processa o que falta. Retorna {url: entrada} (entradas antigas reaproveitadas)."""
+    downloads = asyncio.Semaphore(DOWNLOADS)
+    cpu = asyncio.Semaphore(os.cpu_count() or 2)
+    result = {}
+    counts = {"novas": 0, "reaproveitadas": 0, "falhas": 0}
+
+    async def one(http, url, info):
+        old = previous.get(url)
+        widths = target_widths(info["kinds"])
+        if not force and is_processed(old, widths, formats, out_dir):
+            result[url] = dict(old, **info)
+            counts["reaproveitadas"] += 1
+            return
+        async with downloads:
+            data = await download(http, url)
+        if not data:
+            counts["falhas"] += 1
+            return
+        try:
+            async with cpu:
+                # Pillow solta o GIL no resize/encode, então threads bastam
+                entry = await asyncio.to_thread(render_image, data, widths, formats, out_dir)
+        except Exception as e:
+            print(f"   [IMG] Erro ao processar {url[:80]}: {e}")
+            counts["falhas"] += 1
+            return
+        result[url] = dict(entry, **info)
+        counts["novas"] += 1
+        print(f"   [IMG] {'/'.join(info['kinds']):12} {entry['width']}x{entry['height']} -> {entry['hash']} ({url[:60]})")
+
+    async with aiohttp.ClientSession() as http:
+        await asyncio.gather(*(one(http, url, info) for url, info in images.items()))
+    return result, counts
+
+
+def remove_orphans(entries, out_dir=IMAGES_DIR):
+    """Apaga variantes que nenhuma entrada do manifest usa mais."""
+    keep = {os.path.normpath(path) for entry in entries.values() for path in entry_files(entry, out_dir)}
+    removed = 0
+    for path in glob.glob(os.path.join(out_dir, "*-*.*")):
+        if os.path.normpath(path) not in keep and not path.endswith(".json"):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def build_images(animes, out_dir=IMAGES_DIR, force=False):
+    if Image is None:
+        print("❌ Pillow não instalado (pip install pillow).")
+        return None
+    formats = output_formats()
+    if "avif" not in formats:
+        print("⚠️ Pillow sem suporte a AVIF: gerando só WebP.")
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    previous = {}
+    if os.path.exists(manifest_path):
+        try:
+            previous = load_json(manifest_path).get("images") or {}
+        except Exception as e:
+            print(f"⚠️ Manifest de imagens ilegível ({e}); processando tudo.")
+
+    images = catalog_images(animes)
+    entries, counts = asyncio.run(process_images(images, previous, formats, out_dir, force))
+    # Falha de download não apaga o que já tinha sido gerado antes
+    for url in images:
+        if url not in entries and url in previous:
+            entries[url] = previous[url]
+    entries = dict(sorted(entries.items()))
+    removed = remove_orphans(entries, out_dir)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "formats": list(formats),
+        "hash": content_hash(entries),
+        "images": entries,
+    }
+    dump_json_atomic(manifest, manifest_path, pretty=False)
+    print(f"🖼️ {len(entries)} imagens em {out_dir} ({counts['novas']} novas, "
+          f"{counts['reaproveitadas']} reaproveitadas, {counts['falhas']} falhas, {removed} arquivos removidos)")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as variantes locais das imagens do catálogo.")
+    parser.add_argument("--forcar", action="store_true", help="baixa e gera tudo de novo")
+    parser.add_argument("--saida", default=IMAGES_DIR)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    if build_images(list(catalog["animes"].values()), args.saida, args.forcar) is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Índice de busca offline do catálogo (gerado junto com o output.json).
+
+- Títulos (title, titleRomaji, titleJapanese): trigramas, para busca aproximada
+  ("frieren" acha "Sousou no Frieren", "jujutsu kaisn" acha "Jujutsu Kaisen").
+  Funciona também com japonês, já que os trigramas são de caracteres.
+- genre, studio e synopsis: índice invertido de palavras (busca full-text).
+
+O arquivo gerado (search_index.json) é compacto e pode ser carregado pelo
+servidor ou pelo client para responder buscas sem varrer o catálogo.
+
+Uso:
+  python Api/IndiceBusca.py                 # gera search_index.json a partir do catálogo
+  python Api/IndiceBusca.py "jujutsu"       # busca no índice já gerado
+"""
+
+import re
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+
+from Catalogo import load_catalog, load_json
+from SaidaJson import dump_json_atomic
+
+INDEX_FILE = "search_index.json"
+INDEX_VERSION = 1
+
+TITLE_FIELDS = ("title", "titleRomaji", "titleJapanese")
+WORD_WEIGHTS = {"genre": 2, "studio": 2, "synopsis": 1}
+TITLE_WEIGHT = 3
+MIN_TRIGRAM_MATCH = 0.3     # fração mínima dos trigramas da busca presentes no título
+
+_NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+_STOPWORDS = {
+    "a", "o", "e", "de", "da", "do", "das", "dos", "em", "um", "uma", "no", "na",
+    "the", "of", "and", "to", "in", "is", "for", "on", "with", "as", "by", "an",
+}
+_KANA_MARKS = {"\u3099", "\u309a"}   # dakuten/handakuten: ガ != カ, não são acento
+
+
+def normalize(text):
+    """Minúsculas, sem acento, katakana -> hiragana e só letras/números separados por espaço."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).lower()
+    text = "".join(
+        c for c in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(c) or c in _KANA_MARKS
+    )
+    text = unicodedata.normalize("NFC", text)
+    text = "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in text)
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def trigrams(text):
+    """Trigramas de cada palavra com espaço nas pontas (' ab', 'abc', 'bc ')."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def words(text):
+    return [w for w in normalize(text).split() if w not in _STOPWORDS and len(w) > 1]
+
+
+def _as_text(value):
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return value or ""
+
+
+def build_search_index(animes):
+    docs = []
+    titles = []
+    title_grams = []
+    tri = defaultdict(list)
+    word_index = defaultdict(dict)
+
+    for doc_idx, anime in enumerate(animes):
+        docs.append([anime.get("id"), anime.get("title"), anime.get("coverImage") or ""])
+
+        all_titles = [anime.get(f) for f in TITLE_FIELDS if anime.get(f)]
+        titles.append(" | ".join(normalize(t) for t in all_titles))
+        grams = set()
+        for t in all_titles:
+            grams |= trigrams(t)
+        title_grams.append(len(grams))
+        for g in grams:
+            tri[g].append(doc_idx)
+
+        fields = {
+            "genre": _as_text(anime.get("genre")),
+            "studio": _as_text(anime.get("studio")),
+            "synopsis": " ".join(
+                s.get("synopsis") or "" for s in anime.get("seasons") or [] if isinstance(s, dict)
+            ),
+        }
+        for field, text in fields.items():
+            for w in set(words(text)):
+                postings = word_index[w]
+                postings[doc_idx] = max(postings.get(doc_idx, 0), WORD_WEIGHTS[field])
+
+    return {
+        "version": INDEX_VERSION,
+        "generatedAt": int(time.time()),
+        "docs": docs,
+        "titles": titles,
+        "titleGrams": title_grams,
+        "tri": dict(tri),
+        # postings compactos: [doc, peso, doc, peso, ...]
+        "words": {w: [x for item in sorted(p.items()) for x in item] for w, p in word_index.items()},
+    }
+
+
+def write_search_index(animes, path=INDEX_FILE):
+    index = build_search_index(animes)
+    dump_json_atomic(index, path, pretty=False)
+    print(f"🔎 Índice de busca com {len(index['docs'])} animes salvo em {path}")
+    return index
+
+
+def load_search_index(path=INDEX_FILE):
+    index = load_json(path)
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(f"versão de índice não suportada: {index.get('version')}")
+    return index
+
+
+def search(index, query, limit=10):
+    """Retorna [(id, título, score)] ordenado por relevância."""
+    scores = defaultdict(float)
+    norm = normalize(query)
+    if not norm:
+        return []
+
+    q_grams = trigrams(norm)
+    if len(norm.replace(" ", "")) < 3:
+        # busca curta demais para trigramas: substring nos títulos
+        for doc_idx, titles in enumerate(index["titles"]):
+            if norm in titles:
+                scores[doc_idx] += TITLE_WEIGHT
+    elif q_grams:
+        hits = defaultdict(int)
+        for g in q_grams:
+            for doc_idx in index["tri"].get(g, ()):
+                hits[doc_idx] += 1
+        for doc_idx, h in hits.items():
+            containment = h / len(q_grams)
+            if containment >= MIN_TRIGRAM_MATCH:
+                # parecido com o Jaccard, mas sem punir tanto títulos longos
+                similarity = h / (len(q_grams) + 0.25 * index["titleGrams"][doc_idx])
+                scores[doc_idx] += TITLE_WEIGHT * (containment + similarity)
+
+    for w in words(norm):
+        postings = index["words"].get(w)
+        if postings:
+            for i in range(0, len(postings), 2):
+                scores[postings[i]] += postings[i + 1]
+
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return [(index["docs"][d][0], index["docs"][d][1], round(s, 3)) for d, s in ranked]
+
+
+def main():
+    if len(sys.argv) > 1:
+        index = load_search_index()
+        query = " ".join(sys.argv[1:])
+        t0 = time.perf_counter()
+        results = search(index, query)
+        elapsed = (time.perf_counter() - t0) * 1000
+        for anime_id, title, score in results:
+            print(f"{score:7.3f}  {anime_id}  ({title})")
+        print(f"[{len(results)} resultados em {elapsed:.3f} ms]")
+        return
+
+    catalog = load_catalog()
+    write_search_index(list(catalog["animes"].values()))
+
+
+if __name__ == "__main__":
+    main()
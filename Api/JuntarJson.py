@@ -1,36 +1,58 @@
 import os
 import json
 
+from Agregados import write_home_aggregates
+from Catalogo import load_catalog
+from Delta import load_previous_output, write_catalog_delta
+from Identidade import dedupe_animes
+from IndiceBusca import write_search_index
+from Recomendacoes import add_recommendations
+from Shards import write_shards
+
+
 def merge_json_from_folder(folder_path, output_file="output.json"):
     if not os.path.exists(folder_path):
         print(f"❌ Pasta não encontrada: {folder_path}")
         return
 
-    result = []
+    catalog = load_catalog([os.path.join(folder_path, "*.json")])
+
+    for label, problems in catalog["errors"].items():
+        print(f"⚠️ Ignorando {label}: {problems[0]}" + (f" (+{len(problems) - 1})" if len(problems) > 1 else ""))
+
+    result = list(catalog["animes"].values())
 
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".json"):
-            full_path = os.path.join(folder_path, filename)
-            try:
-                with open(full_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+    # Mesmo anime salvo com slugs diferentes (malId/título): vira uma entrada só, com "aliases"
+    result, merges = dedupe_animes(result)
+    for primary, merged_ids in merges:
+        print(f"🔁 {', '.join(merged_ids)} juntado(s) em {primary}")
 
-                    # Se for lista, espalha
-                    if isinstance(data, list):
-                        result.extend(data)
-                    else:
-                        result.append(data)
+    # Relacionados + recommended calculados a partir do catálogo inteiro
+    add_recommendations(result)
 
-            except Exception as e:
-                print(f"⚠️ Erro ao ler {filename}: {e}")
+    # Build anterior, antes de ser sobrescrito: base do delta desta versão
+    previous = load_previous_output(output_file)
 
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
 
     print(f"✅ {len(result)} registros salvos em {output_file}")
 
+    # Índice de busca gerado no mesmo passo, ao lado do output.json
+    write_search_index(result, os.path.join(os.path.dirname(output_file), "search_index.json"))
+
+    # Versão fatiada (manifest + um arquivo por anime/temporada) para carregamento parcial
+    write_shards(result)
+
+    # Fileiras da home (top, em lançamento, episódios recentes, gêneros) já prontas
+    write_home_aggregates(result, catalog["sources"])
+
+    # Patch versionado em relação ao build anterior (clientes atualizam sem baixar tudo)
+    write_catalog_delta(previous, result)
+
 
 # 👉 Caminho da pasta aqui
-folder_path = "./api/Animes"
+folder_path = os.path.join("Api", "Animes")
 
-merge_json_from_folder(folder_path)
\ No newline at end of file
+if __name__ == "__main__":
+    merge_json_from_folder(folder_path)
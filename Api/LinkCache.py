@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Cache persistente dos links já resolvidos (iframe do anidrive, m3u8, etc).
+
+Cada entrada é indexada por (URL da página do episódio, áudio desejado) e guarda
+o link final e quando ele foi resolvido/verificado. Entradas dentro do TTL são
+usadas direto; entradas vencidas passam por uma checagem barata (HEAD ou leitura
+do manifest) e só são descartadas — e re-extraídas — se o link estiver morto.
+"""
+
+import os
+import re
+import json
+import time
+import requests
+
+LINK_CACHE_FILE = os.path.join("cache", "links.json")
+LINK_TTL = 3 * 24 * 3600      # 3 dias sem revalidar
+CHECK_TIMEOUT = 8
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Wrapper do anivideo: o que interessa é o manifest dentro de ?d=
+VIDEOHLS_D_RE = re.compile(r'videohls\.php\?d=([^&]+)', re.IGNORECASE)
+
+
+AUDIOS = ("dub", "sub")
+ALL_AUDIOS = "all"   # desired_audio que pede todos os áudios da página numa carga só
+
+
+def page_groups(targets):
+    """
+    Junta os áudios de um episódio que apontam para a mesma página
+    (animesonlinecc: dub e sub no mesmo player).
+    targets: {"dub": (url, flags) ou None, "sub": ...}. Retorna [(url, flags, [áudios])].
+    """
+    groups = {}
+    for audio in AUDIOS:
+        if targets.get(audio):
+            url, flags = targets[audio]
+            groups.setdefault(url, (url, flags, []))[2].append(audio)
+    return list(groups.values())
+
+
+def as_tracks(found, audios=AUDIOS):
+    """Resultado de uma extração com ALL_AUDIOS -> {áudio: link}; um link só vale para todos."""
+    if isinstance(found, dict):
+        return {audio: found.get(audio) for audio in audios}
+    return {audio: found for audio in audios}
+
+
+def cache_key(ep_url, desired_audio=None):
+    return f"{desired_audio or 'any'}|{ep_url}"
+
+
+def load_link_cache(path=LINK_CACHE_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"[CACHE] Erro ao ler {path}: {e}. Começando cache vazio.")
+        return {}
+
+
+def save_link_cache(cache, path=LINK_CACHE_FILE):
+    """Grava o cache em arquivo temporário e troca de uma vez (nunca fica pela metade)."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_link_alive(link, session=None, timeout=CHECK_TIMEOUT):
+    """
+    Checagem barata de vida de um link.
+
+      - videohls.php?d=... / .m3u8 -> baixa o manifest e confere o '#EXTM3U'
+      - qualquer outro             -> HEAD (com fallback para GET se o host recusar HEAD)
+    """
+    http = session or requests
+    target = link
+    m = VIDEOHLS_D_RE.search(link)
+    if m:
+        target = m.group(1)
+    try:
+        if ".m3u8" in target.lower():
+            with http.get(target, headers=HEADERS, timeout=timeout, stream=True) as r:
+                if r.status_code >= 400:
+                    return False
+                head = next(r.iter_content(64), b"")
+                return head.lstrip().startswith(b"#EXTM3U")
+
+        r = http.head(target, headers=HEADERS, timeout=timeout, allow_redirects=True)
+        if r.status_code in (403, 405, 501):
+            with http.get(target, headers=HEADERS, timeout=timeout, stream=True) as r2:
+                return r2.status_code < 400
+        return r.status_code < 400
+    except requests.RequestException:
+        return False
+
+
+def get_cached_link(cache, ep_url, desired_audio=None, ttl=LINK_TTL, session=None):
+    """
+    Retorna o link em cache ou None.
+    Entradas vencidas são revalidadas; se o link morreu, a entrada é removida.
+    """
+    key = cache_key(ep_url, desired_audio)
+    entry = cache.get(key)
+    if not entry or not entry.get("link"):
+        return None
+
+    now = time.time()
+    if now - entry.get("checkedAt", 0) < ttl:
+        return entry["link"]
+
+    if is_link_alive(entry["link"], session=session):
+        entry["checkedAt"] = now
+        return entry["link"]
+
+    print(f"   [CACHE] Link morto, será re-extraído: {entry['link'][:80]}")
+    del cache[key]
+    return None
+
+
+def put_cached_link(cache, ep_url, desired_audio, link):
+    now = time.time()
+    cache[cache_key(ep_url, desired_audio)] = {
+        "link": link,
+        "resolvedAt": now,
+        "checkedAt": now,
+    }
+
+
+def cached_resolve(cache, ep_url, desired_audio, resolver, session=None):
+    """
+    Usa o cache quando possível; caso contrário chama resolver() e guarda o resultado.
+    Resultados vazios (None) não são guardados para serem tentados de novo no próximo run.
+    """
+    link = get_cached_link(cache, ep_url, desired_audio, session=session)
+    if link:
+        print(f"   [CACHE] {desired_audio or 'any'}: {link[:80]}")
+        return link
+    link = resolver()
+    if link:
+        put_cached_link(cache, ep_url, desired_audio, link)
+    return link
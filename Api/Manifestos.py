@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Inspeção dos manifests HLS (m3u8) dos links do catálogo.
+
+Para o anivideo e para o fallback de captura de rede o catálogo guarda só a URL
+de um m3u8. Aqui cada manifest é baixado e analisado, tudo em paralelo
+(aiohttp, com limite de requisições por host):
+  - master: variantes (resolução, BANDWIDTH, codecs);
+  - playlist de cada variante (ou o próprio link, se já é uma): duração alvo e
+    média dos segmentos, duração total e host da CDN dos segmentos;
+  - tempo até o primeiro segmento (TTFS) de cada variante: master + playlist
+    da variante + primeiros bytes do primeiro segmento, o caminho que o player
+    faz para começar a tocar. startupMs é o TTFS da primeira variante (a que o
+    player carrega primeiro).
+
+O resultado vai para relatorio_manifestos.json e para cache/manifestos.json
+(manifests analisados há menos de MANIFEST_TTL não são baixados de novo).
+
+--espelhos: manifests do anivideo também são medidos nos outros servidores da
+  CDN (cdn-s01..cdn-sNN); o mais rápido fica no relatório.
+--aplicar:  os arquivos do catálogo ganham "streams" por áudio (host, variantes,
+  duração dos segmentos e a variante de início mais rápido) e o embed passa a
+  usar o espelho mais rápido quando ele ganha por MIN_GAIN.
+
+Uso:
+  python Api/Manifestos.py                       # analisa Api/Animes e grava o relatório
+  python Api/Manifestos.py --espelhos --aplicar
+  python Api/Manifestos.py arquivo.json ...
+"""
+
+import re
+import time
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from CapturaRede import media_candidate
+from Catalogo import load_json, iter_episodes
+from Historico import fetch_record
+from Normalizar import FORMAT_NAME, expand_anime, normalize_anime
+from SaidaJson import dump_json_atomic
+from VerificarLinks import iter_catalog_files, iter_embeds, embed_src
+
+DEFAULT_SOURCES = ["Api/Animes/*.json"]
+REPORT_FILE = "relatorio_manifestos.json"
+MANIFEST_CACHE_FILE = "cache/manifestos.json"
+MANIFEST_TTL = 7 * 24 * 3600
+
+INSPECTIONS = 16           # manifests analisados ao mesmo tempo
+PER_HOST = 4               # requisições simultâneas por host
+FETCH_TIMEOUT = 15
+MAX_VARIANTS = 8           # variantes medidas por master
+MIN_START_HEIGHT = 360     # variante de início abaixo disso não conta como "mais rápida"
+SEGMENT_PROBE_BYTES = 64 * 1024
+
+# Espelhos da CDN do anivideo: mesmo caminho em cdn-s01, cdn-s02, ...
+MIRROR_HOST_RE = re.compile(r'^cdn-s(\d+)(\.mywallpaper-4k-image\.net)$', re.IGNORECASE)
+MIRROR_COUNT = 4
+MIN_GAIN = 0.2             # espelho/variante só é preferido se começar 20% mais rápido
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+ATTR_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+# ── Parser ───────────────────────────────────────────────────────────────────
+
+def parse_attributes(line):
+    return {k: v.strip('"') for k, v in ATTR_RE.findall(line.split(":", 1)[1])}
+
+
+def _variant(attrs, uri):
+    width = height = None
+    m = re.match(r'(\d+)x(\d+)$', attrs.get("RESOLUTION", ""))
+    if m:
+        width, height = int(m.group(1)), int(m.group(2))
+    try:
+        frame_rate = float(attrs["FRAME-RATE"]) if "FRAME-RATE" in attrs else None
+    except ValueError:
+        frame_rate = None
+    return {
+        "uri": uri,
+        "bandwidth": int(attrs["BANDWIDTH"]) if attrs.get("BANDWIDTH", "").isdigit() else None,
+        "averageBandwidth": int(attrs["AVERAGE-BANDWIDTH"]) if attrs.get("AVERAGE-BANDWIDTH", "").isdigit() else None,
+        "resolution": attrs.get("RESOLUTION"),
+        "width": width,
+        "height": height,
+        "codecs": attrs.get("CODECS"),
+        "frameRate": frame_rate,
+    }
+
+
+def parse_playlist(text, base_url):
+    """
+    Texto de um m3u8 -> {"kind": "master", "variants": [...]} ou
+    {"kind": "media", "segments", "targetDuration", "segmentDuration", ...}. None se não é HLS.
+    """
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("#EXTM3U"):
+        return None
+    variants, segments = [], []
+    stream_inf = duration = target = None
+    init_map = None
+    endlist = False
+    for line in lines[1:]:
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            stream_inf = parse_attributes(line)
+        elif line.startswith("#EXTINF:"):
+            try:
+                duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+            except ValueError:
+                duration = None
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            try:
+                target = float(line.split(":", 1)[1])
+            except ValueError:
+                pass
+        elif line.startswith("#EXT-X-MAP:"):
+            init_map = urljoin(base_url, parse_attributes(line).get("URI", ""))
+        elif line.startswith("#EXT-X-ENDLIST"):
+            endlist = True
+        elif line.startswith("#"):
+            continue
+        elif stream_inf is not None:
+            variants.append(_variant(stream_inf, urljoin(base_url, line)))
+            stream_inf = None
+        else:
+            segments.append((urljoin(base_url, line), duration))
+            duration = None
+
+    if variants:
+        return {"kind": "master", "variants": variants}
+    durations = [d for _, d in segments if d]
+    first = init_map or (segments[0][0] if segments else None)
+    return {
+        "kind": "media",
+        "segments": len(segments),
+        "targetDuration": target,
+        "segmentDuration": round(statistics.mean(durations), 3) if durations else None,
+        "duration": round(sum(durations), 1) if durations else None,
+        "endlist": endlist,
+        "firstSegment": first,
+        "segmentHost": urlparse(first).hostname if first else None,
+    }
+
+
+# ── Medição ──────────────────────────────────────────────────────────────────
+
+async def timed_fetch(http, hosts, url, path, probe_bytes=None):
+    """
+    (corpo, ms) de uma requisição, medida já dentro do limite do host.
+    probe_bytes: lê só o começo (segmento) e o tempo é até os primeiros bytes.
+    """
+    rec = fetch_record("manifest", url)
+    try:
+        async with hosts[urlparse(url).hostname or ""]:
+            t0 = time.perf_counter()
+            headers = dict(HEADERS, Range=f"bytes=0-{probe_bytes - 1}") if probe_bytes else HEADERS
+            async with http.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)) as r:
+                rec.http_status = r.status
+                r.raise_for_status()
+                body = await (r.content.readany() if probe_bytes else r.read())
+            ms = round((time.perf_counter() - t0) * 1000)
+        rec.bytes = len(body)
+        return rec.hit(body, path), ms
+    except Exception as e:
+        rec.error = str(e) or e.__class__.__name__
+        return None, None
+    finally:
+        rec.save()
+
+
+async def measure_media(http, hosts, url, playlist=None):
+    """Playlist de mídia (baixada aqui se não vier pronta) + primeiro segmento -> (análise, ms)."""
+    ms_playlist = 0
+    if playlist is None:
+        body, ms_playlist = await timed_fetch(http, hosts, url, "media")
+        playlist = parse_playlist(body.decode("utf-8", "replace"), url) if body else None
+        if not playlist or playlist["kind"] != "media":
+            return None, None
+    if not playlist["firstSegment"]:
+        return playlist, None
+    body, ms_segment = await timed_fetch(http, hosts, playlist["firstSegment"], "segment", SEGMENT_PROBE_BYTES)
+    return playlist, (ms_playlist + ms_segment if body else None)
+
+
+def fastest_variant(variants):
+    timed = [v for v in variants if v.get("ttfsMs") is not None]
+    tall = [v for v in timed if (v.get("height") or 0) >= MIN_START_HEIGHT]
+    pool = tall or timed
+    return min(pool, key=lambda v: v["ttfsMs"]) if pool else None
+
+
+async def inspect_manifest(http, hosts, url):
+    """Analisa um manifest. Retorna o resumo (com "error" se não deu para ler)."""
+    body, ms_master = await timed_fetch(http, hosts, url, "master")
+    result = {"checkedAt": round(time.time()), "host": urlparse(url).hostname}
+    parsed = parse_playlist(body.decode("utf-8", "replace"), url) if body else None
+    if not parsed:
+        result["error"] = "sem resposta" if body is None else "não é um m3u8"
+        return result
+
+    if parsed["kind"] == "media":
+        variants = [{"uri": url, "bandwidth": None, "resolution": None, "width": None, "height": None, "codecs": None}]
+        measured = [await measure_media(http, hosts, url, parsed)]
+    else:
+        variants = parsed["variants"][:MAX_VARIANTS]
+        measured = await asyncio.gather(*(measure_media(http, hosts, v["uri"]) for v in variants))
+
+    for variant, (playlist, ms) in zip(variants, measured):
+        playlist = playlist or {}
+        variant.update(
+            segmentDuration=playlist.get("segmentDuration"),
+            targetDuration=playlist.get("targetDuration"),
+            segments=playlist.get("segments"),
+            duration=playlist.get("duration"),
+            segmentHost=playlist.get("segmentHost"),
+            ttfsMs=ms_master + ms if ms is not None else None,
+        )
+    fastest = fastest_variant(variants)
+    result.update(
+        kind=parsed["kind"],
+        variants=variants,
+        cdnHost=next((v["segmentHost"] for v in variants if v.get("segmentHost")), None),
+        startupMs=variants[0]["ttfsMs"],
+        fastestVariant=variants.index(fastest) if fastest else None,
+    )
+    return result
+
+
+def mirror_urls(url, count=MIRROR_COUNT):
+    """Mesmo manifest nos outros servidores da CDN do anivideo ([] se o host não tem espelhos)."""
+    parsed = urlparse(url)
+    m = MIRROR_HOST_RE.match(parsed.hostname or "")
+    if not m:
+        return []
+    width = len(m.group(1))
+    return [
+        parsed._replace(netloc=f"cdn-s{n:0{width}d}{m.group(2)}").geturl()
+        for n in range(1, count + 1) if n != int(m.group(1))
+    ]
+
+
+async def inspect_all(urls, previous, mirrors=False, force=False):
+    """Analisa os manifests que não estão frescos no cache. Retorna {url: resumo}."""
+    hosts = defaultdict(lambda: asyncio.Semaphore(PER_HOST))
+    slots = asyncio.Semaphore(INSPECTIONS)
+    now = time.time()
+    results = {}
+
+    async def one(http, url):
+        old = previous.get(url)
+        if not force and old and not old.get("error") and now - old.get("checkedAt", 0) < MANIFEST_TTL \
+                and (not mirrors or "mirrors" in old):
+            results[url] = old
+            return
+        async with slots:
+            summary = await inspect_manifest(http, hosts, url)
+            if mirrors and not summary.get("error"):
+                alternatives = await asyncio.gather(*(inspect_manifest(http, hosts, alt) for alt in mirror_urls(url)))
+                summary["mirrors"] = {
+                    alt: {"startupMs": r["startupMs"], "cdnHost": r.get("cdnHost")}
+                    for alt, r in zip(mirror_urls(url), alternatives) if not r.get("error") and r.get("startupMs")
+                }
+        results[url] = summary
+        status = summary.get("error") or f"{len(summary['variants'])} variante(s), início {summary['startupMs']} ms"
+        print(f"   [HLS] {status} ({url[:70]})")
+
+    async with aiohttp.ClientSession() as http:
+        await asyncio.gather(*(one(http, url) for url in urls))
+    return results
+
+
+def best_mirror(summary, min_gain=MIN_GAIN):
+    """URL do espelho que começa pelo menos min_gain mais rápido que o original (ou None)."""
+    current = summary.get("startupMs")
+    candidates = [(info["startupMs"], alt) for alt, info in (summary.get("mirrors") or {}).items()]
+    if not current or not candidates:
+        return None
+    ms, alt = min(candidates)
+    return alt if ms <= current * (1 - min_gain) else None
+
+
+# ── Catálogo ─────────────────────────────────────────────────────────────────
+
+def catalog_manifests(patterns):
+    """{manifest: [ocorrências]} dos embeds que são (ou embrulham) um m3u8."""
+    occurrences = defaultdict(list)
+    for path in iter_catalog_files(patterns):
+        for anime_id, season, number, audio, src, _ in iter_embeds(path):
+            manifest = media_candidate(src)
+            if manifest and ".m3u8" in manifest.lower():
+                occurrences[manifest].append({
+                    "file": path, "anime": anime_id, "season": season, "episode": number, "audio": audio,
+                })
+    return occurrences
+
+
+def start_variant(summary, min_gain=MIN_GAIN):
+    """Índice da variante para começar: a mais rápida, se ganhar da primeira por min_gain; senão 0."""
+    fastest = summary.get("fastestVariant")
+    first = summary.get("startupMs")
+    if fastest is None or not first:
+        return 0
+    return fastest if summary["variants"][fastest]["ttfsMs"] <= first * (1 - min_gain) else 0
+
+
+def stream_info(summary):
+    """O que vai para o catálogo: estável entre runs (sem os tempos medidos)."""
+    return {
+        "cdnHost": summary.get("cdnHost"),
+        "variants": [{"resolution": v.get("resolution"), "bandwidth": v.get("bandwidth")} for v in summary["variants"]],
+        "segmentDuration": summary["variants"][0].get("segmentDuration"),
+        "startVariant": start_variant(summary),
+    }
+
+
+def apply_to_catalog(occurrences, results):
+    """Grava "streams" e troca o espelho nos arquivos do catálogo. Retorna quantos arquivos mudaram."""
+    by_file = defaultdict(dict)
+    for manifest, occs in occurrences.items():
+        summary = results.get(manifest)
+        if not summary or summary.get("error"):
+            continue
+        for occ in occs:
+            by_file[occ["file"]][(occ["anime"], occ["season"], occ["episode"], occ["audio"])] = (manifest, summary)
+
+    changed = 0
+    for path, targets in by_file.items():
+        data = load_json(path)
+        animes = data if isinstance(data, list) else [data]
+        normalized = [isinstance(a, dict) and a.get("format") == FORMAT_NAME for a in animes]
+        animes = [expand_anime(a) if isinstance(a, dict) else a for a in animes]
+        dirty = False
+        for anime in animes:
+            for season, ep in iter_episodes(anime):
+                for audio, embed in list((ep.get("embeds") or {}).items()):
+                    hit = targets.get((anime.get("id"), season.get("season"), ep.get("number"), audio))
+                    if not hit:
+                        continue
+                    manifest, summary = hit
+                    info = stream_info(summary)
+                    if (ep.get("streams") or {}).get(audio) != info:
+                        ep.setdefault("streams", {})[audio] = info
+                        dirty = True
+                    mirror = best_mirror(summary)
+                    src = embed_src(embed)
+                    if mirror and src and manifest in src:
+                        ep["embeds"][audio] = embed.replace(manifest, mirror)
+                        dirty = True
+        if dirty:
+            animes = [normalize_anime(a) if n else a for a, n in zip(animes, normalized)]
+            dump_json_atomic(animes if isinstance(data, list) else animes[0], path)
+            changed += 1
+    return changed
+
+
+def build_report(occurrences, results):
+    by_host = defaultdict(list)
+    episodes = []
+    for manifest, occs in occurrences.items():
+        summary = results.get(manifest) or {"error": "não analisado"}
+        if summary.get("startupMs"):
+            by_host[summary.get("cdnHost") or summary.get("host")].append(summary["startupMs"])
+        fastest = summary.get("fastestVariant")
+        for occ in occs:
+            episodes.append({
+                **occ,
+                "manifest": manifest,
+                "error": summary.get("error"),
+                "variants": len(summary.get("variants") or []),
+                "startupMs": summary.get("startupMs"),
+                "fastestVariant": summary["variants"][fastest] if fastest is not None else None,
+                "mirror": best_mirror(summary),
+            })
+    episodes.sort(key=lambda e: (e["anime"] or "", e["season"] or 0, e["episode"] or 0, e["audio"]))
+    return {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "manifests": len(occurrences),
+        "failed": sum(1 for m in occurrences if (results.get(m) or {"error": True}).get("error")),
+        "byCdnHost": {
+            host: {"manifests": len(ms), "medianStartupMs": round(statistics.median(ms))}
+            for host, ms in sorted(by_host.items())
+        },
+        "episodes": episodes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisa os manifests HLS do catálogo.")
+    parser.add_argument("files", nargs="*", help="arquivos/globs do catálogo (padrão: Api/Animes)")
+    parser.add_argument("--espelhos", action="store_true", help="mede também os outros servidores da CDN")
+    parser.add_argument("--aplicar", action="store_true", help="grava 'streams' e o espelho mais rápido no catálogo")
+    parser.add_argument("--forcar", action="store_true", help="ignora o cache de manifests")
+    parser.add_argument("--saida", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    occurrences = catalog_manifests(args.files or DEFAULT_SOURCES)
+    print(f"🎞️ {len(occurrences)} manifests HLS no catálogo...")
+    previous = {}
+    try:
+        previous = load_json(MANIFEST_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ Cache de manifests ilegível ({e}); analisando tudo.")
+
+    results = asyncio.run(inspect_all(list(occurrences), previous, mirrors=args.espelhos, force=args.forcar))
+    dump_json_atomic({**previous, **results}, MANIFEST_CACHE_FILE, pretty=False)
+
+    report = build_report(occurrences, results)
+    dump_json_atomic(report, args.saida)
+    print(f"✅ {report['manifests'] - report['failed']}/{report['manifests']} manifests analisados. Relatório em {args.saida}")
+    for host, stats in report["byCdnHost"].items():
+        print(f"   {host}: {stats['manifests']} manifests, início mediano {stats['medianStartupMs']} ms")
+
+    if args.aplicar:
+        print(f"💾 {apply_to_catalog(occurrences, results)} arquivo(s) do catálogo atualizados.")
+
+
+if __name__ == "__main__":
+    main()
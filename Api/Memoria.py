@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Modo de memória limitada para animes muito longos (500+ episódios, dub e sub).
+
+- RotatingContext / AsyncRotatingContext: substituem o browser.new_context()
+  dos extratores. A cada ROTATE_EVERY páginas o contexto é trocado por um novo
+  (o antigo é fechado quando a última aba dele fecha), então o Chromium não
+  acumula memória de centenas de new_page.
+- spill_season / load_spilled: resultados de cada temporada vão para o disco
+  (cache/spill) em vez de ficarem na memória até o fim do run.
+- MemoryMonitor: acompanha o pico de RSS (Python e, com psutil instalado, o
+  Python mais os processos do Chromium) e imprime o relatório no fim.
+
+Uso:
+  python Api/Full.py --memoria-limitada
+  python Api/Full.py --async --memoria-limitada
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+try:
+    import psutil
+except ImportError:  # psutil é opcional (só para medir o Chromium)
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from SaidaJson import dump_json_atomic
+
+ROTATE_EVERY = 40      # páginas por contexto antes de trocar
+BOUNDED_MAX_PAGES = 2  # abas abertas ao mesmo tempo no motor assíncrono
+SPILL_DIR = os.path.join("cache", "spill")
+
+
+# ── Medição ──────────────────────────────────────────────────────────────────
+
+def _mb(n_bytes):
+    return n_bytes / (1024 * 1024)
+
+
+def python_peak_rss():
+    """Pico de RSS deste processo em bytes (None se a plataforma não informa)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # Linux informa em KB
+
+
+class MemoryMonitor:
+    """Amostra o RSS do processo + filhos (Chromium) e guarda o pico."""
+
+    def __init__(self):
+        self.peak_tree = 0
+        self.samples = 0
+        self._proc = psutil.Process() if psutil else None
+
+    def sample(self):
+        if self._proc is None:
+            return None
+        total = 0
+        for p in [self._proc] + self._proc.children(recursive=True):
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass                      # processo terminou entre a listagem e a leitura
+        self.samples += 1
+        self.peak_tree = max(self.peak_tree, total)
+        return total
+
+    def report(self, rotations=None):
+        self.sample()
+        print("\n[MEM] Relatório de memória")
+        py_peak = python_peak_rss()
+        if py_peak is not None:
+            print(f"   Pico de RSS do Python            : {_mb(py_peak):8.1f} MB")
+        if self._proc is not None:
+            print(f"   Pico de RSS Python + Chromium    : {_mb(self.peak_tree):8.1f} MB ({self.samples} amostras)")
+        else:
+            print("   (instale psutil para medir também os processos do Chromium)")
+        if rotations is not None:
+            print(f"   Contextos do browser renovados   : {rotations}")
+
+
+# ── Rotação de contexto ──────────────────────────────────────────────────────
+
+class RotatingContext:
+    """
+    Contexto (API sync) que é trocado por um novo a cada `every` páginas.
+    Os extratores só usam new_page(), então ele entra no lugar do contexto normal.
+    """
+
+    def __init__(self, browser, every=ROTATE_EVERY, monitor=None):
+        self.browser = browser
+        self.every = every
+        self.monitor = monitor
+        self.context = None
+        self.pages_in_context = 0
+        self.rotations = 0
+
+    def new_page(self):
+        if self.context is None or self.pages_in_context >= self.every:
+            self._rotate()
+        self.pages_in_context += 1
+        if self.monitor:
+            self.monitor.sample()
+        return self.context.new_page()
+
+    def _rotate(self):
+        if self.context is not None:
+            # na API sync as abas já foram fechadas pelos extratores antes da próxima
+            try:
+                self.context.close()
+            except Exception:
+                pass
+            self.rotations += 1
+        self.context = self.browser.new_context()
+        self.pages_in_context = 0
+
+    def close(self):
+        if self.context is not None:
+            try:
+                self.context.close()
+            except Exception:
+                pass
+            self.context = None
+
+
+class AsyncRotatingContext:
+    """
+    Versão async: com várias abas ao mesmo tempo o contexto antigo não pode ser
+    fechado na hora; ele para de receber abas novas e é fechado quando a última
+    aba dele fechar.
+    """
+
+    def __init__(self, browser, every=ROTATE_EVERY, monitor=None):
+        self.browser = browser
+        self.every = every
+        self.monitor = monitor
+        self.context = None
+        self.pages_in_context = 0
+        self.rotations = 0
+        self._open = {}               # contexto -> abas abertas
+        self._lock = asyncio.Lock()
+
+    async def new_page(self):
+        async with self._lock:
+            if self.context is None or self.pages_in_context >= self.every:
+                old = self.context
+                self.context = await self.browser.new_context()
+                self._open[self.context] = 0
+                self.pages_in_context = 0
+                if old is not None:
+                    self.rotations += 1
+                    if self._open.get(old) == 0:
+                        await self._close(old)
+            context = self.context
+            self.pages_in_context += 1
+            self._open[context] += 1
+        if self.monitor:
+            self.monitor.sample()
+        try:
+            page = await context.new_page()
+        except Exception:
+            self._page_closed(context)
+            raise
+        page.on("close", lambda _page: self._page_closed(context))
+        return page
+
+    def _page_closed(self, context):
+        self._open[context] = self._open.get(context, 1) - 1
+        if context is not self.context and self._open[context] <= 0:
+            asyncio.ensure_future(self._close(context))
+
+    async def _close(self, context):
+        self._open.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        for context in list(self._open):
+            await self._close(context)
+        self.context = None
+
+
+# ── Resultados por temporada no disco ────────────────────────────────────────
+
+def spill_season(id_prefix, season_num, value, folder=SPILL_DIR):
+    """Grava o resultado da temporada em disco e devolve o caminho."""
+    path = os.path.join(folder, f"{id_prefix}-s{season_num}.json")
+    dump_json_atomic(value, path, pretty=False)
+    return path
+
+
+def load_spilled(path):
+    """Lê de volta o que spill_season gravou e apaga o arquivo."""
+    with open(path, "r", encoding="utf-8") as f:
+        value = json.load(f)
+    os.remove(path)
+    return value
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Formato normalizado dos episódios (bem menor que o formato "completo").
+
+No formato completo cada episódio repete o iframe inteiro, o título e o crédito:
+
+  {"id": "x-s1-ep1", "number": 1, "title": "X - T1 Episódio 1", "season": "1",
+   "embeds": {"sub": "<iframe ... src=\"https://api.anivideo.net/videohls.php?d=...\" ...>"},
+   "embedCredit": "api.anivideo.net"}
+
+No normalizado a temporada ganha uma tabela de hosts e o episódio guarda só o
+número e o link cru ([índice do host, resto da URL]):
+
+  "embedHosts": ["https://api.anivideo.net"],
+  "episodeList": [{"number": 1, "src": {"sub": [0, "/videohls.php?d=..."]}}]
+
+id, title, season, iframe e embedCredit são gerados pelos templates abaixo. Tudo
+que não bate com o template fica gravado explicitamente no episódio, então
+expand_anime(normalize_anime(x)) == x sempre (compatibilidade com quem lê o
+formato antigo).
+
+Uso:
+  python Api/Normalizar.py entrada.json saida.json            # completo -> normalizado
+  python Api/Normalizar.py entrada.json saida.json --expandir # normalizado -> completo
+"""
+
+import sys
+import copy
+from urllib.parse import urlparse
+
+from Catalogo import load_json
+from SaidaJson import dump_json_atomic
+
+FORMAT_NAME = "normalized-v1"
+
+ID_TEMPLATE = "{id}-s{season}-ep{number}"
+TITLE_TEMPLATE = "{titleRomaji} - T{season} Episódio {number}"
+IFRAME_TEMPLATE = '<iframe width="100%" height="100%" src="{src}" frameborder="0" allowfullscreen></iframe>'
+DEFAULT_CREDIT = "animesonlinecc.to"
+
+_IFRAME_HEAD, _IFRAME_TAIL = IFRAME_TEMPLATE.split("{src}")
+_TEMPLATED_KEYS = ("id", "number", "title", "season", "embeds", "embedCredit")
+
+
+# ── Formato completo (o que o Full.py grava) ─────────────────────────────────
+
+def make_iframe_html(src):
+    if not src:
+        return ""
+    return IFRAME_TEMPLATE.format(src=src)
+
+
+def build_episode(id_prefix, title_romaji, s_num, i, d_link, s_link):
+    embeds = {}
+    embed_credit = DEFAULT_CREDIT
+    if s_link:
+        embeds["sub"] = make_iframe_html(s_link)
+        try: embed_credit = urlparse(s_link).hostname or embed_credit
+        except: pass
+    if d_link:
+        embeds["dub"] = make_iframe_html(d_link)
+        try: embed_credit = urlparse(d_link).hostname or embed_credit
+        except: pass
+
+    return {
+        "id": f"{id_prefix}-s{s_num}-ep{i}",
+        "number": i,
+        "title": f"{title_romaji} - T{s_num} Episódio {i}",
+        "season": str(s_num),
+        "embeds": embeds,
+        "embedCredit": embed_credit.replace("www.", "") if embed_credit else ""
+    }
+
+
+# ── Normalizado <-> completo ─────────────────────────────────────────────────
+
+
+def _template_vars(anime, season_num, number):
+    return {
+        "id": anime.get("id"),
+        "titleRomaji": anime.get("titleRomaji") or anime.get("title"),
+        "season": season_num,
+        "number": number,
+    }
+
+
+def iframe_src(embed):
+    """src de um embed no formato do make_iframe_html, ou None se o HTML for diferente."""
+    if not isinstance(embed, str):
+        return None
+    if embed.startswith(_IFRAME_HEAD) and embed.endswith(_IFRAME_TAIL):
+        src = embed[len(_IFRAME_HEAD):len(embed) - len(_IFRAME_TAIL)]
+        if '"' not in src:
+            return src
+    return None
+
+
+def split_host(src, hosts):
+    """'https://h/x?y' -> [índice de 'https://h' na tabela, '/x?y'] (a tabela cresce se preciso)."""
+    p = urlparse(src)
+    if not p.scheme or not p.netloc:
+        return None
+    base = f"{p.scheme}://{p.netloc}"
+    if not src.startswith(base):
+        return None
+    if base not in hosts:
+        hosts.append(base)
+    return [hosts.index(base), src[len(base):]]
+
+
+def derived_credit(srcs):
+    """Crédito como o Full.py calcula: host do último link (sem 'www.'), ou o padrão."""
+    credit = DEFAULT_CREDIT
+    for src in srcs:
+        credit = urlparse(src).hostname or credit
+    return credit.replace("www.", "") if credit else ""
+
+
+def normalize_episode(ep, hosts, anime, season_num):
+    """Converte um episódio completo para o formato normalizado (hosts é atualizado)."""
+    number = ep.get("number")
+    tv = _template_vars(anime, season_num, number)
+    out = {"number": number}
+
+    if ep.get("id") != ID_TEMPLATE.format(**tv):
+        out["id"] = ep.get("id")
+    if ep.get("title") != TITLE_TEMPLATE.format(**tv):
+        out["title"] = ep.get("title")
+    if ep.get("season") != str(season_num):
+        out["season"] = ep.get("season")
+
+    srcs = []
+    src_map = {}
+    for audio, embed in (ep.get("embeds") or {}).items():
+        src = iframe_src(embed)
+        parts = split_host(src, hosts) if src else None
+        if parts is None:
+            src_map[audio] = embed        # HTML fora do padrão: guarda como veio
+        else:
+            src_map[audio] = parts
+        if src:
+            srcs.append(src)
+    if src_map or "embeds" not in ep:
+        out["src"] = src_map
+    if "embeds" not in ep:
+        out["noEmbeds"] = True
+
+    if "embedCredit" not in ep:
+        out["embedCredit"] = None
+    elif ep["embedCredit"] != derived_credit(srcs):
+        out["embedCredit"] = ep["embedCredit"]
+
+    for k, v in ep.items():
+        if k not in _TEMPLATED_KEYS:
+            out[k] = v
+    return out
+
+
+def expand_episode(nep, hosts, anime, season_num):
+    """Converte um episódio normalizado de volta para o formato completo."""
+    number = nep.get("number")
+    tv = _template_vars(anime, season_num, number)
+    ep = {
+        "id": nep["id"] if "id" in nep else ID_TEMPLATE.format(**tv),
+        "number": number,
+        "title": nep["title"] if "title" in nep else TITLE_TEMPLATE.format(**tv),
+        "season": nep["season"] if "season" in nep else str(season_num),
+    }
+
+    srcs = []
+    embeds = {}
+    for audio, value in (nep.get("src") or {}).items():
+        if isinstance(value, list):
+            src = hosts[value[0]] + value[1]
+            embeds[audio] = IFRAME_TEMPLATE.format(src=src)
+            srcs.append(src)
+        else:
+            embeds[audio] = value
+            src = iframe_src(value)
+            if src:
+                srcs.append(src)
+    if not nep.get("noEmbeds"):
+        ep["embeds"] = embeds
+
+    if "embedCredit" in nep:
+        if nep["embedCredit"] is not None:
+            ep["embedCredit"] = nep["embedCredit"]
+    else:
+        ep["embedCredit"] = derived_credit(srcs)
+
+    for k, v in nep.items():
+        if k not in _TEMPLATED_KEYS and k not in ("src", "noEmbeds"):
+            ep[k] = v
+    return ep
+
+
+def normalize_anime(anime):
+    if anime.get("format") == FORMAT_NAME:
+        return anime
+    out = copy.copy(anime)
+    out["format"] = FORMAT_NAME
+    seasons = []
+    for season in anime.get("seasons") or []:
+        season = dict(season)
+        hosts = []
+        season["episodeList"] = [
+            normalize_episode(ep, hosts, anime, season.get("season"))
+            for ep in season.get("episodeList") or []
+        ]
+        season["embedHosts"] = hosts
+        seasons.append(season)
+    out["seasons"] = seasons
+    return out
+
+
+def expand_anime(anime):
+    if anime.get("format") != FORMAT_NAME:
+        return anime
+    out = {k: v for k, v in anime.items() if k != "format"}
+    seasons = []
+    for season in anime.get("seasons") or []:
+        season = dict(season)
+        hosts = season.pop("embedHosts", [])
+        season["episodeList"] = [
+            expand_episode(nep, hosts, anime, season.get("season"))
+            for nep in season.get("episodeList") or []
+        ]
+        seasons.append(season)
+    out["seasons"] = seasons
+    return out
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) != 2:
+        print(__doc__)
+        return
+    src_path, dst_path = args
+    convert = expand_anime if "--expandir" in sys.argv else normalize_anime
+
+    data = load_json(src_path)
+    result = [convert(a) for a in data] if isinstance(data, list) else convert(data)
+    dump_json_atomic(result, dst_path, pretty=False)
+    print(f"✅ {src_path} -> {dst_path}")
+
+
+if __name__ == "__main__":
+    main()
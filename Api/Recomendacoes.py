@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Animes relacionados e flag "recommended" calculados no merge (JuntarJson.py).
+
+Cada anime vira um vetor de características:
+  - gêneros (one-hot), estúdio (one-hot, "Desconhecido" não conta);
+  - ano e nota em faixas suaves (gaussianas sobre pontos fixos), para que
+    2019 fique perto de 2020 e 8.4 perto de 8.6 na similaridade de cosseno.
+Cada bloco é normalizado e multiplicado pelo seu peso, as linhas são
+normalizadas e a similaridade de todos os pares sai de um produto de matrizes
+(feito em blocos de linhas, então a memória não cresce com n²).
+
+No anime:
+  related      -> [{"id", "similarity"}] com os RELATED_TOP_K mais parecidos
+  recommended  -> nota no quartil de cima do catálogo (em vez de True fixo)
+
+Requer numpy; sem ele o merge segue sem recomendações.
+
+Uso:
+  python Api/Recomendacoes.py [id]      # mostra os relacionados do catálogo
+"""
+
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional (só para esta etapa)
+    np = None
+
+from Shards import anime_score
+
+RELATED_TOP_K = 8
+MIN_SIMILARITY = 0.05          # abaixo disso não é "relacionado"
+RECOMMENDED_QUANTILE = 0.75    # nota >= este quantil do catálogo => recommended
+BLOCK_ROWS = 1024              # linhas por bloco no produto de similaridade
+
+WEIGHTS = {"genre": 1.0, "studio": 0.35, "year": 0.4, "score": 0.3}
+YEAR_STEP, YEAR_WIDTH = 3, 3.0     # pontos a cada 3 anos, largura ~3 anos
+SCORE_STEP, SCORE_WIDTH = 0.5, 0.5
+UNKNOWN_STUDIOS = {"", "desconhecido", "unknown"}
+
+
+def _key(value):
+    return (value or "").strip().lower()
+
+
+def anime_year(anime):
+    years = [s.get("year") for s in anime.get("seasons") or [] if isinstance(s.get("year"), int) and s.get("year") > 0]
+    return min(years) if years else None
+
+
+def _one_hot(values_per_row, n):
+    vocab = {}
+    for values in values_per_row:
+        for v in values:
+            vocab.setdefault(v, len(vocab))
+    block = np.zeros((n, len(vocab)), dtype=np.float32)
+    for row, values in enumerate(values_per_row):
+        for v in values:
+            block[row, vocab[v]] = 1.0
+    return block
+
+
+def _soft_bins(values, step, width):
+    """Valor contínuo -> pesos gaussianos sobre pontos a cada `step` (linha zerada se faltar o valor)."""
+    known = np.array([v for v in values if v is not None], dtype=np.float32)
+    if not len(known):
+        return np.zeros((len(values), 0), dtype=np.float32)
+    anchors = np.arange(known.min() - step, known.max() + 2 * step, step, dtype=np.float32)
+    col = np.array([np.nan if v is None else v for v in values], dtype=np.float32)[:, None]
+    block = np.exp(-((col - anchors[None, :]) / width) ** 2)
+    return np.nan_to_num(block, nan=0.0).astype(np.float32)
+
+
+def _normalize_rows(m):
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+def feature_matrix(animes):
+    n = len(animes)
+    blocks = {
+        "genre": _one_hot([{_key(g) for g in a.get("genre") or []} for a in animes], n),
+        "studio": _one_hot([{_key(a.get("studio"))} - UNKNOWN_STUDIOS for a in animes], n),
+        "year": _soft_bins([anime_year(a) for a in animes], YEAR_STEP, YEAR_WIDTH),
+        "score": _soft_bins([anime_score(a) or None for a in animes], SCORE_STEP, SCORE_WIDTH),
+    }
+    matrix = np.hstack([_normalize_rows(blocks[name]) * WEIGHTS[name] for name in WEIGHTS])
+    return _normalize_rows(matrix)
+
+
+def top_related(features, k=RELATED_TOP_K, block_rows=BLOCK_ROWS):
+    """(índices, similaridades) dos k vizinhos de cada linha, por cosseno, sem a própria linha."""
+    n = features.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.zeros((n, 0), dtype=np.int64), np.zeros((n, 0), dtype=np.float32)
+    idx = np.empty((n, k), dtype=np.int64)
+    sim = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        block = features[start:stop] @ features.T
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        part_sim = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_sim, axis=1, kind="stable")
+        idx[start:stop] = np.take_along_axis(part, order, axis=1)
+        sim[start:stop] = np.take_along_axis(part_sim, order, axis=1)
+    return idx, sim
+
+
+def recommended_flags(animes, quantile=RECOMMENDED_QUANTILE):
+    scores = [anime_score(a) for a in animes]
+    known = [s for s in scores if s]
+    if not known:
+        return [False] * len(animes)
+    cut = float(np.quantile(np.array(known, dtype=np.float32), quantile))
+    return [bool(s) and s >= cut for s in scores]
+
+
+def add_recommendations(animes, k=RELATED_TOP_K):
+    """Preenche 'related' e 'recommended' em cada anime (in place). Retorna False sem numpy."""
+    if np is None:
+        print("⚠️ numpy não instalado: recomendações não calculadas.")
+        return False
+    if not animes:
+        return True
+    idx, sim = top_related(feature_matrix(animes), k)
+    for anime, flag, row_idx, row_sim in zip(animes, recommended_flags(animes), idx, sim):
+        anime["recommended"] = flag
+        anime["related"] = [
+            {"id": animes[j]["id"], "similarity": round(float(s), 3)}
+            for j, s in zip(row_idx, row_sim) if s >= MIN_SIMILARITY
+        ]
+    return True
+
+
+def main():
+    from Catalogo import load_catalog
+
+    animes = list(load_catalog()["animes"].values())
+    if not add_recommendations(animes):
+        sys.exit(1)
+    only = sys.argv[1] if len(sys.argv) > 1 else None
+    for anime in animes:
+        if only and anime["id"] != only:
+            continue
+        flag = "⭐" if anime["recommended"] else "  "
+        related = ", ".join(f"{r['id']} ({r['similarity']:.2f})" for r in anime["related"])
+        print(f"{flag} {anime['id']}: {related or '-'}")
+
+
+if __name__ == "__main__":
+    main()
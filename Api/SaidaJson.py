@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Saída JSON atômica e em streaming para os arquivos gerados pelos extratores.
+
+- atomic_open: escreve num arquivo temporário na mesma pasta e só no final faz
+  os.replace() para o nome definitivo. Quem estiver lendo o arquivo sempre vê o
+  documento antigo completo ou o novo completo, nunca um arquivo truncado.
+- JsonStreamWriter: escreve objetos/arrays aos poucos (ex: um episódio por vez),
+  sem precisar montar o JSON inteiro na memória. No modo pretty o resultado é
+  idêntico ao de json.dump(..., ensure_ascii=False, indent=2).
+"""
+
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+INDENT = "  "
+
+
+@contextmanager
+def atomic_open(path, encoding="utf-8"):
+    """Abre um temporário para escrita; renomeia para `path` só se o bloco terminar sem erro."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def dumps(value, pretty=True):
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def dump_json_atomic(value, path, pretty=True):
+    """Equivalente a json.dump num arquivo, mas com troca atômica."""
+    with atomic_open(path) as f:
+        f.write(dumps(value, pretty=pretty))
+
+
+class JsonStreamWriter:
+    """
+    Escritor incremental de JSON.
+
+      out = JsonStreamWriter(f)
+      out.begin_object()
+      out.write("bleach", key="id")
+      out.begin_array("episodeList")
+      for ep in episodios: out.write(ep)
+      out.end_array()
+      out.end_object()
+    """
+
+    def __init__(self, fp, pretty=True):
+        self.fp = fp
+        self.pretty = pretty
+        self._stack = []   # [tipo ('{' ou '['), itens já escritos]
+
+    def _prefix(self, key):
+        if self._stack:
+            kind, count = self._stack[-1]
+            if kind == "{" and key is None:
+                raise ValueError("valor dentro de objeto precisa de key")
+            if kind == "[" and key is not None:
+                raise ValueError("valor dentro de array não leva key")
+            if count:
+                self.fp.write(",")
+            if self.pretty:
+                self.fp.write("\n" + INDENT * len(self._stack))
+            self._stack[-1][1] += 1
+            if key is not None:
+                self.fp.write(json.dumps(key, ensure_ascii=False) + (": " if self.pretty else ":"))
+
+    def write(self, value, key=None):
+        self._prefix(key)
+        text = dumps(value, pretty=self.pretty)
+        if self.pretty and self._stack:
+            text = text.replace("\n", "\n" + INDENT * len(self._stack))
+        self.fp.write(text)
+
+    def _begin(self, kind, key):
+        self._prefix(key)
+        self.fp.write(kind)
+        self._stack.append([kind, 0])
+
+    def _end(self, kind):
+        if not self._stack or self._stack[-1][0] != kind:
+            raise ValueError(f"fechamento inesperado de '{kind}'")
+        _, count = self._stack.pop()
+        if count and self.pretty:
+            self.fp.write("\n" + INDENT * len(self._stack))
+        self.fp.write("}" if kind == "{" else "]")
+
+    def begin_object(self, key=None):
+        self._begin("{", key)
+
+    def end_object(self):
+        self._end("{")
+
+    def begin_array(self, key=None):
+        self._begin("[", key)
+
+    def end_array(self):
+        self._end("[")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Catálogo fatiado para carregamento parcial (gerado junto com o output.json).
+
+Estrutura gerada em public/catalog/:
+  manifest.json                 -> lista leve: id, title, coverImage, score, hash, path
+  animes/<id>.json              -> dados do anime sem as listas de episódios
+  episodes/<id>-s<N>.json       -> episodeList de cada temporada
+
+Cada arquivo tem um hash do conteúdo (estável, bom para ETag / ?v=hash). O hash
+do anime inclui os hashes das suas temporadas, então basta comparar o manifest
+para saber quais arquivos buscar de novo. Arquivos com conteúdo igual não são
+reescritos, e fatias de animes que saíram do catálogo são apagadas.
+
+Hash e comparação ignoram o cache-buster do anivideo (&nocache...) e o
+generatedAt (mesma regra do Git.py): sem isso uma reextração que só troca o
+nocache mudaria o hash do anime e o manifest, e o Git.py publicaria um
+episodeListHash apontando para um arquivo de episódios que ele não commitou.
+
+Uso:
+  python Api/Shards.py          # fatia o catálogo de Api/Animes
+"""
+
+import os
+import glob
+import json
+import hashlib
+
+from Catalogo import load_catalog
+from Git import normalize_for_compare
+from SaidaJson import atomic_open, dumps
+
+SHARDS_DIR = os.path.join("public", "catalog")
+MANIFEST_VERSION = 1
+
+
+def content_hash(value):
+    """Hash estável do conteúdo (JSON canônico: chaves ordenadas, sem espaços, sem nocache)."""
+    canonical = json.dumps(normalize_for_compare(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def write_if_changed(path, value):
+    """Grava (atomicamente) só se o conteúdo mudou (nocache não conta). Retorna True se escreveu."""
+    text = dumps(value, pretty=False)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current is not None:
+        if current == text:
+            return False
+        try:
+            if normalize_for_compare(json.loads(current)) == normalize_for_compare(value):
+                return False
+        except ValueError:
+            pass
+    with atomic_open(path) as f:
+        f.write(text)
+    return True
+
+
+def anime_score(anime):
+    scores = [s.get("score") for s in anime.get("seasons") or [] if isinstance(s.get("score"), (int, float))]
+    return max(scores) if scores else None
+
+
+def shard_anime(anime):
+    """
+    Divide um anime em (shard do anime, {arquivo: episodeList}).
+    As temporadas no shard ganham episodeListFile/episodeListHash/episodeCount.
+    """
+    anime_id = anime["id"]
+    episode_files = {}
+    seasons = []
+    for season in anime.get("seasons") or []:
+        season = dict(season)
+        episodes = season.pop("episodeList", []) or []
+        rel = f"episodes/{anime_id}-s{season.get('season')}.json"
+        episode_files[rel] = episodes
+        season["episodeListFile"] = rel
+        season["episodeListHash"] = content_hash(episodes)
+        season["episodeCount"] = len(episodes)
+        seasons.append(season)
+    shard = {k: v for k, v in anime.items() if k != "seasons"}
+    shard["seasons"] = seasons
+    return shard, episode_files
+
+
+def write_shards(animes, out_dir=SHARDS_DIR):
+    os.makedirs(os.path.join(out_dir, "animes"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "episodes"), exist_ok=True)
+
+    entries = []
+    keep = set()
+    written = 0
+    for anime in animes:
+        shard, episode_files = shard_anime(anime)
+        for rel, episodes in episode_files.items():
+            keep.add(os.path.normpath(os.path.join(out_dir, rel)))
+            written += write_if_changed(os.path.join(out_dir, rel), episodes)
+
+        rel = f"animes/{anime['id']}.json"
+        keep.add(os.path.normpath(os.path.join(out_dir, rel)))
+        written += write_if_changed(os.path.join(out_dir, rel), shard)
+        entries.append({
+            "id": anime["id"],
+            "title": anime.get("title"),
+            "coverImage": anime.get("coverImage"),
+            "score": anime_score(anime),
+            "hash": content_hash(shard),
+            "path": rel,
+        })
+
+    removed = 0
+    for sub in ("animes", "episodes"):
+        for path in glob.glob(os.path.join(out_dir, sub, "*.json")):
+            if os.path.normpath(path) not in keep:
+                os.remove(path)
+                removed += 1
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "hash": content_hash(entries),
+        "animes": entries,
+    }
+    written += write_if_changed(os.path.join(out_dir, "manifest.json"), manifest)
+    print(f"🧩 {len(entries)} animes fatiados em {out_dir} ({written} arquivos atualizados, {removed} removidos)")
+    return manifest
+
+
+def main():
+    catalog = load_catalog()
+    write_shards(list(catalog["animes"].values()))
+
+
+if __name__ == "__main__":
+    main()
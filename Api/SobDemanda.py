@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Resolvedor sob demanda: o link do episódio é extraído quando alguém vai assistir.
+
+Com `python Api/Full.py --sob-demanda` o catálogo não guarda o link final.
+Cada episódio leva em "sources" a página de cada áudio e o adaptador do site
+({"dub": {"url": ..., "site": "animesonline"}}), e o embed aponta para este
+serviço (/embed/<id do episódio>/<áudio>). No primeiro pedido o serviço roda
+os extratores do FullAsync, guarda o link no cache de links e redireciona o
+player para ele. O esforço de scraping passa a seguir o que é assistido.
+
+  - pedidos simultâneos do mesmo episódio/áudio esperam a mesma extração;
+  - links com menos de RESOLVE_TTL saem direto do cache; os mais velhos são
+    revalidados (LinkCache) e só re-extraídos se morreram;
+  - página que não rendeu link não é tentada de novo antes de FAIL_TTL;
+  - resolvido um episódio, o próximo (mesmo áudio) é aquecido em segundo
+    plano se houver aba livre.
+
+API:
+  GET /embed/<episode_id>/<audio>          -> 302 para o link (?json=1 devolve {"link"})
+  GET /resolve?url=...&site=...&audio=...  -> {"link"}
+  GET /status                              -> contadores e extrações em andamento
+
+Uso:
+  python Api/SobDemanda.py servir [--abas 4] [--porta 8766] [--ttl 6]
+  python Api/Full.py --sob-demanda         # gera o catálogo sem resolver os links (também com --async)
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import requests
+from urllib.parse import quote
+
+from Catalogo import load_catalog, iter_episodes
+from LinkCache import AUDIOS, cache_key, get_cached_link, put_cached_link
+
+RESOLVER_HOST = "127.0.0.1"
+RESOLVER_PORT = 8766
+RESOLVER_URL = os.environ.get("SOB_DEMANDA_URL", f"http://{RESOLVER_HOST}:{RESOLVER_PORT}")
+
+TABS = 4                   # abas em paralelo
+RESOLVE_TTL = 6 * 3600     # s em que um link é usado sem revalidar
+FAIL_TTL = 60              # s até tentar de novo uma página que não rendeu link
+CACHE_SAVE_EVERY = 15      # s entre gravações do cache de links
+CATALOG_CHECK_EVERY = 30   # s entre olhadas nos arquivos do catálogo
+
+# Adaptador do site -> flag do extract_for_episode
+SITE_FLAGS = {
+    "animesonline": "is_animes_online",
+    "animesdigital": "is_animesdigital",
+    "animesonlinecc": "is_animesonlinecc",
+    "anivideo": "is_anivideo",
+}
+GENERIC_SITE = "rede"      # nenhum adaptador: só a captura de rede
+
+
+def site_for_flags(flags):
+    """Flags do plan_episode_urls -> nome do adaptador ("a+b" quando o extrator tenta mais de um)."""
+    names = [site for site, flag in SITE_FLAGS.items() if (flags or {}).get(flag)]
+    return "+".join(names) or GENERIC_SITE
+
+
+def flags_for_site(site):
+    names = (site or GENERIC_SITE).split("+")
+    return {flag: site in names for site, flag in SITE_FLAGS.items()}
+
+
+def lazy_sources(targets):
+    """Targets do plan_episode_urls -> {"dub": {"url", "site"}, ...} (só os áudios que existem)."""
+    return {
+        audio: {"url": targets[audio][0], "site": site_for_flags(targets[audio][1])}
+        for audio in AUDIOS if targets.get(audio)
+    }
+
+
+def lazy_embed_url(episode_id, audio, base=RESOLVER_URL):
+    return f"{base}/embed/{quote(episode_id)}/{audio}"
+
+
+def episode_index(animes):
+    """id do episódio -> {"sources", "next"} (próximo episódio do anime, atravessando temporadas)."""
+    index = {}
+    for anime in animes:
+        previous = None
+        for _, ep in iter_episodes(anime):
+            if not ep.get("id"):
+                continue
+            index[ep["id"]] = {"sources": ep.get("sources") or {}, "next": None}
+            if previous:
+                index[previous]["next"] = ep["id"]
+            previous = ep["id"]
+    return index
+
+
+# ── Resolvedor ───────────────────────────────────────────────────────────────
+
+class LazyResolver:
+    """
+    Cache de links + coalescência de pedidos em cima de uma função de extração.
+    extract: coroutine (url, audio, flags) -> link ou None.
+    """
+
+    def __init__(self, extract, link_cache, check_session=None, ttl=RESOLVE_TTL, fail_ttl=FAIL_TTL):
+        self.extract = extract
+        self.link_cache = link_cache
+        self.check_session = check_session
+        self.ttl = ttl
+        self.fail_ttl = fail_ttl
+        self.inflight = {}        # cache_key -> Task da extração em andamento
+        self.failed = {}          # cache_key -> quando falhou
+        self.background = set()   # aquecimentos em andamento (referência para não serem coletados)
+        self.stats = dict.fromkeys(("cache", "extracted", "coalesced", "failed", "prewarmed"), 0)
+
+    def _task(self, url, site, audio):
+        """Extração em andamento para (url, áudio), criada se ainda não existe."""
+        key = cache_key(url, audio)
+        task = self.inflight.get(key)
+        if task:
+            self.stats["coalesced"] += 1
+            return task
+        task = asyncio.ensure_future(self._resolve(key, url, site, audio))
+        self.inflight[key] = task
+        task.add_done_callback(lambda t: self.inflight.pop(key) if self.inflight.get(key) is t else None)
+        return task
+
+    async def resolve(self, url, site, audio):
+        # shield: quem desistiu (cliente fechou a conexão) não cancela a extração dos outros
+        return await asyncio.shield(self._task(url, site, audio))
+
+    async def _resolve(self, key, url, site, audio):
+        flags = flags_for_site(site)
+        if flags["is_anivideo"]:
+            return await self.extract(url, audio, flags)   # URL direta, sem browser nem cache
+
+        link = await asyncio.to_thread(get_cached_link, self.link_cache, url, audio, self.ttl, self.check_session)
+        if link:
+            self.stats["cache"] += 1
+            return link
+        if time.time() - self.failed.get(key, 0) < self.fail_ttl:
+            return None
+
+        try:
+            link = await self.extract(url, audio, flags)
+        except Exception as e:
+            print(f"   [SOB DEMANDA] erro em {url}: {e}")
+            link = None
+        if link:
+            self.stats["extracted"] += 1
+            self.failed.pop(key, None)
+            put_cached_link(self.link_cache, url, audio, link)
+        else:
+            self.stats["failed"] += 1
+            self.failed[key] = time.time()
+        return link
+
+    def is_warm(self, url, audio):
+        key = cache_key(url, audio)
+        entry = self.link_cache.get(key)
+        return key in self.inflight or bool(entry and time.time() - entry.get("checkedAt", 0) < self.ttl)
+
+    def prewarm(self, url, site, audio):
+        """Resolve em segundo plano (sem esperar) se o link ainda não está quente."""
+        if self.is_warm(url, audio) or time.time() - self.failed.get(cache_key(url, audio), 0) < self.fail_ttl:
+            return False
+        self.stats["prewarmed"] += 1
+        task = self._task(url, site, audio)
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+        return True
+
+
+# ── Servidor ─────────────────────────────────────────────────────────────────
+
+async def serve(tabs=TABS, host=RESOLVER_HOST, port=RESOLVER_PORT, ttl=RESOLVE_TTL, catalog_sources=None):
+    from aiohttp import web
+    from playwright.async_api import async_playwright
+    from FullAsync import extract_for_episode_async
+    from LinkCache import load_link_cache, save_link_cache
+
+    link_cache = load_link_cache()
+    pages = asyncio.Semaphore(tabs)
+    state = {"catalog": None, "index": {}, "checkedAt": 0.0, "savedAt": time.time()}
+
+    async def lookup(episode_id):
+        if episode_id not in state["index"] or time.time() - state["checkedAt"] >= CATALOG_CHECK_EVERY:
+            catalog = await asyncio.to_thread(load_catalog, catalog_sources)
+            state["checkedAt"] = time.time()
+            if catalog is not state["catalog"]:
+                state["catalog"] = catalog
+                state["index"] = episode_index(catalog["animes"].values())
+                print(f"📚 Catálogo carregado: {len(state['index'])} episódios.")
+        return state["index"].get(episode_id)
+
+    def maybe_save():
+        if time.time() - state["savedAt"] >= CACHE_SAVE_EVERY:
+            save_link_cache(link_cache)
+            state["savedAt"] = time.time()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context()
+
+        async def extract(url, audio, flags):
+            async with pages:
+                return await extract_for_episode_async(context, url, desired_audio=audio, **flags)
+
+        resolver = LazyResolver(extract, link_cache, requests.Session(), ttl=ttl)
+
+        async def get_embed(request):
+            episode_id, audio = request.match_info["episode_id"], request.match_info["audio"]
+            entry = await lookup(episode_id)
+            source = entry and entry["sources"].get(audio)
+            if not source:
+                return web.json_response({"error": "episódio/áudio sem fonte sob demanda"}, status=404)
+
+            t0 = time.time()
+            link = await resolver.resolve(source["url"], source.get("site"), audio)
+            print(f"[{episode_id}/{audio}] {'ok' if link else 'sem link'} em {time.time() - t0:.1f}s")
+
+            following = entry["next"] and state["index"].get(entry["next"])
+            next_source = following and following["sources"].get(audio)
+            if next_source and not pages.locked():
+                resolver.prewarm(next_source["url"], next_source.get("site"), audio)
+            maybe_save()
+
+            if not link:
+                return web.json_response({"error": "nenhum link encontrado"}, status=502)
+            if request.query.get("json"):
+                return web.json_response({"link": link})
+            raise web.HTTPFound(link)
+
+        async def get_resolve(request):
+            url, audio = request.query.get("url"), request.query.get("audio")
+            if not url or audio not in AUDIOS:
+                return web.json_response({"error": "informe url e audio (dub|sub)"}, status=400)
+            link = await resolver.resolve(url, request.query.get("site"), audio)
+            maybe_save()
+            return web.json_response({"link": link}, status=200 if link else 502)
+
+        async def get_status(request):
+            return web.json_response({
+                "stats": resolver.stats,
+                "inflight": len(resolver.inflight),
+                "prewarming": len(resolver.background),
+                "tabs": tabs,
+                "episodes": len(state["index"]),
+            })
+
+        app = web.Application()
+        app.router.add_get("/embed/{episode_id}/{audio}", get_embed)
+        app.router.add_get("/resolve", get_resolve)
+        app.router.add_get("/status", get_status)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        print(f"🎬 Resolvedor sob demanda em http://{host}:{port} ({tabs} abas, TTL {ttl // 3600}h)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            save_link_cache(link_cache)
+            await runner.cleanup()
+            await browser.close()
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolvedor de links sob demanda.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_serve = sub.add_parser("servir", help="sobe o serviço")
+    p_serve.add_argument("--abas", type=int, default=TABS)
+    p_serve.add_argument("--porta", type=int, default=RESOLVER_PORT)
+    p_serve.add_argument("--ttl", type=float, default=RESOLVE_TTL / 3600, help="horas sem revalidar um link")
+    args = parser.parse_args()
+
+    if args.cmd == "servir":
+        try:
+            asyncio.run(serve(args.abas, RESOLVER_HOST, args.porta, int(args.ttl * 3600)))
+        except KeyboardInterrupt:
+            print("\n🎬 Resolvedor encerrado.")
+
+
+if __name__ == "__main__":
+    main()
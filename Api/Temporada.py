@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Crawler das listagens de temporada do animesonline.io (/season/<temporada>/).
+
+Lê a listagem (todas as páginas, em paralelo quando a paginação informa o
+total), entra em cada série em paralelo e monta um manifest da temporada em
+Api/Temporadas/<temporada>.json com, por anime:
+  - título, capa, estúdio, status, nota, gêneros, nomes alternativos;
+  - para "sub" e "dub" (a versão dublada é a série com sufixo -dublado):
+    URL da série, ID e URL do 1º episódio, IDs de todos os episódios e se os
+    IDs são sequenciais (é o que o Full.py usa para montar as URLs: start_id + i - 1).
+
+As páginas ficam em cache/ com o mesmo nome de arquivo que as páginas já
+salvas lá (ex: cache/https___animesonline_io_season_verao_2025_.html), então o
+que já foi baixado não é buscado de novo (use --sem-cache para forçar).
+
+Com o manifest pronto, "extrair" roda o motor assíncrono do Full.py para cada
+anime, sem nenhuma pergunta.
+
+Uso:
+  python Api/Temporada.py listar verao-2025 [--sem-cache]
+  python Api/Temporada.py extrair verao-2025 [--so slug1 slug2] [--memoria-limitada]
+"""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import argparse
+import aiohttp
+from bs4 import BeautifulSoup
+
+from GetAnimeInfo import HEADERS
+from Historico import fetch_record
+from SaidaJson import dump_json_atomic
+
+SITE = "https://animesonline.io"
+CACHE_DIR = "cache"
+SEASONS_DIR = os.path.join("Api", "Temporadas")
+FETCHES = 6              # páginas baixadas ao mesmo tempo
+MAX_LIST_PAGES = 20      # trava para paginação que nunca termina
+HTTP_TIMEOUT = 20
+
+DUB_SUFFIX = "-dublado"
+ANIME_URL_RE = re.compile(r'/anime/([^/?#]+)/?$')
+EPISODE_ID_RE = re.compile(r'/(\d+)/?$')
+CARD_EPS_RE = re.compile(r'(\d+)\s*epis', re.IGNORECASE)
+DUB_TITLE_RE = re.compile(r'\s*\(?dublado\)?\s*$', re.IGNORECASE)
+
+
+def season_url(season, page=1):
+    base = f"{SITE}/season/{season}/"
+    return base if page == 1 else f"{base}page/{page}/"
+
+
+def cache_file(url, folder=CACHE_DIR):
+    """Mesmo esquema dos arquivos já em cache/: tudo que não é letra/número vira '_'."""
+    return os.path.join(folder, re.sub(r'[^A-Za-z0-9]', '_', url) + ".html")
+
+
+async def fetch_page(http, limit, url, use_cache=True):
+    path = cache_file(url)
+    if use_cache and os.path.exists(path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    rec = fetch_record("season", url)
+    try:
+        async with limit:
+            async with http.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as r:
+                rec.http_status = r.status
+                if r.status == 404:
+                    return None
+                r.raise_for_status()
+                html = await r.text()
+        rec.bytes = len(html.encode("utf-8"))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        return rec.hit(html, "aiohttp")
+    except Exception as e:
+        print(f"   [!] Erro ao buscar {url}: {e}")
+        rec.error = str(e)
+        return None
+    finally:
+        rec.save()
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────────
+
+def _text(node):
+    return node.get_text(" ", strip=True) if node else None
+
+
+def parse_season_page(html):
+    """
+    Cards da listagem + paginação.
+    Retorna (cards, última página conhecida ou None, URL da próxima página ou None).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    cards = []
+    for card in soup.select("div.card"):
+        link = card.select_one("a[href*='/anime/']")
+        m = ANIME_URL_RE.search(link.get("href", "")) if link else None
+        if not m:
+            continue
+        img = card.select_one("img[data-src]") or card.select_one("noscript img") or card.select_one("img")
+        stats = _text(card.select_one(".stats .left span")) or ""
+        eps = CARD_EPS_RE.search(stats)
+        score = _text(card.select_one(".stats .right span"))
+        alternative = _text(card.select_one(".alternative"))   # nomes separados por vírgula (que também aparece dentro dos nomes)
+        cards.append({
+            "slug": m.group(1),
+            "url": link["href"],
+            "title": link.get("title") or _text(card.select_one(".card-title h2")),
+            "cover": (img.get("data-src") or img.get("src")) if img else None,
+            "studio": _text(card.select_one(".studio")),
+            "episodes": int(eps.group(1)) if eps else None,
+            "type": stats.split("·")[-1].strip() if "·" in stats else None,
+            "status": _text(card.select_one(".status")),
+            "score": float(score) if score and re.fullmatch(r'\d+(?:\.\d+)?', score) else None,
+            "alternative": alternative,
+            "genres": [_text(a) for a in card.select(".card-info-bottom a")],
+        })
+
+    pages = [int(m.group(1)) for a in soup.select(".pagination a, a.page-numbers")
+             if (m := re.search(r'/page/(\d+)/?', a.get("href", "")))]
+    nxt = soup.select_one(".pagination a.next, a.next.page-numbers, .hpage a.r, link[rel=next]")
+    return cards, (max(pages) if pages else None), (nxt.get("href") if nxt else None)
+
+
+def parse_series_page(html):
+    """Episódios da página da série, em ordem: [(número, id, url)]."""
+    soup = BeautifulSoup(html, "html.parser")
+    episodes = {}
+    for a in soup.select(".eplister li a"):
+        m = EPISODE_ID_RE.search(a.get("href", ""))
+        num = _text(a.select_one(".epl-num"))
+        if m and num and num.isdigit():
+            episodes.setdefault(int(num), (int(num), int(m.group(1)), a["href"]))
+    return [episodes[n] for n in sorted(episodes)]
+
+
+# ── Crawl ────────────────────────────────────────────────────────────────────
+
+async def crawl_listing(http, limit, season, use_cache=True):
+    """Todos os cards da temporada, de todas as páginas da listagem."""
+    first = await fetch_page(http, limit, season_url(season), use_cache)
+    if not first:
+        return []
+    cards, last_page, next_url = parse_season_page(first)
+
+    if last_page:
+        # Total conhecido: busca as outras páginas todas juntas
+        htmls = await asyncio.gather(*(
+            fetch_page(http, limit, season_url(season, n), use_cache)
+            for n in range(2, min(last_page, MAX_LIST_PAGES) + 1)
+        ))
+        for html in htmls:
+            if html:
+                cards += parse_season_page(html)[0]
+    else:
+        seen = {season_url(season)}
+        while next_url and next_url not in seen and len(seen) < MAX_LIST_PAGES:
+            seen.add(next_url)
+            html = await fetch_page(http, limit, next_url, use_cache)
+            if not html:
+                break
+            page_cards, _, next_url = parse_season_page(html)
+            cards += page_cards
+
+    unique = {}
+    for card in cards:
+        unique.setdefault(card["slug"], card)
+    return list(unique.values())
+
+
+async def crawl_series(http, limit, card, use_cache=True):
+    html = await fetch_page(http, limit, card["url"], use_cache)
+    return parse_series_page(html) if html else []
+
+
+def audio_entry(card, episodes):
+    if not episodes:
+        return {"url": card["url"], "episodes": 0, "announced": card["episodes"], "firstEpisodeId": None,
+                "firstEpisodeUrl": None, "episodeIds": [], "sequential": False}
+    ids = [ep_id for _, ep_id, _ in episodes]
+    numbers = [n for n, _, _ in episodes]
+    return {
+        "url": card["url"],
+        "episodes": len(episodes),            # lançados (o que dá para extrair agora)
+        "announced": card["episodes"],        # total anunciado na listagem
+        "firstEpisodeId": ids[0],
+        "firstEpisodeUrl": episodes[0][2],
+        "episodeIds": ids,
+        # Full.py monta ep i como start_id + i - 1: só vale se IDs e números andam juntos
+        "sequential": numbers == list(range(1, len(numbers) + 1)) and ids == list(range(ids[0], ids[0] + len(ids))),
+    }
+
+
+def build_season_manifest(season, cards, series):
+    """Junta a série legendada e a -dublado de cada anime numa entrada só."""
+    animes = {}
+    for card, episodes in zip(cards, series):
+        is_dub = card["slug"].endswith(DUB_SUFFIX)
+        slug = card["slug"][:-len(DUB_SUFFIX)] if is_dub else card["slug"]
+        entry = animes.setdefault(slug, {"slug": slug, "sub": None, "dub": None})
+        if not is_dub or "title" not in entry:
+            entry.update({
+                "title": DUB_TITLE_RE.sub("", card["title"] or slug),
+                "cover": card["cover"],
+                "studio": card["studio"],
+                "type": card["type"],
+                "status": card["status"],
+                "score": card["score"],
+                "genres": card["genres"],
+                "alternative": card["alternative"],
+            })
+        entry["dub" if is_dub else "sub"] = audio_entry(card, episodes)
+    return {
+        "season": season,
+        "source": season_url(season),
+        "animes": sorted(animes.values(), key=lambda a: a["slug"]),
+    }
+
+
+async def crawl_season(season, use_cache=True):
+    limit = asyncio.Semaphore(FETCHES)
+    async with aiohttp.ClientSession() as http:
+        cards = await crawl_listing(http, limit, season, use_cache)
+        print(f"[TEMPORADA] {len(cards)} séries na listagem de {season}. Lendo as páginas das séries...")
+        series = await asyncio.gather(*(crawl_series(http, limit, card, use_cache) for card in cards))
+    return build_season_manifest(season, cards, series)
+
+
+def manifest_path(season, folder=SEASONS_DIR):
+    return os.path.join(folder, f"{season}.json")
+
+
+# ── Integração com o Full.py ─────────────────────────────────────────────────
+
+def run_config(entry):
+    """Configuração de run do Full.py (mesmo formato do prompt_run_config) para um anime do manifest."""
+    usable = {a: entry[a] for a in ("sub", "dub") if entry.get(a) and entry[a]["firstEpisodeUrl"] and entry[a]["sequential"]}
+    if not usable:
+        return None
+    eps_sub = usable["sub"]["episodes"] if "sub" in usable else None
+    eps_dub = usable["dub"]["episodes"] if "dub" in usable else None
+    return {
+        "anime_name": entry["title"],
+        "id_prefix": entry["slug"],
+        "is_safe_mode": False,
+        "is_anivideo_site": False,
+        "av_letter": None,
+        "av_base_slug": None,
+        "seasons": [{
+            "season_num": 1,
+            "total_eps": max(n for n in (eps_sub, eps_dub) if n),
+            "eps_sub": eps_sub,
+            "eps_dub": eps_dub,
+            "has_dub": "dub" in usable,
+            "has_leg": "sub" in usable,
+            "url_dub": usable["dub"]["firstEpisodeUrl"] if "dub" in usable else None,
+            "url_sub": usable["sub"]["firstEpisodeUrl"] if "sub" in usable else None,
+        }],
+    }
+
+
+def extract_season(manifest, only=None, bounded=False):
+    from FullAsync import run_async   # playwright só é necessário aqui
+
+    for entry in manifest["animes"]:
+        if only and entry["slug"] not in only:
+            continue
+        cfg = run_config(entry)
+        if not cfg:
+            print(f"\n[TEMPORADA] Pulando {entry['slug']}: sem episódios com IDs sequenciais.")
+            continue
+        print(f"\n[TEMPORADA] Extraindo {entry['title']} ({entry['slug']})...")
+        # Sem terminal: anime que já existe com outro slug é estendido, não extraído de novo
+        output_file = asyncio.run(run_async(cfg, bounded=bounded, existing="estender"))
+        print(f"[Sucesso] Arquivo {output_file} gerado!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listagens de temporada do animesonline.io.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("listar", help="lê a listagem e grava o manifest da temporada")
+    p_list.add_argument("temporada", help="slug da temporada (ex: verao-2025, summer-2022)")
+    p_list.add_argument("--sem-cache", action="store_true", help="busca de novo páginas já em cache/")
+    p_run = sub.add_parser("extrair", help="extrai todos os animes do manifest")
+    p_run.add_argument("temporada")
+    p_run.add_argument("--so", nargs="+", metavar="SLUG", help="só estes animes")
+    p_run.add_argument("--memoria-limitada", action="store_true")
+    args = parser.parse_args()
+
+    path = manifest_path(args.temporada)
+    if args.cmd == "listar":
+        manifest = asyncio.run(crawl_season(args.temporada, use_cache=not args.sem_cache))
+        dump_json_atomic(manifest, path)
+        animes = manifest["animes"]
+        print(f"✅ {len(animes)} animes em {path} "
+              f"({sum(1 for a in animes if a['dub'])} com dublado, {sum(1 for a in animes if run_config(a))} prontos para extrair)")
+        return
+
+    if not os.path.exists(path):
+        print(f"❌ Manifest {path} não existe (rode: python Api/Temporada.py listar {args.temporada})")
+        sys.exit(1)
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    extract_season(manifest, only=set(args.so or []), bounded=args.memoria_limitada)
+
+
+if __name__ == "__main__":
+    main()
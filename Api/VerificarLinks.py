@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Verificador de links mortos do catálogo publicado.
+
+Lê os JSONs do catálogo (Api/Animes/*.json, output.json, public/data/*.json),
+tira o src de cada iframe gerado por make_iframe_html e testa todos em paralelo,
+com conexões reaproveitadas e limite de requisições simultâneas por host.
+
+A fila de re-extração (--fila) junta os áudios mortos por episódio e, quando o
+episódio tem "sources" (página e adaptador de cada áudio, gravados pelo
+--sob-demanda), leva a página junto. Com --reextrair esses áudios são
+extraídos de novo (extract_episodes do FullAsync, precisa do playwright) e os
+links novos vão para o arquivo do anime em Api/Animes; depois é só rodar o
+JuntarJson.py. Episódios sem página de origem ficam só no relatório: o catálogo
+normal não guarda de onde o link veio, então precisam de um Full.py.
+
+Uso:
+  python Api/VerificarLinks.py                  # verifica e grava relatorio_links.json
+  python Api/VerificarLinks.py --fila           # também grava fila_reextracao.json
+  python Api/VerificarLinks.py --reextrair      # re-extrai o que está na fila_reextracao.json
+  python Api/VerificarLinks.py arquivo.json ... # verifica só os arquivos informados
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from LinkCache import is_link_alive
+from Catalogo import load_catalog, load_json, iter_episodes
+from Normalizar import FORMAT_NAME, expand_anime, make_iframe_html, normalize_anime
+from SaidaJson import dump_json_atomic
+from SobDemanda import flags_for_site
+
+DEFAULT_SOURCES = ["Api/Animes/*.json", "output.json", "public/data/*.json"]
+REPORT_FILE = "relatorio_links.json"
+QUEUE_FILE = "fila_reextracao.json"
+
+MAX_WORKERS = 16
+PER_HOST = 4
+
+IFRAME_SRC_RE = re.compile(r'src="([^"]+)"', re.IGNORECASE)
+
+
+def embed_src(embed):
+    """Extrai o src de uma string de embed (iframe HTML ou URL pura)."""
+    if not embed or not isinstance(embed, str):
+        return None
+    m = IFRAME_SRC_RE.search(embed)
+    if m:
+        return m.group(1)
+    embed = embed.strip()
+    return embed if embed.startswith(("http://", "https://")) else None
+
+
+def iter_catalog_files(patterns):
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            norm = os.path.normpath(path)
+            if norm not in seen:
+                seen.add(norm)
+                yield norm
+
+
+def iter_embeds(path):
+    """Gera (anime_id, season, episode, audio, src, source) para cada embed de um arquivo."""
+    try:
+        data = load_json(path)
+    except Exception as e:
+        print(f"⚠️ Erro ao ler {path}: {e}")
+        return
+    animes = data if isinstance(data, list) else [data]
+    for anime in animes:
+        if not isinstance(anime, dict):
+            continue
+        try:
+            anime = expand_anime(anime)     # arquivos no formato normalizado guardam só o link cru
+        except Exception as e:
+            print(f"⚠️ Formato normalizado inválido em {path}: {e!r}")
+            continue
+        anime_id = anime.get("id")
+        for season, ep in iter_episodes(anime):
+            embeds = dict(ep.get("embeds") or {})
+            if not embeds and ep.get("embedUrl"):
+                embeds["any"] = ep["embedUrl"]
+            sources = ep.get("sources") or {}
+            for audio, embed in embeds.items():
+                src = embed_src(embed)
+                if src:
+                    yield anime_id, season.get("season"), ep.get("number"), audio, src, sources.get(audio)
+
+
+def build_session(max_workers=MAX_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def check_links(srcs, max_workers=MAX_WORKERS, per_host=PER_HOST):
+    """Testa cada src uma única vez. Retorna {src: (vivo, latência_ms)}."""
+    session = build_session(max_workers)
+    host_limits = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+    limits_lock = threading.Lock()
+
+    def check(src):
+        host = urlparse(src).hostname or ""
+        with limits_lock:
+            sem = host_limits[host]
+        with sem:
+            t0 = time.time()
+            alive = is_link_alive(src, session=session)
+            return alive, int((time.time() - t0) * 1000)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(check, src): src for src in srcs}
+        for n, fut in enumerate(as_completed(futures), 1):
+            results[futures[fut]] = fut.result()
+            if n % 50 == 0 or n == len(futures):
+                print(f"   [{n}/{len(futures)}] links verificados")
+    return results
+
+
+def scan(patterns=DEFAULT_SOURCES, max_workers=MAX_WORKERS, per_host=PER_HOST):
+    occurrences = defaultdict(list)
+    for path in iter_catalog_files(patterns):
+        for anime_id, season, number, audio, src, source in iter_embeds(path):
+            occurrences[src].append({
+                "file": path,
+                "anime": anime_id,
+                "season": season,
+                "episode": number,
+                "audio": audio,
+                "source": source,
+            })
+
+    print(f"🔎 {len(occurrences)} links únicos para verificar...")
+    results = check_links(list(occurrences), max_workers=max_workers, per_host=per_host)
+
+    by_host = defaultdict(lambda: {"ok": 0, "dead": 0})
+    dead = []
+    for src, (alive, latency) in results.items():
+        host = urlparse(src).hostname or ""
+        by_host[host]["ok" if alive else "dead"] += 1
+        if not alive:
+            for occ in occurrences[src]:
+                dead.append({**occ, "src": src, "latencyMs": latency})
+
+    dead.sort(key=lambda d: (d["anime"] or "", d["season"] or 0, d["episode"] or 0, d["audio"]))
+    return {
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "totalLinks": len(results),
+        "deadLinks": sum(1 for alive, _ in results.values() if not alive),
+        "byHost": dict(by_host),
+        "dead": dead,
+    }
+
+
+def build_reextraction_queue(report):
+    """
+    Agrupa episódios mortos por (anime, temporada, episódio) para re-extração pontual.
+    "sources" traz a página/adaptador dos áudios que têm origem conhecida.
+    """
+    queue = {}
+    for d in report["dead"]:
+        key = (d["anime"], d["season"], d["episode"])
+        item = queue.setdefault(key, {
+            "anime": d["anime"],
+            "season": d["season"],
+            "episode": d["episode"],
+            "audios": [],
+            "sources": {},
+            "files": [],
+        })
+        if d["audio"] not in item["audios"]:
+            item["audios"].append(d["audio"])
+        if d.get("source") and d["audio"] not in item["sources"]:
+            item["sources"][d["audio"]] = d["source"]
+        if d["file"] not in item["files"]:
+            item["files"].append(d["file"])
+    return list(queue.values())
+
+
+def apply_links(path, anime_id, links):
+    """
+    Troca no arquivo do anime os embeds re-extraídos ({(temporada, episódio, áudio): link}),
+    mantendo o formato (completo/normalizado) e os outros animes. Retorna quantos trocou.
+    """
+    data = load_json(path)
+    animes = data if isinstance(data, list) else [data]
+    changed = 0
+    out = []
+    for item in animes:
+        if isinstance(item, dict) and item.get("id") == anime_id:
+            anime = expand_anime(item)
+            for season, ep in iter_episodes(anime):
+                for audio in ("dub", "sub"):
+                    link = links.get((season.get("season"), ep.get("number"), audio))
+                    if link:
+                        ep.setdefault("embeds", {})[audio] = make_iframe_html(link)
+                        changed += 1
+            item = normalize_anime(anime) if item.get("format") == FORMAT_NAME else anime
+        out.append(item)
+    if changed:
+        dump_json_atomic(out if isinstance(data, list) else out[0], path)
+    return changed
+
+
+def reextract_queue(queue, max_pages=None):
+    """
+    Re-extrai os áudios da fila que têm página de origem e grava os links novos nos
+    arquivos de Api/Animes. Retorna (links trocados, áudios sem origem, áudios sem link).
+    """
+    from FullAsync import MAX_PAGES, extract_episodes   # playwright só é necessário aqui
+
+    jobs, targets = [], []
+    no_source = 0
+    for item in queue:
+        for audio in item["audios"]:
+            source = (item.get("sources") or {}).get(audio)
+            if not source or not source.get("url"):
+                no_source += 1
+                continue
+            jobs.append((source["url"], audio, flags_for_site(source.get("site"))))
+            targets.append((item, audio))
+
+    print(f"🔁 {len(jobs)} áudios para re-extrair ({no_source} sem página de origem)...")
+    links = extract_episodes(jobs, max_pages=max_pages or MAX_PAGES) if jobs else []
+
+    found = defaultdict(dict)
+    failed = 0
+    for (item, audio), link in zip(targets, links):
+        if link:
+            found[item["anime"]][(item["season"], item["episode"], audio)] = link
+        else:
+            failed += 1
+
+    sources = load_catalog()["sources"] if found else {}
+    changed = 0
+    for anime_id, anime_links in found.items():
+        path = sources.get(anime_id)
+        if not path:
+            print(f"⚠️ {anime_id} não está em Api/Animes; links re-extraídos descartados.")
+            continue
+        n = apply_links(path, anime_id, anime_links)
+        print(f"   {anime_id}: {n} links trocados em {path}")
+        changed += n
+    return changed, no_source, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica links mortos nos embeds do catálogo.")
+    parser.add_argument("files", nargs="*", help="arquivos/globs do catálogo (padrão: catálogo inteiro)")
+    parser.add_argument("--fila", action="store_true", help=f"grava {QUEUE_FILE} com os episódios mortos")
+    parser.add_argument("--reextrair", action="store_true", help=f"re-extrai os episódios de {QUEUE_FILE} (sem verificar)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--por-host", type=int, default=PER_HOST)
+    parser.add_argument("--saida", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    if args.reextrair:
+        with open(QUEUE_FILE, "r", encoding="utf-8") as f:
+            queue = json.load(f)
+        changed, no_source, failed = reextract_queue(queue)
+        print(f"✅ {changed} links trocados; {failed} sem link novo; {no_source} sem página de origem "
+              f"(precisam do Full.py)."
+              + (" Rode o JuntarJson.py para publicar." if changed else ""))
+        return
+
+    report = scan(args.files or DEFAULT_SOURCES, max_workers=args.workers, per_host=args.por_host)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ {report['deadLinks']}/{report['totalLinks']} links mortos. Relatório em {args.saida}")
+
+    if args.fila:
+        queue = build_reextraction_queue(report)
+        with open(QUEUE_FILE, "w", encoding="utf-8") as f:
+            json.dump(queue, f, ensure_ascii=False, indent=2)
+        print(f"📥 {len(queue)} episódios na fila de re-extração ({QUEUE_FILE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 import subprocess
 import sys
 
-def run(command):
-    result = subprocess.run(command, shell=True)
-    if result.returncode != 0:
-        print(f"Erro ao executar: {command}")
+def run(args, check=True):
+    result = subprocess.run(args)
+    if check and result.returncode != 0:
+        print(f"Erro ao executar: {' '.join(args)}")
         sys.exit(1)
+    return result
 
 def main():
     arquivo = input("📄 Digite o caminho do arquivo (ex: src/index.html): ").strip()
@@ -23,23 +24,28 @@ def main():
         print("❌ A mensagem do commit não pode ser vazia.")
         sys.exit(1)
 
-    run("git remote set-url origin https://github.com/HenzoPaes/Anime_website.git")
+    run(["git", "remote", "set-url", "origin", "https://github.com/HenzoPaes/Anime_website.git"])
 
     # Garante que está no branch correto
     print(f"🌿 Mudando para o branch '{branch}'...")
-    run(f"git checkout -B {branch}")
+    run(["git", "checkout", "-B", branch])
 
     # Adiciona APENAS o arquivo específico
     print(f"🔄 Adicionando apenas '{arquivo}'...")
-    run(f'git add "{arquivo}"')
+    run(["git", "add", "--", arquivo])
+
+    # Sem mudança no arquivo = sem commit vazio e sem push
+    if run(["git", "diff", "--cached", "--quiet", "--", arquivo], check=False).returncode == 0:
+        print("✅ O arquivo não mudou. Nada para enviar.")
+        return
 
     print("📝 Criando commit...")
-    run(f'git commit --allow-empty -m "{message}"')
+    run(["git", "commit", "-m", message, "--", arquivo])
 
     print(f"🚀 Enviando para o branch '{branch}'...")
-    run(f"git push origin {branch}")
+    run(["git", "push", "origin", branch])
 
     print("✅ Processo concluído com sucesso!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
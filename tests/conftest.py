@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os scripts do Api/ importam uns aos outros pelo nome (rodam com python Api/X.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "Api"))
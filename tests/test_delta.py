@@ -0,0 +1,83 @@
+import copy
+import random
+
+from Delta import apply_delta, diff_catalog
+from Git import normalize_for_compare
+
+
+def _episode(anime_id, season, number):
+    return {
+        "id": f"{anime_id}-s{season}-ep{number}",
+        "number": number,
+        "title": f"{anime_id} - T{season} Episódio {number}",
+        "season": str(season),
+        "embeds": {"sub": f"https://cdn.example/{anime_id}/{season}/{number}.m3u8"},
+    }
+
+
+def _catalog(n_animes=6):
+    animes = []
+    for a in range(n_animes):
+        anime_id = f"anime-{a}"
+        animes.append({
+            "id": anime_id,
+            "title": f"Anime {a}",
+            "seasons": [
+                {
+                    "season": s,
+                    "status": "finished",
+                    "episodes": 3,
+                    "episodeList": [_episode(anime_id, s, e) for e in range(1, 4)],
+                }
+                for s in range(1, 4)
+            ],
+        })
+    return animes
+
+
+def _mutate(animes, rng):
+    animes = copy.deepcopy(animes)
+    anime = rng.choice(animes)
+    seasons = anime["seasons"]
+    kind = rng.choice(["season_order", "episode_order", "field", "add_episode",
+                       "remove_season", "add_anime", "anime_order", "remove_anime"])
+    if kind == "season_order":
+        rng.shuffle(seasons)
+    elif kind == "episode_order":
+        rng.shuffle(rng.choice(seasons)["episodeList"])
+    elif kind == "field":
+        rng.choice(seasons)["status"] = "ongoing"
+    elif kind == "add_episode":
+        season = rng.choice(seasons)
+        season["episodeList"].append(_episode(anime["id"], season["season"], len(season["episodeList"]) + 1))
+    elif kind == "remove_season" and len(seasons) > 1:
+        seasons.pop(rng.randrange(len(seasons)))
+    elif kind == "add_anime":
+        animes.insert(rng.randrange(len(animes) + 1), dict(copy.deepcopy(anime), id=f"novo-{rng.random()}"))
+    elif kind == "anime_order":
+        rng.shuffle(animes)
+    elif kind == "remove_anime" and len(animes) > 1:
+        animes.remove(anime)
+    return animes
+
+
+def test_season_reorder_alone_round_trips():
+    old = _catalog(2)
+    new = copy.deepcopy(old)
+    new[0]["seasons"].reverse()
+
+    ops = diff_catalog(old, new)
+
+    assert ops
+    assert apply_delta(old, ops) == new
+
+
+def test_diff_apply_round_trip_random_mutations():
+    rng = random.Random(46)
+    base = _catalog()
+    for _ in range(300):
+        new = base
+        for _ in range(rng.randint(1, 3)):
+            new = _mutate(new, rng)
+        patched = apply_delta(base, diff_catalog(base, new))
+        assert normalize_for_compare(patched) == normalize_for_compare(new)
@@ -0,0 +1,28 @@
+from Identidade import dedupe_animes, find_duplicates
+
+
+def _anime(anime_id, title, mal_id=None):
+    anime = {"id": anime_id, "title": title, "seasons": []}
+    if mal_id:
+        anime["malId"] = mal_id
+    return anime
+
+
+def test_title_only_entry_does_not_bridge_different_mal_ids():
+    b = _anime("frieren", "Frieren")
+    a = _anime("frieren-1", "Frieren", mal_id=1)
+    c = _anime("frieren-2", "Frieren", mal_id=2)
+
+    groups = find_duplicates([b, a, c])
+
+    assert [[x["id"] for x in g] for g in groups] == [["frieren", "frieren-1"]]
+    result, merges = dedupe_animes([b, a, c])
+    assert {x["id"]: x.get("malId") for x in result} == {"frieren": 1, "frieren-2": 2}
+    assert merges == [("frieren", ["frieren-1"])]
+
+
+def test_same_mal_id_merges_across_titles():
+    a = _anime("sousou-no-frieren", "Sousou no Frieren", mal_id=52991)
+    b = _anime("sousounof", "Frieren: Beyond Journey's End", mal_id=52991)
+
+    assert len(find_duplicates([a, b])) == 1
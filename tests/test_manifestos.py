@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+os.environ["HISTORICO"] = "0"   # fetch_record gravaria cache/historico.db relativo ao cwd
+
+import Historico
+from Manifestos import best_mirror, inspect_all, parse_playlist, start_variant
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2",FRAME-RATE=23.976
+360/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2500000,AVERAGE-BANDWIDTH=2000000,RESOLUTION=1280x720
+https://cdn.example/720/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:6
+#EXTINF:6.0,
+seg0.ts
+#EXTINF:6.0,
+seg1.ts
+#EXTINF:3.5,
+seg2.ts
+#EXT-X-ENDLIST
+"""
+
+FMP4 = """#EXTM3U
+#EXT-X-TARGETDURATION:4
+#EXT-X-MAP:URI="init.mp4"
+#EXTINF:4.0,
+part0.m4s
+"""
+
+
+@pytest.fixture(autouse=True)
+def no_history(monkeypatch):
+    monkeypatch.setattr(Historico, "HISTORY_ENABLED", False)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hls_server(tmp_path):
+    (tmp_path / "master.m3u8").write_text(MASTER.replace("https://cdn.example/720", "720"))
+    for name in ("360", "720"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "index.m3u8").write_text(MEDIA)
+        for n in range(3):
+            (tmp_path / name / f"seg{n}.ts").write_bytes(b"\x47" * 188 * 10)
+    (tmp_path / "media.m3u8").write_text(MEDIA)
+    for n in range(3):
+        (tmp_path / f"seg{n}.ts").write_bytes(b"\x47" * 188 * 10)
+    (tmp_path / "pagina.html").write_text("<html>não é HLS</html>")
+
+    handler = functools.partial(_QuietHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_master():
+    parsed = parse_playlist(MASTER, "https://host.example/anime/master.m3u8")
+    assert parsed["kind"] == "master"
+    low, high = parsed["variants"]
+    assert low["uri"] == "https://host.example/anime/360/index.m3u8"
+    assert (low["width"], low["height"], low["bandwidth"]) == (640, 360, 800000)
+    assert low["codecs"] == "avc1.4d401e,mp4a.40.2"
+    assert low["frameRate"] == 23.976
+    assert high["uri"] == "https://cdn.example/720/index.m3u8"
+    assert (high["averageBandwidth"], high["frameRate"]) == (2000000, None)
+
+
+def test_parse_media():
+    parsed = parse_playlist(MEDIA, "https://seg.example/a/index.m3u8")
+    assert parsed == {
+        "kind": "media",
+        "segments": 3,
+        "targetDuration": 6.0,
+        "segmentDuration": 5.167,
+        "duration": 15.5,
+        "endlist": True,
+        "firstSegment": "https://seg.example/a/seg0.ts",
+        "segmentHost": "seg.example",
+    }
+
+
+def test_parse_ext_x_map():
+    parsed = parse_playlist(FMP4, "https://seg.example/b/index.m3u8")
+    assert parsed["firstSegment"] == "https://seg.example/b/init.mp4"
+    assert parsed["segments"] == 1
+    assert parsed["endlist"] is False
+
+
+def test_parse_not_hls():
+    assert parse_playlist("<html></html>", "https://x/") is None
+    assert parse_playlist("", "https://x/") is None
+
+
+def test_inspect_all(hls_server):
+    master = f"{hls_server}/master.m3u8"
+    media = f"{hls_server}/media.m3u8"
+    missing = f"{hls_server}/nao-existe.m3u8"
+    html = f"{hls_server}/pagina.html"
+
+    results = asyncio.run(inspect_all([master, media, missing, html], {}))
+
+    assert results[master]["kind"] == "master"
+    assert [v["height"] for v in results[master]["variants"]] == [360, 720]
+    assert all(v["ttfsMs"] is not None and v["segments"] == 3 for v in results[master]["variants"])
+    assert results[master]["cdnHost"] == "127.0.0.1"
+    assert results[master]["startupMs"] == results[master]["variants"][0]["ttfsMs"]
+    assert results[master]["fastestVariant"] in (0, 1)
+
+    assert results[media]["kind"] == "media"
+    assert results[media]["variants"][0]["duration"] == 15.5
+
+    assert results[missing]["error"] == "sem resposta"
+    assert results[html]["error"] == "não é um m3u8"
+
+
+def test_inspect_all_reuses_fresh_cache(hls_server):
+    missing = f"{hls_server}/nao-existe.m3u8"
+    old = {"checkedAt": 4102444800, "kind": "media", "variants": [], "startupMs": 100}
+    assert asyncio.run(inspect_all([missing], {missing: old}))[missing] is old
+    assert asyncio.run(inspect_all([missing], {missing: old}, force=True))[missing]["error"] == "sem resposta"
+
+
+def test_best_mirror_threshold():
+    summary = {"startupMs": 1000, "mirrors": {"https://m1/x.m3u8": {"startupMs": 801}}}
+    assert best_mirror(summary) is None
+    summary["mirrors"]["https://m2/x.m3u8"] = {"startupMs": 800}
+    assert best_mirror(summary) == "https://m2/x.m3u8"
+    assert best_mirror({"startupMs": None, "mirrors": summary["mirrors"]}) is None
+    assert best_mirror({"startupMs": 1000}) is None
+
+
+def test_start_variant_threshold():
+    summary = {"startupMs": 1000, "fastestVariant": 1, "variants": [{"ttfsMs": 1000}, {"ttfsMs": 801}]}
+    assert start_variant(summary) == 0
+    summary["variants"][1]["ttfsMs"] = 800
+    assert start_variant(summary) == 1
+    assert start_variant({"startupMs": 1000, "fastestVariant": None, "variants": []}) == 0
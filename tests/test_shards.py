@@ -0,0 +1,69 @@
+import copy
+import os
+
+from Shards import content_hash, write_shards
+
+
+def _embed(anime_id, season, number, nocache):
+    return f"https://api.anivideo.net/videohls.php?d=https://cdn.example/{anime_id}/{season}/{number}.m3u8&nocache{nocache}"
+
+
+def _catalog(nocache):
+    animes = []
+    for a in range(3):
+        anime_id = f"anime-{a}"
+        animes.append({
+            "id": anime_id,
+            "title": f"Anime {a}",
+            "seasons": [
+                {
+                    "season": s,
+                    "score": 7.5,
+                    "episodeList": [
+                        {
+                            "id": f"{anime_id}-s{s}-ep{e}",
+                            "number": e,
+                            "embeds": {"sub": _embed(anime_id, s, e, nocache)},
+                        }
+                        for e in range(1, 4)
+                    ],
+                }
+                for s in range(1, 3)
+            ],
+        })
+    return animes
+
+
+def _snapshot(out_dir):
+    files = {}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, out_dir)] = (f.read(), os.stat(path).st_mtime_ns)
+    return files
+
+
+def test_content_hash_ignores_nocache():
+    assert content_hash(_catalog(1700000000000)) == content_hash(_catalog(1700000099999))
+    changed = _catalog(1700000000000)
+    changed[0]["seasons"][0]["episodeList"][0]["number"] = 99
+    assert content_hash(changed) != content_hash(_catalog(1700000000000))
+
+
+def test_nocache_only_rewrite_keeps_shards_and_manifest(tmp_path):
+    out_dir = str(tmp_path / "catalog")
+    first = write_shards(_catalog(1700000000000), out_dir)
+    before = _snapshot(out_dir)
+
+    second = write_shards(_catalog(1700000099999), out_dir)
+    assert second == first
+    assert _snapshot(out_dir) == before
+
+    # mudança de verdade ainda muda o hash do anime e o manifest
+    animes = copy.deepcopy(_catalog(1700000099999))
+    animes[1]["seasons"][0]["episodeList"][2]["embeds"]["sub"] = "https://cdn.example/outro.m3u8"
+    third = write_shards(animes, out_dir)
+    assert third["hash"] != first["hash"]
+    changed = [a["id"] for a, b in zip(third["animes"], first["animes"]) if a["hash"] != b["hash"]]
+    assert changed == ["anime-1"]
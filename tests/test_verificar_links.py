@@ -0,0 +1,61 @@
+import json
+
+from Normalizar import FORMAT_NAME, expand_anime, normalize_anime
+from VerificarLinks import apply_links, build_reextraction_queue, embed_src
+
+
+def _anime():
+    return {
+        "id": "x",
+        "title": "X",
+        "titleRomaji": "X",
+        "seasons": [{
+            "season": 1,
+            "episodeList": [
+                {
+                    "id": f"x-s1-ep{n}",
+                    "number": n,
+                    "title": f"X - T1 Episódio {n}",
+                    "season": "1",
+                    "embeds": {
+                        "sub": f'<iframe width="100%" height="100%" src="https://old.example/{n}.m3u8" frameborder="0" allowfullscreen></iframe>',
+                    },
+                    "embedCredit": "old.example",
+                }
+                for n in (1, 2)
+            ],
+        }],
+    }
+
+
+def test_embed_src_ignores_non_strings():
+    assert embed_src({"src": "https://a"}) is None
+    assert embed_src(["https://a"]) is None
+    assert embed_src(" https://a/b ") == "https://a/b"
+
+
+def test_queue_keeps_page_sources():
+    page = {"url": "https://site.example/ep-2", "site": "animesonline"}
+    report = {"dead": [
+        {"file": "Api/Animes/x.json", "anime": "x", "season": 1, "episode": 2, "audio": "sub", "source": page},
+        {"file": "output.json", "anime": "x", "season": 1, "episode": 2, "audio": "sub", "source": page},
+        {"file": "Api/Animes/x.json", "anime": "x", "season": 1, "episode": 2, "audio": "dub", "source": None},
+    ]}
+    (item,) = build_reextraction_queue(report)
+    assert item["audios"] == ["sub", "dub"]
+    assert item["sources"] == {"sub": page}
+    assert item["files"] == ["Api/Animes/x.json", "output.json"]
+
+
+def test_apply_links_keeps_normalized_format(tmp_path):
+    path = tmp_path / "x.json"
+    path.write_text(json.dumps(normalize_anime(_anime())), encoding="utf-8")
+
+    assert apply_links(str(path), "x", {(1, 2, "sub"): "https://new.example/2.m3u8"}) == 1
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["format"] == FORMAT_NAME
+    episodes = expand_anime(saved)["seasons"][0]["episodeList"]
+    assert embed_src(episodes[0]["embeds"]["sub"]) == "https://old.example/1.m3u8"
+    assert embed_src(episodes[1]["embeds"]["sub"]) == "https://new.example/2.m3u8"
+
+    assert apply_links(str(path), "outro", {(1, 1, "sub"): "https://new.example/1.m3u8"}) == 0